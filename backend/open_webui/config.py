@@ -3,8 +3,13 @@ import logging
 import os
 import shutil
 import base64
+import threading
+import time
+import uuid
 import redis
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from typing import Generic, Optional, TypeVar
@@ -17,6 +22,11 @@ from sqlalchemy import JSON, Column, DateTime, Integer, func
 from open_webui.env import (
     DATA_DIR,
     DATABASE_URL,
+    DATABASE_POOL_MAX_OVERFLOW,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_TIMEOUT,
+    CONFIG_SYNC_INTERVAL,
     ENV,
     REDIS_URL,
     REDIS_SENTINEL_HOSTS,
@@ -82,17 +92,44 @@ def load_json_config():
         return json.load(file)
 
 
-def save_to_db(data):
+def save_to_db(
+    data, version: Optional[int] = None, check_version: bool = False
+) -> Optional[int]:
+    """
+    Save the config row and return its new version. With `check_version`, the
+    write only goes through if the row is still at `version` (None meaning no
+    row exists yet), and None is returned if another writer got there first.
+    """
     with get_db() as db:
-        existing_config = db.query(Config).first()
+        existing_config = db.query(Config).order_by(Config.id.desc()).first()
         if not existing_config:
+            if check_version and version is not None:
+                return None
+
             new_config = Config(data=data, version=0)
             db.add(new_config)
-        else:
-            existing_config.data = data
-            existing_config.updated_at = datetime.now()
-            db.add(existing_config)
+            db.commit()
+            return 0
+
+        current_version = existing_config.version or 0
+        if check_version and current_version != version:
+            return None
+
+        updated = (
+            db.query(Config)
+            .filter(Config.id == existing_config.id)
+            .filter(Config.version == existing_config.version)
+            .update(
+                {
+                    "data": data,
+                    "version": current_version + 1,
+                    "updated_at": datetime.now(),
+                },
+                synchronize_session=False,
+            )
+        )
         db.commit()
+        return current_version + 1 if updated else None
 
 
 def reset_config():
@@ -160,13 +197,19 @@ DEFAULT_CONFIG = {
 }
 
 
-def get_config():
+def get_config_entry() -> tuple[dict, Optional[int]]:
     with get_db() as db:
         config_entry = db.query(Config).order_by(Config.id.desc()).first()
-        return config_entry.data if config_entry else DEFAULT_CONFIG
+        if config_entry:
+            return config_entry.data, config_entry.version or 0
+        return DEFAULT_CONFIG, None
+
+
+def get_config():
+    return get_config_entry()[0]
 
 
-CONFIG_DATA = get_config()
+CONFIG_DATA, CONFIG_VERSION = get_config_entry()
 
 
 def get_config_value(config_path: str):
@@ -185,9 +228,10 @@ PERSISTENT_CONFIG_REGISTRY = []
 
 def save_config(config):
     global CONFIG_DATA
+    global CONFIG_VERSION
     global PERSISTENT_CONFIG_REGISTRY
     try:
-        save_to_db(config)
+        CONFIG_VERSION = save_to_db(config)
         CONFIG_DATA = config
 
         # Trigger updates on all registered PersistentConfig entries
@@ -242,20 +286,64 @@ class PersistentConfig(Generic[T]):
             self.value = new_value
             log.info(f"Updated {self.env_name} to new value {self.value}")
 
-    def save(self):
-        log.info(f"Saving '{self.env_name}' to the database")
+    def set_config_data(self, config_data: dict):
         path_parts = self.config_path.split(".")
-        sub_config = CONFIG_DATA
+        sub_config = config_data
         for key in path_parts[:-1]:
             if key not in sub_config:
                 sub_config[key] = {}
             sub_config = sub_config[key]
         sub_config[path_parts[-1]] = self.value
-        save_to_db(CONFIG_DATA)
-        self.config_value = self.value
+
+    def save(self):
+        save_config_items([self])
+
+
+def save_config_items(items: list[PersistentConfig]):
+    """
+    Write several PersistentConfig values to the database in one update. If
+    another worker saved the config in the meantime, the values are reapplied
+    on top of the latest row and the write is retried.
+    """
+    global CONFIG_DATA
+    global CONFIG_VERSION
+
+    log.info(
+        f"Saving {', '.join(repr(item.env_name) for item in items)} to the database"
+    )
+    for _ in range(3):
+        for item in items:
+            item.set_config_data(CONFIG_DATA)
+
+        version = save_to_db(CONFIG_DATA, CONFIG_VERSION, check_version=True)
+        if version is not None:
+            CONFIG_VERSION = version
+            for item in items:
+                item.config_value = item.value
+            return
+
+        log.warning("Config was updated concurrently, retrying on the latest version")
+        CONFIG_DATA, CONFIG_VERSION = get_config_entry()
+
+    raise Exception("Config was updated concurrently, please try again")
+
+
+# Pending updates of the AppConfig.batch() active in the current context
+_config_batch: ContextVar[Optional[dict]] = ContextVar("config_batch", default=None)
 
 
 class AppConfig:
+    """
+    Reads are served from the in-process PersistentConfig values. Updates are
+    saved in batches (see batch()) and, when Redis is configured, written to
+    Redis and broadcast to the other workers over pub/sub; a shared version
+    counter, checked every CONFIG_SYNC_INTERVAL seconds by a background thread,
+    resyncs any worker that missed a message.
+    """
+
+    CHANNEL = "open-webui:config:updates"
+    VERSION_KEY = "open-webui:config:version"
+
     _state: dict[str, PersistentConfig]
     _redis: Optional[redis.Redis] = None
 
@@ -263,45 +351,143 @@ class AppConfig:
         self, redis_url: Optional[str] = None, redis_sentinels: Optional[list] = []
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_worker_id", str(uuid.uuid4()))
+        super().__setattr__("_version", None)
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
 
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.CHANNEL: self._handle_message})
+                pubsub.run_in_thread(sleep_time=1, daemon=True)
+            except Exception as e:
+                log.exception(f"Error subscribing to config updates: {e}")
+
+            threading.Thread(target=self._run_sync, daemon=True).start()
+
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
             self._state[key] = value
-        else:
+            if self._redis:
+                self._apply(key, self._redis.get(f"open-webui:config:{key}"))
+            return
+
+        pending = _config_batch.get()
+        if pending is None:
+            with self.batch():
+                self.__setattr__(key, value)
+            return
+
+        old_value = pending[key][0] if key in pending else self._state[key].value
+        pending[key] = (old_value, value)
+        self._state[key].value = value
+
+    @contextmanager
+    def batch(self):
+        """
+        Group config updates into a single database write, Redis publish and
+        version bump. Values change locally right away and are rolled back if
+        the block raises. A nested batch joins the enclosing one.
+        """
+        if _config_batch.get() is not None:
+            yield
+            return
+
+        pending = {}
+        token = _config_batch.set(pending)
+        try:
+            yield
+            if pending:
+                self._commit({key: value for key, (_, value) in pending.items()})
+        except BaseException:
+            for key, (old_value, _) in pending.items():
+                self._state[key].value = old_value
+            raise
+        finally:
+            _config_batch.reset(token)
+
+    def _commit(self, values: dict):
+        # Reassign in case a message from another worker landed mid-batch
+        for key, value in values.items():
             self._state[key].value = value
-            self._state[key].save()
+        save_config_items([self._state[key] for key in values])
 
-            if self._redis:
-                redis_key = f"open-webui:config:{key}"
-                self._redis.set(redis_key, json.dumps(self._state[key].value))
+        if self._redis:
+            redis_values = {
+                key: json.dumps(self._state[key].value) for key in values.keys()
+            }
+
+            pipe = self._redis.pipeline()
+            pipe.mset(
+                {
+                    f"open-webui:config:{key}": redis_value
+                    for key, redis_value in redis_values.items()
+                }
+            )
+            pipe.incr(self.VERSION_KEY)
+            pipe.publish(
+                self.CHANNEL,
+                json.dumps({"worker": self._worker_id, "values": redis_values}),
+            )
+            version = pipe.execute()[1]
+
+            # Only skip the next resync if no other worker wrote in between
+            if self._version is not None and version == self._version + 1:
+                super().__setattr__("_version", version)
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"open-webui:config:{key}"
-            redis_value = self._redis.get(redis_key)
+        return self._state[key].value
 
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
+    def _apply(self, key: str, redis_value: Optional[str]):
+        if redis_value is None or key not in self._state:
+            return
 
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
+        try:
+            decoded_value = json.loads(redis_value)
 
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+            # Update the in-memory value if different
+            if self._state[key].value != decoded_value:
+                self._state[key].value = decoded_value
+                log.info(f"Updated {key} from Redis: {decoded_value}")
 
-        return self._state[key].value
+        except json.JSONDecodeError:
+            log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _handle_message(self, message):
+        try:
+            data = json.loads(message["data"])
+            if data["worker"] != self._worker_id:
+                for key, redis_value in data["values"].items():
+                    self._apply(key, redis_value)
+        except Exception as e:
+            log.error(f"Invalid config update message: {e}")
+
+    def _run_sync(self):
+        # Polled off the request path, so reads never wait on Redis
+        while True:
+            time.sleep(CONFIG_SYNC_INTERVAL)
+            self._sync()
+
+    def _sync(self):
+        try:
+            version = self._redis.get(self.VERSION_KEY)
+            if version is None or version == str(self._version):
+                return
+
+            keys = list(self._state.keys())
+            values = self._redis.mget([f"open-webui:config:{key}" for key in keys])
+            for key, redis_value in zip(keys, values):
+                self._apply(key, redis_value)
+
+            super().__setattr__("_version", int(version))
+        except Exception as e:
+            log.error(f"Error syncing config from Redis: {e}")
 
 
 ####################################
@@ -761,6 +947,11 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Local read-through cache of objects downloaded from S3 / GCS / Azure
+STORAGE_CACHE_MAX_SIZE_MB = int(os.environ.get("STORAGE_CACHE_MAX_SIZE_MB", "1024"))
+# Seconds a cached object is served without revalidating its ETag
+STORAGE_CACHE_TTL = int(os.environ.get("STORAGE_CACHE_TTL", "60"))
+
 ####################################
 # File Upload DIR
 ####################################
@@ -1724,6 +1915,46 @@ PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH = int(
     os.environ.get("PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH", "1536")
 )
 
+# Number of rows sent per COPY / INSERT statement when writing chunks
+PGVECTOR_INSERT_BATCH_SIZE = int(os.environ.get("PGVECTOR_INSERT_BATCH_SIZE", "1000"))
+
+# Stream inserts through COPY ... FROM STDIN (FORMAT binary) when the driver supports it
+PGVECTOR_USE_COPY = os.environ.get("PGVECTOR_USE_COPY", "True").lower() == "true"
+
+# ANN index on document_chunk.vector: "ivfflat" or "hnsw"
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "ivfflat").lower()
+if PGVECTOR_INDEX_METHOD not in ["ivfflat", "hnsw"]:
+    raise ValueError("PGVECTOR_INDEX_METHOD must be either 'ivfflat' or 'hnsw'.")
+
+PGVECTOR_HNSW_M = int(os.environ.get("PGVECTOR_HNSW_M", "16"))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(
+    os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+)
+# 0 uses the server default (hnsw.ef_search = 40)
+PGVECTOR_HNSW_EF_SEARCH = int(os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "0"))
+
+# 0 sizes the lists from the row count when the index is (re)built
+PGVECTOR_IVFFLAT_LISTS = int(os.environ.get("PGVECTOR_IVFFLAT_LISTS", "0"))
+# 0 uses the server default (ivfflat.probes = 1)
+PGVECTOR_IVFFLAT_PROBES = int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", "0"))
+
+# Collections with at least this many chunks get their own partial index on rebuild (0 disables)
+PGVECTOR_COLLECTION_INDEX_MIN_ROWS = int(
+    os.environ.get("PGVECTOR_COLLECTION_INDEX_MIN_ROWS", "0")
+)
+
+# Connection pool of the pgvector engine, defaults mirror DATABASE_POOL_* (0 disables pooling)
+PGVECTOR_POOL_SIZE = int(os.environ.get("PGVECTOR_POOL_SIZE", DATABASE_POOL_SIZE or 5))
+PGVECTOR_POOL_MAX_OVERFLOW = int(
+    os.environ.get("PGVECTOR_POOL_MAX_OVERFLOW", DATABASE_POOL_MAX_OVERFLOW)
+)
+PGVECTOR_POOL_TIMEOUT = int(
+    os.environ.get("PGVECTOR_POOL_TIMEOUT", DATABASE_POOL_TIMEOUT)
+)
+PGVECTOR_POOL_RECYCLE = int(
+    os.environ.get("PGVECTOR_POOL_RECYCLE", DATABASE_POOL_RECYCLE)
+)
+
 ####################################
 # Information Retrieval (RAG)
 ####################################
@@ -1895,6 +2126,36 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Remote (OpenAI/Ollama) embedding requests: batches in flight at once,
+# retries on rate limits and transient errors, and a rough per-request
+# token budget (chars / 4) used to keep large batches under payload limits
+try:
+    RAG_EMBEDDING_CONCURRENCY = int(os.environ.get("RAG_EMBEDDING_CONCURRENCY", "4"))
+except Exception:
+    RAG_EMBEDDING_CONCURRENCY = 4
+
+try:
+    RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "3"))
+except Exception:
+    RAG_EMBEDDING_MAX_RETRIES = 3
+
+try:
+    RAG_EMBEDDING_MAX_BATCH_TOKENS = int(
+        os.environ.get("RAG_EMBEDDING_MAX_BATCH_TOKENS", "100000")
+    )
+except Exception:
+    RAG_EMBEDDING_MAX_BATCH_TOKENS = 100000
+
+RAG_EMBEDDING_TIMEOUT = os.environ.get("RAG_EMBEDDING_TIMEOUT", "60")
+
+if RAG_EMBEDDING_TIMEOUT == "":
+    RAG_EMBEDDING_TIMEOUT = None
+else:
+    try:
+        RAG_EMBEDDING_TIMEOUT = int(RAG_EMBEDDING_TIMEOUT)
+    except Exception:
+        RAG_EMBEDDING_TIMEOUT = 60
+
 RAG_RERANKING_MODEL = PersistentConfig(
     "RAG_RERANKING_MODEL",
     "rag.reranking_model",
@@ -2080,6 +2341,11 @@ WEB_SEARCH_TRUST_ENV = PersistentConfig(
     os.getenv("WEB_SEARCH_TRUST_ENV", "False").lower() == "true",
 )
 
+# Fetched web pages are kept in memory and reused across searches, 0 disables
+WEB_LOADER_CACHE_MAX_SIZE_MB = int(os.environ.get("WEB_LOADER_CACHE_MAX_SIZE_MB", "64"))
+# Seconds a cached page is served without revalidating it
+WEB_LOADER_CACHE_TTL = int(os.environ.get("WEB_LOADER_CACHE_TTL", "3600"))
+
 
 SEARXNG_QUERY_URL = PersistentConfig(
     "SEARXNG_QUERY_URL",
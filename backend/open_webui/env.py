@@ -330,6 +330,13 @@ REDIS_URL = os.environ.get("REDIS_URL", "")
 REDIS_SENTINEL_HOSTS = os.environ.get("REDIS_SENTINEL_HOSTS", "")
 REDIS_SENTINEL_PORT = os.environ.get("REDIS_SENTINEL_PORT", "26379")
 
+# Seconds between checks of the shared config version, which catches any
+# config update a worker missed on the pub/sub channel
+try:
+    CONFIG_SYNC_INTERVAL = float(os.environ.get("CONFIG_SYNC_INTERVAL", "10"))
+except Exception:
+    CONFIG_SYNC_INTERVAL = 10.0
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -399,6 +406,22 @@ WEBSOCKET_MANAGER = os.environ.get("WEBSOCKET_MANAGER", "")
 WEBSOCKET_REDIS_URL = os.environ.get("WEBSOCKET_REDIS_URL", REDIS_URL)
 WEBSOCKET_REDIS_LOCK_TIMEOUT = os.environ.get("WEBSOCKET_REDIS_LOCK_TIMEOUT", 60)
 
+# Sessions in Redis expire after this many seconds unless the worker holding
+# the connection refreshes them, so a crashed worker's sessions don't linger
+try:
+    WEBSOCKET_SESSION_TTL = int(os.environ.get("WEBSOCKET_SESSION_TTL", "120"))
+except Exception:
+    WEBSOCKET_SESSION_TTL = 120
+
+# Clients get presence as join/leave deltas, plus a full list of active users
+# this often (in seconds) to catch up on anything they missed
+try:
+    WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL = int(
+        os.environ.get("WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL", "60")
+    )
+except Exception:
+    WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL = 60
+
 WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
@@ -441,6 +464,39 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA = 10
 
+####################################
+# WEBHOOKS
+####################################
+
+# Webhook notifications are delivered in the background by this many workers,
+# with at most WEBHOOK_CONCURRENCY_PER_HOST requests in flight per destination host
+try:
+    WEBHOOK_CONCURRENCY = int(os.environ.get("WEBHOOK_CONCURRENCY", "16"))
+except Exception:
+    WEBHOOK_CONCURRENCY = 16
+
+try:
+    WEBHOOK_CONCURRENCY_PER_HOST = int(
+        os.environ.get("WEBHOOK_CONCURRENCY_PER_HOST", "4")
+    )
+except Exception:
+    WEBHOOK_CONCURRENCY_PER_HOST = 4
+
+try:
+    WEBHOOK_MAX_RETRIES = int(os.environ.get("WEBHOOK_MAX_RETRIES", "3"))
+except Exception:
+    WEBHOOK_MAX_RETRIES = 3
+
+try:
+    WEBHOOK_TIMEOUT = int(os.environ.get("WEBHOOK_TIMEOUT", "10"))
+except Exception:
+    WEBHOOK_TIMEOUT = 10
+
+try:
+    WEBHOOK_QUEUE_SIZE = int(os.environ.get("WEBHOOK_QUEUE_SIZE", "10000"))
+except Exception:
+    WEBHOOK_QUEUE_SIZE = 10000
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -500,6 +556,71 @@ OTEL_TRACES_SAMPLER = os.environ.get(
 PIP_OPTIONS = os.getenv("PIP_OPTIONS", "").split()
 PIP_PACKAGE_INDEX_OPTIONS = os.getenv("PIP_PACKAGE_INDEX_OPTIONS", "").split()
 
+####################################
+# TOOLS/FUNCTIONS EXECUTION
+####################################
+
+# Synchronous tool and filter code runs in this many threads per worker
+try:
+    PLUGIN_THREAD_POOL_SIZE = int(os.environ.get("PLUGIN_THREAD_POOL_SIZE", "8"))
+except Exception:
+    PLUGIN_THREAD_POOL_SIZE = 8
+
+PLUGIN_EXECUTION_TIMEOUT = os.environ.get("PLUGIN_EXECUTION_TIMEOUT", "300")
+
+if PLUGIN_EXECUTION_TIMEOUT == "":
+    PLUGIN_EXECUTION_TIMEOUT = None
+else:
+    try:
+        PLUGIN_EXECUTION_TIMEOUT = int(PLUGIN_EXECUTION_TIMEOUT)
+    except Exception:
+        PLUGIN_EXECUTION_TIMEOUT = 300
+
+# RAG retrieval (vector search, hybrid search, reranking) runs in this many threads
+try:
+    RETRIEVAL_THREAD_POOL_SIZE = int(
+        os.environ.get(
+            "RETRIEVAL_THREAD_POOL_SIZE", str(min(32, (os.cpu_count() or 1) + 4))
+        )
+    )
+except Exception:
+    RETRIEVAL_THREAD_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+# Independent tool calls from a single model turn run concurrently
+try:
+    TOOL_CALL_CONCURRENCY = int(os.environ.get("TOOL_CALL_CONCURRENCY", "4"))
+except Exception:
+    TOOL_CALL_CONCURRENCY = 4
+
+TOOL_CALL_TIMEOUT = os.environ.get("TOOL_CALL_TIMEOUT", "")
+
+if TOOL_CALL_TIMEOUT == "":
+    TOOL_CALL_TIMEOUT = None
+else:
+    try:
+        TOOL_CALL_TIMEOUT = int(TOOL_CALL_TIMEOUT)
+    except Exception:
+        TOOL_CALL_TIMEOUT = None
+
+# Users' last active timestamps are recorded at most once per interval
+# (seconds) and written to the database in batches at the same interval
+try:
+    USER_LAST_ACTIVE_INTERVAL = int(os.environ.get("USER_LAST_ACTIVE_INTERVAL", "60"))
+except Exception:
+    USER_LAST_ACTIVE_INTERVAL = 60
+
+# Users looked up during authentication are cached for this many seconds
+# (0 disables the cache); updates invalidate them across workers via Redis
+try:
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "30"))
+except Exception:
+    USER_CACHE_TTL = 30
+
+try:
+    USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", "10000"))
+except Exception:
+    USER_CACHE_MAX_SIZE = 10000
+
 
 ####################################
 # PROGRESSIVE WEB APP OPTIONS
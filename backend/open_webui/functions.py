@@ -28,7 +28,10 @@ from open_webui.socket.main import (
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.plugin import (
+    get_function_module_valves,
+    load_function_module_by_id,
+)
 from open_webui.utils.tools import get_tools
 from open_webui.utils.access_control import has_access
 
@@ -61,8 +64,9 @@ def get_function_module_by_id(request: Request, pipe_id: str):
         function_module = request.app.state.FUNCTIONS[pipe_id]
 
     if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-        valves = Functions.get_function_valves_by_id(pipe_id)
-        function_module.valves = function_module.Valves(**(valves if valves else {}))
+        function_module.valves = get_function_module_valves(
+            request, pipe_id, function_module
+        )
     return function_module
 
 
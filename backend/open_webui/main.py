@@ -6,11 +6,9 @@ import mimetypes
 import os
 import shutil
 import sys
-import time
 import random
 
 from contextlib import asynccontextmanager
-from urllib.parse import urlencode, parse_qs, urlparse
 from pydantic import BaseModel
 from sqlalchemy import text
 
@@ -36,11 +34,9 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response, StreamingResponse
 
@@ -51,6 +47,8 @@ from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    Presence,
+    SESSION_POOL,
 )
 from open_webui.routers import (
     audio,
@@ -84,12 +82,13 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.utils import EMBEDDING_CLIENT
 
 from open_webui.internal.db import Session, engine
 
-from open_webui.models.functions import Functions
+from open_webui.models.functions import Functions, FunctionsRegistry
 from open_webui.models.models import Models
-from open_webui.models.users import UserModel, Users
+from open_webui.models.users import UserModel, Users, UsersCache, UserActivity
 from open_webui.models.chats import Chats
 
 from open_webui.config import (
@@ -343,6 +342,8 @@ from open_webui.env import (
     WEBUI_AUTH_TRUSTED_EMAIL_HEADER,
     WEBUI_AUTH_TRUSTED_NAME_HEADER,
     ENABLE_WEBSOCKET_SUPPORT,
+    PLUGIN_THREAD_POOL_SIZE,
+    RETRIEVAL_THREAD_POOL_SIZE,
     BYPASS_MODEL_ACCESS_CONTROL,
     RESET_CONFIG_ON_START,
     OFFLINE_MODE,
@@ -355,6 +356,7 @@ from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
     check_model_access,
+    get_filtered_models,
 )
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
@@ -362,17 +364,15 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
     get_license_data,
-    get_http_authorization_cred,
     decode_token,
     get_admin_user,
     get_verified_user,
 )
 from open_webui.utils.oauth import OAuthManager
-from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.asgi_middleware import RequestMiddleware
 
 from open_webui.tasks import (
     list_task_ids_by_chat_id,
@@ -381,6 +381,9 @@ from open_webui.tasks import (
 )  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
+from open_webui.utils.webhook import Webhooks
+from open_webui.utils.executor import InstrumentedExecutor
+from open_webui.retrieval.web.main import close_search_session
 
 
 if SAFE_MODE:
@@ -433,6 +436,25 @@ async def lifespan(app: FastAPI):
     if LICENSE_KEY:
         get_license_data(app, LICENSE_KEY)
 
+    # Synchronous tool and filter code runs here instead of on the event loop
+    app.state.PLUGIN_EXECUTOR = InstrumentedExecutor(
+        "plugin", max_workers=PLUGIN_THREAD_POOL_SIZE
+    )
+    # Shared by every RAG retrieval entry point instead of per-request thread pools
+    app.state.RETRIEVAL_EXECUTOR = InstrumentedExecutor(
+        "retrieval", max_workers=RETRIEVAL_THREAD_POOL_SIZE
+    )
+
+    # Last active timestamps are written in batches instead of on every request
+    app.state.user_activity_task = asyncio.create_task(UserActivity.run())
+
+    # Keeps this worker's Socket.IO sessions from expiring in Redis
+    app.state.session_pool_task = asyncio.create_task(SESSION_POOL.run())
+    # Presence and usage changes go out as coalesced deltas
+    app.state.presence_task = asyncio.create_task(Presence.run())
+    # Webhook notifications are delivered by background workers
+    app.state.webhook_task = asyncio.create_task(Webhooks.run())
+
     # Start periodic cleanup task with error handling
     try:
         if ENABLE_WEBSOCKET_SUPPORT:
@@ -448,6 +470,36 @@ async def lifespan(app: FastAPI):
     yield
 
     # Cleanup on shutdown
+    app.state.PLUGIN_EXECUTOR.shutdown(wait=False)
+    app.state.RETRIEVAL_EXECUTOR.shutdown(wait=False)
+    await close_search_session()
+    EMBEDDING_CLIENT.close()
+
+    app.state.user_activity_task.cancel()
+    try:
+        await app.state.user_activity_task
+    except asyncio.CancelledError:
+        pass
+    await asyncio.to_thread(UserActivity.flush)
+
+    app.state.session_pool_task.cancel()
+    try:
+        await app.state.session_pool_task
+    except asyncio.CancelledError:
+        pass
+
+    app.state.presence_task.cancel()
+    try:
+        await app.state.presence_task
+    except asyncio.CancelledError:
+        pass
+
+    app.state.webhook_task.cancel()
+    try:
+        await app.state.webhook_task
+    except asyncio.CancelledError:
+        pass
+
     if hasattr(app.state, 'cleanup_task'):
         try:
             app.state.cleanup_task.cancel()
@@ -473,6 +525,15 @@ app.state.config = AppConfig(
     redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
 )
 
+FunctionsRegistry.initialize(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
+UsersCache.initialize(
+    redis_url=REDIS_URL,
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
+
 app.state.WEBUI_NAME = WEBUI_NAME
 app.state.LICENSE_METADATA = None
 
@@ -603,6 +664,7 @@ app.state.EXTERNAL_PWA_MANIFEST_URL = EXTERNAL_PWA_MANIFEST_URL
 app.state.USER_COUNT = None
 app.state.TOOLS = {}
 app.state.FUNCTIONS = {}
+app.state.FUNCTION_VALVES = {}
 
 ########################################
 #
@@ -880,70 +942,10 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 ########################################
 
 app.state.MODELS = {}
+app.state.MODEL_ACCESS = {}
 
 
-class RedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Check if the request is a GET request
-        if request.method == "GET":
-            path = request.url.path
-            query_params = dict(parse_qs(urlparse(str(request.url)).query))
-
-            # Check for the specific watch path and the presence of 'v' parameter
-            if path.endswith("/watch") and "v" in query_params:
-                video_id = query_params["v"][0]  # Extract the first 'v' parameter
-                encoded_video_id = urlencode({"youtube": video_id})
-                redirect_url = f"/?{encoded_video_id}"
-                return RedirectResponse(url=redirect_url)
-
-        # Proceed with the normal flow of other requests
-        response = await call_next(request)
-        return response
-
-
-# Add the middleware to the app
-app.add_middleware(RedirectMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-
-
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
-
-
-@app.middleware("http")
-async def check_url(request: Request, call_next):
-    start_time = int(time.time())
-    request.state.token = get_http_authorization_cred(
-        request.headers.get("Authorization")
-    )
-
-    request.state.enable_api_key = app.state.config.ENABLE_API_KEY
-    response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
-
-@app.middleware("http")
-async def inspect_websocket(request: Request, call_next):
-    if (
-        "/ws/socket.io" in request.url.path
-        and request.query_params.get("transport") == "websocket"
-    ):
-        upgrade = (request.headers.get("Upgrade") or "").lower()
-        connection = (request.headers.get("Connection") or "").lower().split(",")
-        # Check that there's the correct headers for an upgrade, else reject the connection
-        # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
-        if upgrade != "websocket" or "upgrade" not in connection:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Invalid WebSocket upgrade request"},
-            )
-    return await call_next(request)
+app.add_middleware(RequestMiddleware)
 
 
 app.add_middleware(
@@ -1017,29 +1019,6 @@ if audit_level != AuditLevel.NONE:
 
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
-    def get_filtered_models(models, user):
-        filtered_models = []
-        for model in models:
-            if model.get("arena"):
-                if has_access(
-                    user.id,
-                    type="read",
-                    access_control=model.get("info", {})
-                    .get("meta", {})
-                    .get("access_control", {}),
-                ):
-                    filtered_models.append(model)
-                continue
-
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
-
-        return filtered_models
-
     all_models = await get_all_models(request, user=user)
 
     models = []
@@ -1074,7 +1053,7 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
 
     # Filter out models that the user does not have access to
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models = get_filtered_models(models, user)
+        models = get_filtered_models(models, user, request.app.state.MODEL_ACCESS)
 
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model['id'] for model in models])}"
@@ -1253,6 +1232,16 @@ async def list_tasks_by_chat_id_endpoint(chat_id: str, user=Depends(get_verified
     return {"task_ids": task_ids}
 
 
+@app.get("/api/executors/metrics")
+async def get_executor_metrics(request: Request, user=Depends(get_admin_user)):
+    return {
+        "executors": [
+            request.app.state.PLUGIN_EXECUTOR.get_metrics(),
+            request.app.state.RETRIEVAL_EXECUTOR.get_metrics(),
+        ]
+    }
+
+
 ##################################
 #
 # Config Endpoints
@@ -0,0 +1,49 @@
+"""Add indexes for channel message listing
+
+Revision ID: d31a5c7e9b24
+Revises: 5a464df12345
+Create Date: 2025-11-20 10:00:00.000000
+
+"""
+
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+revision = "d31a5c7e9b24"
+down_revision = "5a464df12345"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    message_indexes = {index["name"] for index in inspector.get_indexes("message")}
+    reaction_indexes = {
+        index["name"] for index in inspector.get_indexes("message_reaction")
+    }
+
+    # Channel pages and their keyset pagination on (created_at, id)
+    if "idx_message_channel_parent_created" not in message_indexes:
+        op.create_index(
+            "idx_message_channel_parent_created",
+            "message",
+            ["channel_id", "parent_id", "created_at", "id"],
+        )
+    # Reply counts and thread pages
+    if "idx_message_parent_created" not in message_indexes:
+        op.create_index(
+            "idx_message_parent_created",
+            "message",
+            ["parent_id", "created_at", "id"],
+        )
+    if "idx_message_reaction_message_id" not in reaction_indexes:
+        op.create_index(
+            "idx_message_reaction_message_id", "message_reaction", ["message_id"]
+        )
+
+
+def downgrade():
+    op.drop_index("idx_message_reaction_message_id", table_name="message_reaction")
+    op.drop_index("idx_message_parent_created", table_name="message")
+    op.drop_index("idx_message_channel_parent_created", table_name="message")
@@ -1,10 +1,13 @@
 import logging
+import threading
 import time
+import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.models.users import Users
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_connection
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text
 
@@ -80,6 +83,112 @@ class FunctionValves(BaseModel):
     valves: Optional[dict] = None
 
 
+####################
+# Function Registry
+####################
+
+
+class FunctionsRegistryCache:
+    """
+    In-memory snapshot of every function's type, flags and valves, so resolving
+    the filters and actions of a model doesn't query the database. It's rebuilt
+    lazily after any change and, when Redis is configured, changes made on one
+    worker are broadcast to the others.
+    """
+
+    CHANNEL = "open-webui:functions:invalidate"
+
+    def __init__(self):
+        # _lock guards the snapshot and generation, _load_lock makes sure only
+        # one thread rebuilds the snapshot at a time
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._snapshot: Optional[dict[str, dict]] = None
+        self._generation = 0
+        self._redis = None
+        self._worker_id = str(uuid.uuid4())
+
+    def initialize(self, redis_url: Optional[str], redis_sentinels: list = []):
+        if not redis_url or self._redis is not None:
+            return
+
+        try:
+            self._redis = get_redis_connection(
+                redis_url, redis_sentinels, decode_responses=True
+            )
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.CHANNEL: self._handle_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            log.exception(f"Error subscribing to function registry updates: {e}")
+            self._redis = None
+
+    def _handle_message(self, message):
+        if message.get("data") != self._worker_id:
+            self.invalidate(broadcast=False)
+
+    def _load(self) -> dict[str, dict]:
+        with get_db() as db:
+            return {
+                id: {
+                    "type": type,
+                    "is_active": bool(is_active),
+                    "is_global": bool(is_global),
+                    "valves": valves if valves else {},
+                }
+                for id, type, is_active, is_global, valves in db.query(
+                    Function.id,
+                    Function.type,
+                    Function.is_active,
+                    Function.is_global,
+                    Function.valves,
+                ).all()
+            }
+
+    def get_snapshot(self) -> dict[str, dict]:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._load_lock:
+            with self._lock:
+                if self._snapshot is not None:
+                    return self._snapshot
+                generation = self._generation
+
+            snapshot = self._load()
+
+            with self._lock:
+                # Don't publish a snapshot that was invalidated while loading
+                if generation == self._generation:
+                    self._snapshot = snapshot
+            return snapshot
+
+    def get_function(self, id: str) -> Optional[dict]:
+        return self.get_snapshot().get(id)
+
+    def get_functions_by_type(self, type: str, active_only=False) -> dict[str, dict]:
+        return {
+            id: function
+            for id, function in self.get_snapshot().items()
+            if function["type"] == type and (function["is_active"] or not active_only)
+        }
+
+    def invalidate(self, broadcast=True):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+        if broadcast and self._redis is not None:
+            try:
+                self._redis.publish(self.CHANNEL, self._worker_id)
+            except Exception as e:
+                log.exception(f"Error broadcasting function registry update: {e}")
+
+
+FunctionsRegistry = FunctionsRegistryCache()
+
+
 class FunctionsTable:
     def insert_new_function(
         self, user_id: str, type: str, form_data: FunctionForm
@@ -100,6 +209,7 @@ class FunctionsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                FunctionsRegistry.invalidate()
                 if result:
                     return FunctionModel.model_validate(result)
                 else:
@@ -182,6 +292,7 @@ class FunctionsTable:
                 function.valves = valves
                 function.updated_at = int(time.time())
                 db.commit()
+                FunctionsRegistry.invalidate()
                 db.refresh(function)
                 return self.get_function_by_id(id)
             except Exception:
@@ -242,6 +353,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                FunctionsRegistry.invalidate()
                 return self.get_function_by_id(id)
             except Exception:
                 return None
@@ -256,6 +368,7 @@ class FunctionsTable:
                     }
                 )
                 db.commit()
+                FunctionsRegistry.invalidate()
                 return True
             except Exception:
                 return None
@@ -265,6 +378,7 @@ class FunctionsTable:
             try:
                 db.query(Function).filter_by(id=id).delete()
                 db.commit()
+                FunctionsRegistry.invalidate()
 
                 return True
             except Exception:
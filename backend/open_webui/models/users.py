@@ -1,7 +1,21 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
 import time
+import uuid
+from collections import OrderedDict
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    USER_CACHE_MAX_SIZE,
+    USER_CACHE_TTL,
+    USER_LAST_ACTIVE_INTERVAL,
+)
+from open_webui.utils.redis import get_redis_connection
 
 
 from open_webui.models.chats import Chats
@@ -9,7 +23,10 @@ from open_webui.models.groups import Groups
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text
+from sqlalchemy import BigInteger, Column, String, Text, bindparam, update
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 ####################
 # User DB Schema
@@ -213,6 +230,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                UsersCache.invalidate(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -227,6 +245,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                UsersCache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -253,6 +272,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                UsersCache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -264,6 +284,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                UsersCache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -283,6 +304,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                UsersCache.invalidate(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -301,6 +323,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                UsersCache.invalidate(id)
 
                 return True
             else:
@@ -313,6 +336,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                UsersCache.invalidate(id)
                 return True if result == 1 else False
         except Exception:
             return False
@@ -332,3 +356,165 @@ class UsersTable:
 
 
 Users = UsersTable()
+
+
+class UserCache:
+    """
+    Bounded TTL cache of the users looked up on every authenticated request,
+    keyed by user id and by API key hash. UsersTable drops a user's entries
+    whenever it updates or deletes the user and, when Redis is configured, the
+    other workers are told to do the same.
+    """
+
+    CHANNEL = "open-webui:users:invalidate"
+
+    def __init__(self, ttl: int = 30, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, UserModel]] = OrderedDict()
+        self._generation = 0
+        self._redis = None
+        self._worker_id = str(uuid.uuid4())
+
+    def initialize(self, redis_url: Optional[str], redis_sentinels: list = []):
+        if not redis_url or self._redis is not None:
+            return
+
+        try:
+            self._redis = get_redis_connection(
+                redis_url, redis_sentinels, decode_responses=True
+            )
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.CHANNEL: self._handle_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except Exception as e:
+            log.exception(f"Error subscribing to user cache invalidations: {e}")
+            self._redis = None
+
+    def _handle_message(self, message):
+        try:
+            data = json.loads(message["data"])
+            if data["worker"] != self._worker_id:
+                self.invalidate(data["user_id"], broadcast=False)
+        except Exception as e:
+            log.error(f"Invalid user cache message: {e}")
+
+    def _get(self, key: str, loader) -> Optional[UserModel]:
+        if self.ttl <= 0:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1].model_copy(deep=True)
+            generation = self._generation
+
+        user = loader()
+        if user is not None:
+            with self._lock:
+                # Don't cache a user that was invalidated while loading
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl, user.model_copy(deep=True))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+        return user
+
+    def get_user_by_id(self, id: str) -> Optional[UserModel]:
+        return self._get(f"id:{id}", lambda: Users.get_user_by_id(id))
+
+    def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
+        return self._get(
+            f"api_key:{hashlib.sha256(api_key.encode()).hexdigest()}",
+            lambda: Users.get_user_by_api_key(api_key),
+        )
+
+    def invalidate(self, user_id: str, broadcast=True):
+        with self._lock:
+            self._generation += 1
+            for key in [
+                key for key, (_, user) in self._entries.items() if user.id == user_id
+            ]:
+                del self._entries[key]
+
+        if broadcast and self._redis is not None:
+            try:
+                self._redis.publish(
+                    self.CHANNEL,
+                    json.dumps({"worker": self._worker_id, "user_id": user_id}),
+                )
+            except Exception as e:
+                log.exception(f"Error broadcasting user cache invalidation: {e}")
+
+
+UsersCache = UserCache(USER_CACHE_TTL, USER_CACHE_MAX_SIZE)
+
+
+class UserActivityTracker:
+    """
+    Coalesces last active updates: each user's timestamp is recorded in memory
+    at most once per `interval` seconds, and flush() writes everything recorded
+    since the last flush in one batched UPDATE.
+    """
+
+    def __init__(self, interval: int = 60):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._recorded: dict[str, int] = {}
+        self._pending: dict[str, int] = {}
+
+    def touch(self, user_id: str):
+        now = int(time.time())
+        if now - self._recorded.get(user_id, 0) < self.interval:
+            return
+
+        with self._lock:
+            self._recorded[user_id] = now
+            self._pending[user_id] = now
+
+    def flush(self) -> int:
+        cutoff = int(time.time()) - self.interval
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Older entries no longer hold back an update
+            self._recorded = {
+                user_id: timestamp
+                for user_id, timestamp in self._recorded.items()
+                if timestamp > cutoff
+            }
+
+        if not pending:
+            return 0
+
+        try:
+            with get_db() as db:
+                # Core executemany: users deleted meanwhile are simply skipped
+                db.execute(
+                    update(User.__table__)
+                    .where(User.__table__.c.id == bindparam("user_id"))
+                    .values(last_active_at=bindparam("timestamp")),
+                    [
+                        {"user_id": user_id, "timestamp": timestamp}
+                        for user_id, timestamp in pending.items()
+                    ],
+                )
+                db.commit()
+        except Exception as e:
+            log.exception(f"Error updating last active timestamps: {e}")
+            with self._lock:
+                for user_id, timestamp in pending.items():
+                    self._pending.setdefault(user_id, timestamp)
+            return 0
+
+        return len(pending)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.flush)
+
+
+UserActivity = UserActivityTracker(USER_LAST_ACTIVE_INTERVAL)
@@ -1,8 +1,11 @@
+import asyncio
 import logging
 import os
+import random
+import threading
 from typing import Optional, Union
 
-import requests
+import aiohttp
 import hashlib
 from concurrent.futures import ThreadPoolExecutor
 
@@ -18,6 +21,7 @@ from open_webui.models.users import UserModel
 from open_webui.models.files import Files
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.utils.executor import InstrumentedExecutor
 
 
 from open_webui.env import (
@@ -29,6 +33,10 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_EMBEDDING_CONCURRENCY,
+    RAG_EMBEDDING_MAX_RETRIES,
+    RAG_EMBEDDING_MAX_BATCH_TOKENS,
+    RAG_EMBEDDING_TIMEOUT,
 )
 
 log = logging.getLogger(__name__)
@@ -289,6 +297,7 @@ def query_collection_with_hybrid_search(
     reranking_function,
     k_reranker: int,
     r: float,
+    executor: Optional[InstrumentedExecutor] = None,
 ) -> dict:
     results = []
     error = False
@@ -337,9 +346,14 @@ def query_collection_with_hybrid_search(
         for q in queries
     ]
 
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+    if executor is not None:
+        task_results = executor.map(
+            "hybrid_search", lambda task: process_query(*task), tasks
+        )
+    else:
+        with ThreadPoolExecutor() as pool:
+            future_results = [pool.submit(process_query, cn, q) for cn, q in tasks]
+            task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -368,7 +382,7 @@ def get_embedding_function(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
     elif embedding_engine in ["ollama", "openai"]:
-        func = lambda query, prefix=None, user=None: generate_embeddings(
+        return lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -376,25 +390,7 @@ def get_embedding_function(
             url=url,
             key=key,
             user=user,
-        )
-
-        def generate_multiple(query, prefix, user, func):
-            if isinstance(query, list):
-                embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
-                        )
-                    )
-                return embeddings
-            else:
-                return func(query, prefix, user)
-
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
+            batch_size=embedding_batch_size,
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
@@ -526,6 +522,7 @@ def get_sources_from_files(
                                     reranking_function=reranking_function,
                                     k_reranker=k_reranker,
                                     r=r,
+                                    executor=request.app.state.RETRIEVAL_EXECUTOR,
                                 )
                             except Exception as e:
                                 log.debug(
@@ -612,69 +609,192 @@ def get_model_path(model: str, update_model: bool = False):
         return model
 
 
-def generate_openai_batch_embeddings(
-    model: str,
-    texts: list[str],
-    url: str = "https://api.openai.com/v1",
-    key: str = "",
-    prefix: str = None,
-    user: UserModel = None,
-) -> Optional[list[list[float]]]:
-    try:
-        log.debug(
-            f"generate_openai_batch_embeddings:model {model} batch size: {len(texts)}"
-        )
-        json_data = {"input": texts, "model": model}
-        if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
-            json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
+class EmbeddingClient:
+    """
+    Client for the OpenAI and Ollama embedding APIs, shared by the ingestion
+    and query paths. Requests run on a dedicated event loop thread so they
+    reuse pooled connections and several batches can be in flight at once,
+    while the sync callers (vector DB and retriever code) block on the result.
 
-        r = requests.post(
-            f"{url}/embeddings",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {key}",
-                **(
-                    {
-                        "X-OpenWebUI-User-Name": user.name,
-                        "X-OpenWebUI-User-Id": user.id,
-                        "X-OpenWebUI-User-Email": user.email,
-                        "X-OpenWebUI-User-Role": user.role,
-                    }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                    else {}
+    Batches are capped by item count and an estimated token budget. A 413
+    splits the batch in half, and a 413 or 429 lowers the batch size used for
+    that endpoint and model until requests succeed again.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_retries: int = 3,
+        max_batch_tokens: int = 0,
+        timeout: Optional[int] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.max_batch_tokens = max_batch_tokens
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # (url, model) -> batch size learned from 413/429 responses
+        self._batch_limits: dict[tuple[str, str], int] = {}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="embedding-client",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Only called on the client loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency * 2, ttl_dns_cache=300
                 ),
-            },
-            json=json_data,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+        return self._session
+
+    def embed(
+        self,
+        engine: str,
+        model: str,
+        texts: list[str],
+        url: str,
+        key: str = "",
+        prefix: Optional[str] = None,
+        user: Optional[UserModel] = None,
+        batch_size: int = 1,
+    ) -> list[list[float]]:
+        future = asyncio.run_coroutine_threadsafe(
+            self._embed(engine, model, texts, url, key, prefix, user, batch_size),
+            self._get_loop(),
         )
-        r.raise_for_status()
-        data = r.json()
-        if "data" in data:
-            return [elem["embedding"] for elem in data["data"]]
-        else:
-            raise "Something went wrong :/"
-    except Exception as e:
-        log.exception(f"Error generating openai batch embeddings: {e}")
-        return None
+        return future.result()
 
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
 
-def generate_ollama_batch_embeddings(
-    model: str,
-    texts: list[str],
-    url: str,
-    key: str = "",
-    prefix: str = None,
-    user: UserModel = None,
-) -> Optional[list[list[float]]]:
-    try:
-        log.debug(
-            f"generate_ollama_batch_embeddings:model {model} batch size: {len(texts)}"
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(
+                timeout=5
+            )
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _get_batches(self, texts: list[str], batch_size: int) -> list[list[str]]:
+        batches, batch, batch_tokens = [], [], 0
+        for text in texts:
+            # Rough estimate, good enough to stay clear of payload limits
+            tokens = len(text) // 4 + 1
+            if batch and (
+                len(batch) >= batch_size
+                or (
+                    self.max_batch_tokens
+                    and batch_tokens + tokens > self.max_batch_tokens
+                )
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _lower_batch_limit(self, url: str, model: str, size: int):
+        limit = max(1, size // 2)
+        if limit < self._batch_limits.get((url, model), limit + 1):
+            log.warning(f"Lowering embedding batch size for {model} to {limit}")
+            self._batch_limits[(url, model)] = limit
+
+    def _get_retry_delay(self, attempt: int, headers=None) -> float:
+        try:
+            return float(headers["Retry-After"])
+        except Exception:
+            return min(30.0, 0.5 * 2**attempt) * (0.5 + random.random() / 2)
+
+    async def _embed(self, engine, model, texts, url, key, prefix, user, batch_size):
+        limit = self._batch_limits.get((url, model))
+        if limit is not None:
+            if limit >= batch_size:
+                self._batch_limits.pop((url, model), None)
+            else:
+                batch_size = limit
+
+        results = await asyncio.gather(
+            *[
+                self._embed_batch(engine, model, batch, url, key, prefix, user)
+                for batch in self._get_batches(texts, max(1, batch_size))
+            ]
         )
+        return [embedding for result in results for embedding in result]
+
+    async def _embed_batch(self, engine, model, texts, url, key, prefix, user):
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    embeddings = await self._request(
+                        engine, model, texts, url, key, prefix, user
+                    )
+
+                # Creep back up towards the configured batch size
+                limit = self._batch_limits.get((url, model))
+                if limit is not None:
+                    self._batch_limits[(url, model)] = limit + 1
+                return embeddings
+            except aiohttp.ClientResponseError as e:
+                if e.status == 413 and len(texts) > 1:
+                    self._lower_batch_limit(url, model, len(texts))
+                    half = len(texts) // 2
+                    results = await asyncio.gather(
+                        self._embed_batch(
+                            engine, model, texts[:half], url, key, prefix, user
+                        ),
+                        self._embed_batch(
+                            engine, model, texts[half:], url, key, prefix, user
+                        ),
+                    )
+                    return results[0] + results[1]
+
+                if e.status not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+                if e.status == 429:
+                    self._lower_batch_limit(url, model, len(texts))
+
+                error, delay = e, self._get_retry_delay(attempt, e.headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                error, delay = e, self._get_retry_delay(attempt)
+
+            log.warning(
+                f"Embedding request to {url} failed ({error}), retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _request(self, engine, model, texts, url, key, prefix, user):
+        log.debug(f"embedding request: {engine} {model} batch size: {len(texts)}")
         json_data = {"input": texts, "model": model}
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
-            f"{url}/api/embed",
+        async with self._get_session().post(
+            f"{url}/embeddings" if engine == "openai" else f"{url}/api/embed",
             headers={
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {key}",
@@ -685,22 +805,28 @@ def generate_ollama_batch_embeddings(
                         "X-OpenWebUI-User-Email": user.email,
                         "X-OpenWebUI-User-Role": user.role,
                     }
-                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
                     else {}
                 ),
             },
             json=json_data,
-        )
-        r.raise_for_status()
-        data = r.json()
+        ) as r:
+            r.raise_for_status()
+            data = await r.json(content_type=None)
 
-        if "embeddings" in data:
+        if engine == "openai" and "data" in data:
+            return [elem["embedding"] for elem in data["data"]]
+        elif engine == "ollama" and "embeddings" in data:
             return data["embeddings"]
-        else:
-            raise "Something went wrong :/"
-    except Exception as e:
-        log.exception(f"Error generating ollama batch embeddings: {e}")
-        return None
+        raise ValueError(f"Unexpected {engine} embedding response")
+
+
+EMBEDDING_CLIENT = EmbeddingClient(
+    concurrency=RAG_EMBEDDING_CONCURRENCY,
+    max_retries=RAG_EMBEDDING_MAX_RETRIES,
+    max_batch_tokens=RAG_EMBEDDING_MAX_BATCH_TOKENS,
+    timeout=RAG_EMBEDDING_TIMEOUT,
+)
 
 
 def generate_embeddings(
@@ -713,6 +839,7 @@ def generate_embeddings(
     url = kwargs.get("url", "")
     key = kwargs.get("key", "")
     user = kwargs.get("user")
+    batch_size = kwargs.get("batch_size", 1)
 
     if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
         if isinstance(text, list):
@@ -720,40 +847,17 @@ def generate_embeddings(
         else:
             text = f"{prefix}{text}"
 
-    if engine == "ollama":
-        if isinstance(text, list):
-            embeddings = generate_ollama_batch_embeddings(
-                **{
-                    "model": model,
-                    "texts": text,
-                    "url": url,
-                    "key": key,
-                    "prefix": prefix,
-                    "user": user,
-                }
-            )
-        else:
-            embeddings = generate_ollama_batch_embeddings(
-                **{
-                    "model": model,
-                    "texts": [text],
-                    "url": url,
-                    "key": key,
-                    "prefix": prefix,
-                    "user": user,
-                }
-            )
-        return embeddings[0] if isinstance(text, str) else embeddings
-    elif engine == "openai":
-        if isinstance(text, list):
-            embeddings = generate_openai_batch_embeddings(
-                model, text, url, key, prefix, user
-            )
-        else:
-            embeddings = generate_openai_batch_embeddings(
-                model, [text], url, key, prefix, user
-            )
-        return embeddings[0] if isinstance(text, str) else embeddings
+    embeddings = EMBEDDING_CLIENT.embed(
+        engine,
+        model,
+        text if isinstance(text, list) else [text],
+        url,
+        key=key,
+        prefix=prefix,
+        user=user,
+        batch_size=batch_size,
+    )
+    return embeddings[0] if isinstance(text, str) else embeddings
 
 
 import operator
@@ -1,5 +1,11 @@
+from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
+import hashlib
+import io
+import json
 import logging
+import math
+import struct
 from sqlalchemy import (
     cast,
     column,
@@ -14,20 +20,42 @@ from sqlalchemy import (
     values,
 )
 from sqlalchemy.sql import true
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
-from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
-from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.dialects.postgresql import JSONB, array, insert as pg_insert
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
 
 from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
-from open_webui.config import PGVECTOR_DB_URL, PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
+from open_webui.config import (
+    PGVECTOR_DB_URL,
+    PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH,
+    PGVECTOR_INSERT_BATCH_SIZE,
+    PGVECTOR_USE_COPY,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
+    PGVECTOR_COLLECTION_INDEX_MIN_ROWS,
+    PGVECTOR_POOL_SIZE,
+    PGVECTOR_POOL_MAX_OVERFLOW,
+    PGVECTOR_POOL_TIMEOUT,
+    PGVECTOR_POOL_RECYCLE,
+)
 
 from open_webui.env import SRC_LOG_LEVELS
 
 VECTOR_LENGTH = PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
+# Header of the binary COPY format: signature, flags field and header extension length
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack("!h", -1)
+CHUNK_COLUMNS = ("id", "vector", "collection_name", "text", "vmetadata")
+UPSERT_STAGING_TABLE = "document_chunk_upsert"
+VECTOR_INDEX_NAME = "idx_document_chunk_vector"
 Base = declarative_base()
 
 log = logging.getLogger(__name__)
@@ -49,50 +77,77 @@ class PgvectorClient:
 
         # if no pgvector uri, use the existing database connection
         if not PGVECTOR_DB_URL:
-            from open_webui.internal.db import Session
+            from open_webui.internal.db import engine, SessionLocal
 
-            self.session = Session
+            self.engine = engine
+            self.SessionLocal = SessionLocal
         else:
-            engine = create_engine(
-                PGVECTOR_DB_URL, pool_pre_ping=True, poolclass=NullPool
-            )
-            SessionLocal = sessionmaker(
-                autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+            if PGVECTOR_POOL_SIZE > 0:
+                self.engine = create_engine(
+                    PGVECTOR_DB_URL,
+                    pool_size=PGVECTOR_POOL_SIZE,
+                    max_overflow=PGVECTOR_POOL_MAX_OVERFLOW,
+                    pool_timeout=PGVECTOR_POOL_TIMEOUT,
+                    pool_recycle=PGVECTOR_POOL_RECYCLE,
+                    pool_pre_ping=True,
+                    poolclass=QueuePool,
+                )
+            else:
+                self.engine = create_engine(
+                    PGVECTOR_DB_URL, pool_pre_ping=True, poolclass=NullPool
+                )
+            self.SessionLocal = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=self.engine,
+                expire_on_commit=False,
             )
-            self.session = scoped_session(SessionLocal)
 
-        try:
-            # Ensure the pgvector extension is available
-            self.session.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
-
-            # Check vector length consistency
-            self.check_vector_length()
-
-            # Create the tables if they do not exist
-            # Base.metadata.create_all requires a bind (engine or connection)
-            # Get the connection from the session
-            connection = self.session.connection()
-            Base.metadata.create_all(bind=connection)
-
-            # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
+        with self.get_session() as session:
+            try:
+                # Ensure the pgvector extension is available
+                session.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+
+                # Check vector length consistency
+                self.check_vector_length()
+
+                # Create the tables if they do not exist
+                # Base.metadata.create_all requires a bind (engine or connection)
+                # Get the connection from the session
+                connection = session.connection()
+                Base.metadata.create_all(bind=connection)
+
+                # Create an index on the vector column if it doesn't exist
+                session.execute(
+                    text(
+                        self._vector_index_ddl(
+                            VECTOR_INDEX_NAME,
+                            row_count=self._count_rows(session),
+                            if_not_exists=True,
+                        )
+                    )
                 )
-            )
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
-                    "ON document_chunk (collection_name);"
+                session.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
+                        "ON document_chunk (collection_name);"
+                    )
                 )
-            )
-            self.session.commit()
-            log.info("Initialization complete.")
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during initialization: {e}")
-            raise
+                session.commit()
+                log.info("Initialization complete.")
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during initialization: {e}")
+                raise
+
+    @contextmanager
+    def get_session(self):
+        # A session per call keeps concurrent searches from sharing a connection
+        session = self.SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
 
     def check_vector_length(self) -> None:
         """
@@ -103,7 +158,7 @@ class PgvectorClient:
         try:
             # Attempt to reflect the 'document_chunk' table
             document_chunk_table = Table(
-                "document_chunk", metadata, autoload_with=self.session.bind
+                "document_chunk", metadata, autoload_with=self.engine
             )
         except NoSuchTableError:
             # Table does not exist; no action needed
@@ -129,6 +184,127 @@ class PgvectorClient:
                 "The 'vector' column does not exist in the 'document_chunk' table."
             )
 
+    def _count_rows(self, session) -> int:
+        # The planner estimate is good enough to size the index and avoids a full scan
+        estimate = session.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:table_name)"
+            ),
+            {"table_name": DocumentChunk.__tablename__},
+        ).scalar()
+        return max(int(estimate or 0), 0)
+
+    def _ivfflat_lists(self, row_count: int) -> int:
+        if PGVECTOR_IVFFLAT_LISTS > 0:
+            return PGVECTOR_IVFFLAT_LISTS
+        # pgvector recommends rows / 1000 up to 1M rows and sqrt(rows) above
+        if row_count <= 1_000_000:
+            return max(row_count // 1000, 100)
+        return int(math.sqrt(row_count))
+
+    def _collection_index_name(self, collection_name: str) -> str:
+        digest = hashlib.sha256(collection_name.encode()).hexdigest()[:16]
+        return f"{VECTOR_INDEX_NAME}_{digest}"
+
+    def _vector_index_ddl(
+        self,
+        index_name: str,
+        row_count: int = 0,
+        collection_name: Optional[str] = None,
+        if_not_exists: bool = False,
+        concurrently: bool = False,
+    ) -> str:
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            options = (
+                f"m = {PGVECTOR_HNSW_M}, "
+                f"ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION}"
+            )
+        else:
+            options = f"lists = {self._ivfflat_lists(row_count)}"
+
+        ddl = (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+            f"{'IF NOT EXISTS ' if if_not_exists else ''}{index_name} "
+            f"ON {DocumentChunk.__tablename__} "
+            f"USING {PGVECTOR_INDEX_METHOD} (vector vector_cosine_ops) "
+            f"WITH ({options})"
+        )
+        if collection_name is not None:
+            # Quote for SQL and escape ":" so text() does not treat it as a bind
+            escaped_name = collection_name.replace("'", "''").replace(":", "\\:")
+            ddl += f" WHERE collection_name = '{escaped_name}'"
+        return ddl
+
+    def _set_search_params(self, session) -> None:
+        # Applied with is_local so they only last for the current transaction
+        if PGVECTOR_INDEX_METHOD == "hnsw" and PGVECTOR_HNSW_EF_SEARCH > 0:
+            session.execute(
+                text("SELECT set_config('hnsw.ef_search', :value, true)"),
+                {"value": str(PGVECTOR_HNSW_EF_SEARCH)},
+            )
+        elif PGVECTOR_INDEX_METHOD == "ivfflat" and PGVECTOR_IVFFLAT_PROBES > 0:
+            session.execute(
+                text("SELECT set_config('ivfflat.probes', :value, true)"),
+                {"value": str(PGVECTOR_IVFFLAT_PROBES)},
+            )
+
+    def rebuild_indexes(self) -> Dict[str, Any]:
+        """
+        Rebuild the vector index with the configured method and parameters
+        without blocking writes, and maintain the per-collection partial indexes
+        for collections above PGVECTOR_COLLECTION_INDEX_MIN_ROWS.
+        """
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+
+            def swap_index(index_name: str, **kwargs) -> None:
+                # Build the replacement first so searches keep an index meanwhile
+                tmp_name = f"{index_name}_rebuild"
+                for statement in [
+                    f"DROP INDEX CONCURRENTLY IF EXISTS {tmp_name}",
+                    self._vector_index_ddl(tmp_name, concurrently=True, **kwargs),
+                    f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}",
+                    f"ALTER INDEX {tmp_name} RENAME TO {index_name}",
+                ]:
+                    connection.execute(text(statement))
+
+            row_count = connection.execute(
+                text(f"SELECT count(*) FROM {DocumentChunk.__tablename__}")
+            ).scalar()
+            swap_index(VECTOR_INDEX_NAME, row_count=row_count)
+
+            collection_indexes = []
+            if PGVECTOR_COLLECTION_INDEX_MIN_ROWS > 0:
+                collections = connection.execute(
+                    text(
+                        "SELECT collection_name, count(*) "
+                        f"FROM {DocumentChunk.__tablename__} "
+                        "GROUP BY collection_name HAVING count(*) >= :min_rows"
+                    ),
+                    {"min_rows": PGVECTOR_COLLECTION_INDEX_MIN_ROWS},
+                ).all()
+
+                for collection_name, collection_rows in collections:
+                    swap_index(
+                        self._collection_index_name(collection_name),
+                        row_count=collection_rows,
+                        collection_name=collection_name,
+                    )
+                    collection_indexes.append(collection_name)
+
+        log.info(
+            f"Rebuilt {PGVECTOR_INDEX_METHOD} index on {row_count} rows "
+            f"and {len(collection_indexes)} collection indexes."
+        )
+        return {
+            "method": PGVECTOR_INDEX_METHOD,
+            "rows": row_count,
+            "collections": collection_indexes,
+        }
+
     def adjust_vector_length(self, vector: List[float]) -> List[float]:
         # Adjust vector to have length VECTOR_LENGTH
         current_length = len(vector)
@@ -141,62 +317,154 @@ class PgvectorClient:
             )
         return vector
 
-    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+    def _create_batches(self, items: List[VectorItem], batch_size: int):
+        for i in range(0, len(items), batch_size):
+            yield items[i : i + batch_size]
+
+    def _build_rows(
+        self, collection_name: str, items: List[VectorItem]
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": item["id"],
+                "vector": self.adjust_vector_length(item["vector"]),
+                "collection_name": collection_name,
+                "text": item["text"],
+                "vmetadata": item["metadata"],
+            }
+            for item in items
+        ]
+
+    def _encode_copy_rows(self, rows: List[Dict[str, Any]]) -> io.BytesIO:
+        """
+        Encode rows in the PostgreSQL binary COPY format.
+        Vectors use the pgvector binary representation (dim, unused, float4 values)
+        and metadata the jsonb one (version byte followed by the JSON text).
+        """
+        vector_format = struct.Struct(f"!hh{VECTOR_LENGTH}f")
+        buffer = io.BytesIO()
+        buffer.write(COPY_BINARY_HEADER)
+
+        def write_field(value: Optional[bytes]):
+            if value is None:
+                buffer.write(struct.pack("!i", -1))
+            else:
+                buffer.write(struct.pack("!i", len(value)))
+                buffer.write(value)
+
+        for row in rows:
+            buffer.write(struct.pack("!h", len(CHUNK_COLUMNS)))
+            write_field(row["id"].encode("utf-8"))
+            write_field(vector_format.pack(VECTOR_LENGTH, 0, *row["vector"]))
+            write_field(row["collection_name"].encode("utf-8"))
+            write_field(
+                row["text"].encode("utf-8") if row["text"] is not None else None
+            )
+            write_field(
+                b"\x01" + json.dumps(row["vmetadata"]).encode("utf-8")
+                if row["vmetadata"] is not None
+                else None
+            )
+
+        buffer.write(COPY_BINARY_TRAILER)
+        buffer.seek(0)
+        return buffer
+
+    def _can_copy(self, session) -> bool:
+        if not PGVECTOR_USE_COPY:
+            return False
+        # COPY FROM STDIN is only exposed by psycopg2 cursors
+        cursor = session.connection().connection.cursor()
         try:
-            new_items = []
-            for item in items:
-                vector = self.adjust_vector_length(item["vector"])
-                new_chunk = DocumentChunk(
-                    id=item["id"],
-                    vector=vector,
-                    collection_name=collection_name,
-                    text=item["text"],
-                    vmetadata=item["metadata"],
-                )
-                new_items.append(new_chunk)
-            self.session.bulk_save_objects(new_items)
-            self.session.commit()
-            log.info(
-                f"Inserted {len(new_items)} items into collection '{collection_name}'."
+            return hasattr(cursor, "copy_expert")
+        finally:
+            cursor.close()
+
+    def _copy_rows(self, session, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(CHUNK_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT binary)",
+                self._encode_copy_rows(rows),
             )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during insert: {e}")
-            raise
+        finally:
+            cursor.close()
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        with self.get_session() as session:
+            try:
+                use_copy = self._can_copy(session)
+                for batch in self._create_batches(items, PGVECTOR_INSERT_BATCH_SIZE):
+                    rows = self._build_rows(collection_name, batch)
+                    if use_copy:
+                        self._copy_rows(session, DocumentChunk.__tablename__, rows)
+                    else:
+                        session.execute(pg_insert(DocumentChunk), rows)
+                session.commit()
+                log.info(
+                    f"Inserted {len(items)} items into collection '{collection_name}'."
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during insert: {e}")
+                raise
 
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
-            for item in items:
-                vector = self.adjust_vector_length(item["vector"])
-                existing = (
-                    self.session.query(DocumentChunk)
-                    .filter(DocumentChunk.id == item["id"])
-                    .first()
+        with self.get_session() as session:
+            try:
+                # A single INSERT ... ON CONFLICT cannot touch the same row twice,
+                # so keep only the last occurrence of each id.
+                unique_items = list({item["id"]: item for item in items}.values())
+                batches = self._create_batches(unique_items, PGVECTOR_INSERT_BATCH_SIZE)
+                columns = ", ".join(CHUNK_COLUMNS)
+                updates = ", ".join(
+                    f"{name} = EXCLUDED.{name}"
+                    for name in CHUNK_COLUMNS
+                    if name != "id"
                 )
-                if existing:
-                    existing.vector = vector
-                    existing.text = item["text"]
-                    existing.vmetadata = item["metadata"]
-                    existing.collection_name = (
-                        collection_name  # Update collection_name if necessary
+
+                if self._can_copy(session):
+                    # Stage the rows through COPY and merge them with a single statement
+                    session.execute(
+                        text(
+                            f"CREATE TEMP TABLE IF NOT EXISTS {UPSERT_STAGING_TABLE} "
+                            f"(LIKE {DocumentChunk.__tablename__}) ON COMMIT DROP"
+                        )
+                    )
+                    for batch in batches:
+                        self._copy_rows(
+                            session,
+                            UPSERT_STAGING_TABLE,
+                            self._build_rows(collection_name, batch),
+                        )
+                    session.execute(
+                        text(
+                            f"INSERT INTO {DocumentChunk.__tablename__} ({columns}) "
+                            f"SELECT {columns} FROM {UPSERT_STAGING_TABLE} "
+                            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+                        )
                     )
                 else:
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=item["metadata"],
+                    stmt = pg_insert(DocumentChunk)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[DocumentChunk.id],
+                        set_={
+                            name: stmt.excluded[name]
+                            for name in CHUNK_COLUMNS
+                            if name != "id"
+                        },
                     )
-                    self.session.add(new_chunk)
-            self.session.commit()
-            log.info(
-                f"Upserted {len(items)} items into collection '{collection_name}'."
-            )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during upsert: {e}")
-            raise
+                    for batch in batches:
+                        session.execute(stmt, self._build_rows(collection_name, batch))
+                session.commit()
+                log.info(
+                    f"Upserted {len(items)} items into collection '{collection_name}'."
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during upsert: {e}")
+                raise
 
     def search(
         self,
@@ -204,148 +472,162 @@ class PgvectorClient:
         vectors: List[List[float]],
         limit: Optional[int] = None,
     ) -> Optional[SearchResult]:
-        try:
-            if not vectors:
-                return None
-
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
-
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
+        with self.get_session() as session:
+            try:
+                if not vectors:
+                    return None
+
+                # Adjust query vectors to VECTOR_LENGTH
+                vectors = [self.adjust_vector_length(vector) for vector in vectors]
+                num_queries = len(vectors)
+
+                def vector_expr(vector):
+                    return cast(array(vector), Vector(VECTOR_LENGTH))
+
+                # Create the values for query vectors
+                qid_col = column("qid", Integer)
+                q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+                query_vectors = (
+                    values(qid_col, q_vector_col)
+                    .data(
+                        [
+                            (idx, vector_expr(vector))
+                            for idx, vector in enumerate(vectors)
+                        ]
+                    )
+                    .alias("query_vectors")
                 )
-                .alias("query_vectors")
-            )
 
-            # Build the lateral subquery for each query vector
-            subq = (
-                select(
-                    DocumentChunk.id,
-                    DocumentChunk.text,
-                    DocumentChunk.vmetadata,
-                    (
-                        DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)
-                    ).label("distance"),
-                )
-                .where(DocumentChunk.collection_name == collection_name)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
+                # Build the lateral subquery for each query vector
+                subq = (
+                    select(
+                        DocumentChunk.id,
+                        DocumentChunk.text,
+                        DocumentChunk.vmetadata,
+                        (
+                            DocumentChunk.vector.cosine_distance(
+                                query_vectors.c.q_vector
+                            )
+                        ).label("distance"),
+                    )
+                    .where(DocumentChunk.collection_name == collection_name)
+                    .order_by(
+                        (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
+                    )
                 )
-            )
-            if limit is not None:
-                subq = subq.limit(limit)
-            subq = subq.lateral("result")
-
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
+                if limit is not None:
+                    subq = subq.limit(limit)
+                subq = subq.lateral("result")
+
+                # Build the main query by joining query_vectors and the lateral subquery
+                stmt = (
+                    select(
+                        query_vectors.c.qid,
+                        subq.c.id,
+                        subq.c.text,
+                        subq.c.vmetadata,
+                        subq.c.distance,
+                    )
+                    .select_from(query_vectors)
+                    .join(subq, true())
+                    .order_by(query_vectors.c.qid, subq.c.distance)
                 )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
-            )
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
+                self._set_search_params(session)
+                result_proxy = session.execute(stmt)
+                results = result_proxy.all()
+
+                ids = [[] for _ in range(num_queries)]
+                distances = [[] for _ in range(num_queries)]
+                documents = [[] for _ in range(num_queries)]
+                metadatas = [[] for _ in range(num_queries)]
+
+                if not results:
+                    return SearchResult(
+                        ids=ids,
+                        distances=distances,
+                        documents=documents,
+                        metadatas=metadatas,
+                    )
 
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
+                for row in results:
+                    qid = int(row.qid)
+                    ids[qid].append(row.id)
+                    # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+                    # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+                    distances[qid].append((2.0 - row.distance) / 2.0)
+                    documents[qid].append(row.text)
+                    metadatas[qid].append(row.vmetadata)
 
-            if not results:
                 return SearchResult(
                     ids=ids,
                     distances=distances,
                     documents=documents,
                     metadatas=metadatas,
                 )
-
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
-
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
-            )
-        except Exception as e:
-            log.exception(f"Error during search: {e}")
-            return None
+            except Exception as e:
+                log.exception(f"Error during search: {e}")
+                return None
 
     def query(
         self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
     ) -> Optional[GetResult]:
-        try:
-            query = self.session.query(DocumentChunk).filter(
-                DocumentChunk.collection_name == collection_name
-            )
+        with self.get_session() as session:
+            try:
+                query = session.query(DocumentChunk).filter(
+                    DocumentChunk.collection_name == collection_name
+                )
 
-            for key, value in filter.items():
-                query = query.filter(DocumentChunk.vmetadata[key].astext == str(value))
+                for key, value in filter.items():
+                    query = query.filter(
+                        DocumentChunk.vmetadata[key].astext == str(value)
+                    )
 
-            if limit is not None:
-                query = query.limit(limit)
+                if limit is not None:
+                    query = query.limit(limit)
 
-            results = query.all()
+                results = query.all()
 
-            if not results:
-                return None
+                if not results:
+                    return None
 
-            ids = [[result.id for result in results]]
-            documents = [[result.text for result in results]]
-            metadatas = [[result.vmetadata for result in results]]
+                ids = [[result.id for result in results]]
+                documents = [[result.text for result in results]]
+                metadatas = [[result.vmetadata for result in results]]
 
-            return GetResult(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas,
-            )
-        except Exception as e:
-            log.exception(f"Error during query: {e}")
-            return None
+                return GetResult(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                )
+            except Exception as e:
+                log.exception(f"Error during query: {e}")
+                return None
 
     def get(
         self, collection_name: str, limit: Optional[int] = None
     ) -> Optional[GetResult]:
-        try:
-            query = self.session.query(DocumentChunk).filter(
-                DocumentChunk.collection_name == collection_name
-            )
-            if limit is not None:
-                query = query.limit(limit)
+        with self.get_session() as session:
+            try:
+                query = session.query(DocumentChunk).filter(
+                    DocumentChunk.collection_name == collection_name
+                )
+                if limit is not None:
+                    query = query.limit(limit)
 
-            results = query.all()
+                results = query.all()
 
-            if not results:
-                return None
+                if not results:
+                    return None
 
-            ids = [[result.id for result in results]]
-            documents = [[result.text for result in results]]
-            metadatas = [[result.vmetadata for result in results]]
+                ids = [[result.id for result in results]]
+                documents = [[result.text for result in results]]
+                metadatas = [[result.vmetadata for result in results]]
 
-            return GetResult(ids=ids, documents=documents, metadatas=metadatas)
-        except Exception as e:
-            log.exception(f"Error during get: {e}")
-            return None
+                return GetResult(ids=ids, documents=documents, metadatas=metadatas)
+            except Exception as e:
+                log.exception(f"Error during get: {e}")
+                return None
 
     def delete(
         self,
@@ -353,53 +635,73 @@ class PgvectorClient:
         ids: Optional[List[str]] = None,
         filter: Optional[Dict[str, Any]] = None,
     ) -> None:
-        try:
-            query = self.session.query(DocumentChunk).filter(
-                DocumentChunk.collection_name == collection_name
-            )
-            if ids:
-                query = query.filter(DocumentChunk.id.in_(ids))
-            if filter:
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
-            deleted = query.delete(synchronize_session=False)
-            self.session.commit()
-            log.info(f"Deleted {deleted} items from collection '{collection_name}'.")
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during delete: {e}")
-            raise
+        with self.get_session() as session:
+            try:
+                query = session.query(DocumentChunk).filter(
+                    DocumentChunk.collection_name == collection_name
+                )
+                if ids:
+                    query = query.filter(DocumentChunk.id.in_(ids))
+                if filter:
+                    for key, value in filter.items():
+                        query = query.filter(
+                            DocumentChunk.vmetadata[key].astext == str(value)
+                        )
+                deleted = query.delete(synchronize_session=False)
+                session.commit()
+                log.info(
+                    f"Deleted {deleted} items from collection '{collection_name}'."
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during delete: {e}")
+                raise
 
     def reset(self) -> None:
-        try:
-            deleted = self.session.query(DocumentChunk).delete()
-            self.session.commit()
-            log.info(
-                f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
-            )
-        except Exception as e:
-            self.session.rollback()
-            log.exception(f"Error during reset: {e}")
-            raise
+        with self.get_session() as session:
+            try:
+                deleted = session.query(DocumentChunk).delete()
+                session.commit()
+                log.info(
+                    f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
+                )
+            except Exception as e:
+                session.rollback()
+                log.exception(f"Error during reset: {e}")
+                raise
 
     def close(self) -> None:
         pass
 
     def has_collection(self, collection_name: str) -> bool:
-        try:
-            exists = (
-                self.session.query(DocumentChunk)
-                .filter(DocumentChunk.collection_name == collection_name)
-                .first()
-                is not None
-            )
-            return exists
-        except Exception as e:
-            log.exception(f"Error checking collection existence: {e}")
-            return False
+        with self.get_session() as session:
+            try:
+                exists = (
+                    session.query(DocumentChunk)
+                    .filter(DocumentChunk.collection_name == collection_name)
+                    .first()
+                    is not None
+                )
+                return exists
+            except Exception as e:
+                log.exception(f"Error checking collection existence: {e}")
+                return False
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
+        if PGVECTOR_COLLECTION_INDEX_MIN_ROWS > 0:
+            # Dropped concurrently, outside a transaction, so writes to other
+            # collections aren't blocked meanwhile
+            try:
+                with self.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                ) as connection:
+                    connection.execute(
+                        text(
+                            "DROP INDEX CONCURRENTLY IF EXISTS "
+                            f"{self._collection_index_name(collection_name)}"
+                        )
+                    )
+            except Exception as e:
+                log.exception(f"Error dropping collection index: {e}")
         log.info(f"Collection '{collection_name}' deleted.")
@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import os
 from pprint import pprint
 from typing import Optional
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    request_json,
+)
 from open_webui.env import SRC_LOG_LEVELS
 import argparse
 
@@ -14,7 +18,7 @@ Documentation: https://docs.microsoft.com/en-us/bing/search-apis/bing-web-search
 """
 
 
-def search_bing(
+async def search_bing(
     subscription_key: str,
     endpoint: str,
     locale: str,
@@ -27,9 +31,9 @@ def search_bing(
     headers = {"Ocp-Apim-Subscription-Key": subscription_key}
 
     try:
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        json_response = response.json()
+        json_response = await request_json(
+            "GET", endpoint, headers=headers, params=params
+        )
         results = json_response.get("webPages", {}).get("value", [])
         if filter_list:
             results = get_filtered_results(results, filter_list)
@@ -69,5 +73,5 @@ def main():
 
     args = parser.parse_args()
 
-    results = search_bing(args.locale, args.query, args.count, args.filter)
+    results = asyncio.run(search_bing(args.locale, args.query, args.count, args.filter))
     pprint(results)
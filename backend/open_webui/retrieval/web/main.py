@@ -1,10 +1,13 @@
 import validators
 
-from typing import Optional
+from typing import Any, Optional
 from urllib.parse import urlparse
 
+import aiohttp
 from pydantic import BaseModel
 
+from open_webui.env import AIOHTTP_CLIENT_TIMEOUT
+
 
 def get_filtered_results(results, filter_list):
     if not filter_list:
@@ -24,3 +27,54 @@ class SearchResult(BaseModel):
     link: str
     title: Optional[str]
     snippet: Optional[str]
+
+
+# Search engine calls share one pooled session per worker, created on first use
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_search_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            trust_env=True,
+        )
+    return _session
+
+
+async def close_search_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def request_json(
+    method: str, url: str, raise_for_status: bool = True, **kwargs
+) -> Any:
+    """Sends a request through the shared search session and returns the JSON body."""
+    async with get_search_session().request(method, url, **kwargs) as response:
+        if raise_for_status:
+            response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+def merge_search_results(
+    results: list[list[SearchResult]], count: Optional[int] = None
+) -> list[SearchResult]:
+    """
+    Interleaves the results of several engines by rank and drops repeated links,
+    so the top result of every engine comes before anyone's second result.
+    """
+    merged = []
+    seen = set()
+    for rank in range(max((len(r) for r in results), default=0)):
+        for engine_results in results:
+            if rank < len(engine_results):
+                result = engine_results[rank]
+                if result.link not in seen:
+                    seen.add(result.link)
+                    merged.append(result)
+    return merged[:count] if count else merged
@@ -2,15 +2,18 @@ import logging
 from typing import Optional
 from urllib.parse import urlencode
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    request_json,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def search_searchapi(
+async def search_searchapi(
     api_key: str,
     engine: str,
     query: str,
@@ -30,9 +33,7 @@ def search_searchapi(
     payload = {"engine": engine, "q": query, "api_key": api_key}
 
     url = f"{url}?{urlencode(payload)}"
-    response = requests.request("GET", url)
-
-    json_response = response.json()
+    json_response = await request_json("GET", url, raise_for_status=False)
     log.info(f"results from searchapi search: {json_response}")
 
     results = sorted(
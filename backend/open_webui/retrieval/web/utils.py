@@ -2,9 +2,11 @@ import asyncio
 import logging
 import socket
 import ssl
+import threading
+import time as time_module
 import urllib.parse
 import urllib.request
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, time, timedelta
 from typing import (
     Any,
@@ -35,6 +37,8 @@ from open_webui.config import (
     FIRECRAWL_API_KEY,
     TAVILY_API_KEY,
     TAVILY_EXTRACT_DEPTH,
+    WEB_LOADER_CACHE_MAX_SIZE_MB,
+    WEB_LOADER_CACHE_TTL,
 )
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -117,6 +121,74 @@ def verify_ssl_cert(url: str) -> bool:
         return False
 
 
+class WebPageCache:
+    """
+    Size-bounded LRU cache of loaded web pages keyed by URL. Entries remember the
+    ETag/Last-Modified of the response so stale pages can be revalidated with a
+    conditional request instead of being downloaded and parsed again.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time_module.time() - entry["validated_at"] < self.ttl
+
+    def put(
+        self,
+        url: str,
+        docs: list[Document],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        size = sum(len(doc.page_content.encode("utf-8")) for doc in docs)
+        if size > self.max_size:
+            return
+
+        with self.lock:
+            self._pop(url)
+            self.entries[url] = {
+                "docs": docs,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": size,
+                "validated_at": time_module.time(),
+            }
+            self.size += size
+
+            while self.size > self.max_size and self.entries:
+                self._pop(next(iter(self.entries)))
+
+    def touch(self, url: str) -> None:
+        with self.lock:
+            if entry := self.entries.get(url):
+                entry["validated_at"] = time_module.time()
+
+    def _pop(self, url: str) -> None:
+        entry = self.entries.pop(url, None)
+        if entry is not None:
+            self.size -= entry["size"]
+
+
+WEB_PAGE_CACHE = WebPageCache(
+    max_size=WEB_LOADER_CACHE_MAX_SIZE_MB * 1024 * 1024, ttl=WEB_LOADER_CACHE_TTL
+)
+
+# Returned by SafeWebBaseLoader._fetch when the cached copy is still current
+NOT_MODIFIED = object()
+
+
 class RateLimitMixin:
     async def _wait_for_rate_limit(self):
         """Wait to respect the rate limit if specified."""
@@ -484,14 +556,24 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
 class SafeWebBaseLoader(WebBaseLoader):
     """WebBaseLoader with enhanced error handling for URLs."""
 
-    def __init__(self, trust_env: bool = False, *args, **kwargs):
+    def __init__(
+        self,
+        trust_env: bool = False,
+        cache: Optional[WebPageCache] = None,
+        *args,
+        **kwargs,
+    ):
         """Initialize SafeWebBaseLoader
         Args:
             trust_env (bool, optional): set to True if using proxy to make web requests, for example
                 using http(s)_proxy environment variables. Defaults to False.
+            cache (WebPageCache, optional): cache to revalidate against and store loaded pages in.
         """
         super().__init__(*args, **kwargs)
         self.trust_env = trust_env
+        self.cache = cache
+        # Validators of the pages fetched successfully, by URL
+        self.validators: dict[str, tuple[Optional[str], Optional[str]]] = {}
 
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
@@ -506,12 +588,28 @@ class SafeWebBaseLoader(WebBaseLoader):
                     if not self.session.verify:
                         kwargs["ssl"] = False
 
+                    cached = self.cache.get(url) if self.cache else None
+                    if cached:
+                        headers = dict(kwargs["headers"])
+                        if cached["etag"]:
+                            headers["If-None-Match"] = cached["etag"]
+                        if cached["last_modified"]:
+                            headers["If-Modified-Since"] = cached["last_modified"]
+                        kwargs["headers"] = headers
+
                     async with session.get(
                         url, **(self.requests_kwargs | kwargs)
                     ) as response:
+                        if cached and response.status == 304:
+                            return NOT_MODIFIED
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
+                        text = await response.text()
+                        self.validators[url] = (
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                        )
+                        return text
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
                         raise
@@ -565,8 +663,17 @@ class SafeWebBaseLoader(WebBaseLoader):
 
     async def alazy_load(self) -> AsyncIterator[Document]:
         """Async lazy load text from the url(s) in web_path."""
-        results = await self.ascrape_all(self.web_paths)
-        for path, soup in zip(self.web_paths, results):
+        results = await self.fetch_all(self.web_paths)
+        for path, result in zip(self.web_paths, results):
+            if result is NOT_MODIFIED:
+                # The entry may have been evicted since the request was sent
+                if entry := self.cache.get(path):
+                    self.cache.touch(path)
+                    for document in entry["docs"]:
+                        yield document
+                continue
+
+            soup = self._unpack_fetch_results([result], [path])[0]
             text = soup.get_text(**self.bs_get_text_kwargs)
             metadata = {"source": path}
             if title := soup.find("title"):
@@ -577,7 +684,11 @@ class SafeWebBaseLoader(WebBaseLoader):
                 )
             if html := soup.find("html"):
                 metadata["language"] = html.get("lang", "No language found.")
-            yield Document(page_content=text, metadata=metadata)
+            document = Document(page_content=text, metadata=metadata)
+
+            if self.cache and path in self.validators:
+                self.cache.put(path, [document], *self.validators[path])
+            yield document
 
     async def aload(self) -> list[Document]:
         """Load data into Document objects."""
@@ -589,6 +700,7 @@ def get_web_loader(
     verify_ssl: bool = True,
     requests_per_second: int = 2,
     trust_env: bool = False,
+    cache: Optional[WebPageCache] = None,
 ):
     # Check if the URLs are valid
     safe_urls = safe_validate_urls([urls] if isinstance(urls, str) else urls)
@@ -603,6 +715,7 @@ def get_web_loader(
 
     if WEB_LOADER_ENGINE.value == "" or WEB_LOADER_ENGINE.value == "safe_web":
         WebLoaderClass = SafeWebBaseLoader
+        web_loader_args["cache"] = cache
     if WEB_LOADER_ENGINE.value == "playwright":
         WebLoaderClass = SafePlaywrightURLLoader
         web_loader_args["playwright_timeout"] = PLAYWRIGHT_TIMEOUT.value * 1000
@@ -634,3 +747,57 @@ def get_web_loader(
             f"Invalid WEB_LOADER_ENGINE: {WEB_LOADER_ENGINE.value}. "
             "Please set it to 'safe_web', 'playwright', 'firecrawl', or 'tavily'."
         )
+
+
+async def load_web_documents(
+    urls: Sequence[str],
+    verify_ssl: bool = True,
+    requests_per_second: int = 2,
+    trust_env: bool = False,
+) -> list[Document]:
+    """
+    Loads the given URLs through the configured web loader, serving pages from
+    WEB_PAGE_CACHE while they're fresh. With the default loader stale pages are
+    revalidated with a conditional request, other loaders fetch them again.
+    """
+    safe_urls = list(dict.fromkeys(safe_validate_urls(urls)))
+
+    cached_docs = {}
+    pending_urls = []
+    for url in safe_urls:
+        entry = WEB_PAGE_CACHE.get(url)
+        if entry and WEB_PAGE_CACHE.is_fresh(entry):
+            cached_docs[url] = entry["docs"]
+        else:
+            pending_urls.append(url)
+
+    loaded_docs = []
+    if pending_urls:
+        loader = get_web_loader(
+            pending_urls,
+            verify_ssl=verify_ssl,
+            requests_per_second=requests_per_second,
+            trust_env=trust_env,
+            cache=WEB_PAGE_CACHE,
+        )
+        loaded_docs = await loader.aload()
+
+        if not isinstance(loader, SafeWebBaseLoader):
+            docs_by_url = defaultdict(list)
+            for doc in loaded_docs:
+                docs_by_url[doc.metadata.get("source")].append(doc)
+            for url in pending_urls:
+                if docs_by_url.get(url):
+                    WEB_PAGE_CACHE.put(url, docs_by_url[url])
+
+    # Keep the order of the search results
+    docs = []
+    for url in safe_urls:
+        if url in cached_docs:
+            docs.extend(cached_docs[url])
+        else:
+            docs.extend(doc for doc in loaded_docs if doc.metadata.get("source") == url)
+    docs.extend(
+        doc for doc in loaded_docs if doc.metadata.get("source") not in safe_urls
+    )
+    return docs
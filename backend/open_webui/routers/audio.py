@@ -189,27 +189,34 @@ async def get_audio_config(request: Request, user=Depends(get_admin_user)):
 async def update_audio_config(
     request: Request, form_data: AudioConfigUpdateForm, user=Depends(get_admin_user)
 ):
-    request.app.state.config.TTS_OPENAI_API_BASE_URL = form_data.tts.OPENAI_API_BASE_URL
-    request.app.state.config.TTS_OPENAI_API_KEY = form_data.tts.OPENAI_API_KEY
-    request.app.state.config.TTS_API_KEY = form_data.tts.API_KEY
-    request.app.state.config.TTS_ENGINE = form_data.tts.ENGINE
-    request.app.state.config.TTS_MODEL = form_data.tts.MODEL
-    request.app.state.config.TTS_VOICE = form_data.tts.VOICE
-    request.app.state.config.TTS_SPLIT_ON = form_data.tts.SPLIT_ON
-    request.app.state.config.TTS_AZURE_SPEECH_REGION = form_data.tts.AZURE_SPEECH_REGION
-    request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = (
-        form_data.tts.AZURE_SPEECH_OUTPUT_FORMAT
-    )
-
-    request.app.state.config.STT_OPENAI_API_BASE_URL = form_data.stt.OPENAI_API_BASE_URL
-    request.app.state.config.STT_OPENAI_API_KEY = form_data.stt.OPENAI_API_KEY
-    request.app.state.config.STT_ENGINE = form_data.stt.ENGINE
-    request.app.state.config.STT_MODEL = form_data.stt.MODEL
-    request.app.state.config.WHISPER_MODEL = form_data.stt.WHISPER_MODEL
-    request.app.state.config.DEEPGRAM_API_KEY = form_data.stt.DEEPGRAM_API_KEY
-    request.app.state.config.AUDIO_STT_AZURE_API_KEY = form_data.stt.AZURE_API_KEY
-    request.app.state.config.AUDIO_STT_AZURE_REGION = form_data.stt.AZURE_REGION
-    request.app.state.config.AUDIO_STT_AZURE_LOCALES = form_data.stt.AZURE_LOCALES
+    with request.app.state.config.batch():
+        request.app.state.config.TTS_OPENAI_API_BASE_URL = (
+            form_data.tts.OPENAI_API_BASE_URL
+        )
+        request.app.state.config.TTS_OPENAI_API_KEY = form_data.tts.OPENAI_API_KEY
+        request.app.state.config.TTS_API_KEY = form_data.tts.API_KEY
+        request.app.state.config.TTS_ENGINE = form_data.tts.ENGINE
+        request.app.state.config.TTS_MODEL = form_data.tts.MODEL
+        request.app.state.config.TTS_VOICE = form_data.tts.VOICE
+        request.app.state.config.TTS_SPLIT_ON = form_data.tts.SPLIT_ON
+        request.app.state.config.TTS_AZURE_SPEECH_REGION = (
+            form_data.tts.AZURE_SPEECH_REGION
+        )
+        request.app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = (
+            form_data.tts.AZURE_SPEECH_OUTPUT_FORMAT
+        )
+
+        request.app.state.config.STT_OPENAI_API_BASE_URL = (
+            form_data.stt.OPENAI_API_BASE_URL
+        )
+        request.app.state.config.STT_OPENAI_API_KEY = form_data.stt.OPENAI_API_KEY
+        request.app.state.config.STT_ENGINE = form_data.stt.ENGINE
+        request.app.state.config.STT_MODEL = form_data.stt.MODEL
+        request.app.state.config.WHISPER_MODEL = form_data.stt.WHISPER_MODEL
+        request.app.state.config.DEEPGRAM_API_KEY = form_data.stt.DEEPGRAM_API_KEY
+        request.app.state.config.AUDIO_STT_AZURE_API_KEY = form_data.stt.AZURE_API_KEY
+        request.app.state.config.AUDIO_STT_AZURE_REGION = form_data.stt.AZURE_REGION
+        request.app.state.config.AUDIO_STT_AZURE_LOCALES = form_data.stt.AZURE_LOCALES
 
     if request.app.state.config.STT_ENGINE == "":
         request.app.state.faster_whisper_model = set_faster_whisper_model(
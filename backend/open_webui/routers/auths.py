@@ -42,7 +42,7 @@ from open_webui.utils.auth import (
     get_current_user,
     get_password_hash,
 )
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import Webhooks
 from open_webui.utils.access_control import get_permissions
 
 from typing import Optional, List
@@ -524,9 +524,9 @@ async def signup(request: Request, response: Response, form_data: SignupForm):
             )
 
             if request.app.state.config.WEBHOOK_URL:
-                post_webhook(
+                Webhooks.enqueue(
                     request.app.state.WEBUI_NAME,
-                    request.app.state.config.WEBHOOK_URL,
+                    [request.app.state.config.WEBHOOK_URL],
                     WEBHOOK_MESSAGES.USER_SIGNUP(user.name),
                     {
                         "action": "signup",
@@ -709,35 +709,36 @@ class AdminConfig(BaseModel):
 async def update_admin_config(
     request: Request, form_data: AdminConfig, user=Depends(get_admin_user)
 ):
-    request.app.state.config.SHOW_ADMIN_DETAILS = form_data.SHOW_ADMIN_DETAILS
-    request.app.state.config.WEBUI_URL = form_data.WEBUI_URL
-    request.app.state.config.ENABLE_SIGNUP = form_data.ENABLE_SIGNUP
-
-    request.app.state.config.ENABLE_API_KEY = form_data.ENABLE_API_KEY
-    request.app.state.config.ENABLE_API_KEY_ENDPOINT_RESTRICTIONS = (
-        form_data.ENABLE_API_KEY_ENDPOINT_RESTRICTIONS
-    )
-    request.app.state.config.API_KEY_ALLOWED_ENDPOINTS = (
-        form_data.API_KEY_ALLOWED_ENDPOINTS
-    )
+    with request.app.state.config.batch():
+        request.app.state.config.SHOW_ADMIN_DETAILS = form_data.SHOW_ADMIN_DETAILS
+        request.app.state.config.WEBUI_URL = form_data.WEBUI_URL
+        request.app.state.config.ENABLE_SIGNUP = form_data.ENABLE_SIGNUP
+
+        request.app.state.config.ENABLE_API_KEY = form_data.ENABLE_API_KEY
+        request.app.state.config.ENABLE_API_KEY_ENDPOINT_RESTRICTIONS = (
+            form_data.ENABLE_API_KEY_ENDPOINT_RESTRICTIONS
+        )
+        request.app.state.config.API_KEY_ALLOWED_ENDPOINTS = (
+            form_data.API_KEY_ALLOWED_ENDPOINTS
+        )
 
-    request.app.state.config.ENABLE_CHANNELS = form_data.ENABLE_CHANNELS
+        request.app.state.config.ENABLE_CHANNELS = form_data.ENABLE_CHANNELS
 
-    if form_data.DEFAULT_USER_ROLE in ["pending", "user", "admin"]:
-        request.app.state.config.DEFAULT_USER_ROLE = form_data.DEFAULT_USER_ROLE
+        if form_data.DEFAULT_USER_ROLE in ["pending", "user", "admin"]:
+            request.app.state.config.DEFAULT_USER_ROLE = form_data.DEFAULT_USER_ROLE
 
-    pattern = r"^(-1|0|(-?\d+(\.\d+)?)(ms|s|m|h|d|w))$"
+        pattern = r"^(-1|0|(-?\d+(\.\d+)?)(ms|s|m|h|d|w))$"
 
-    # Check if the input string matches the pattern
-    if re.match(pattern, form_data.JWT_EXPIRES_IN):
-        request.app.state.config.JWT_EXPIRES_IN = form_data.JWT_EXPIRES_IN
+        # Check if the input string matches the pattern
+        if re.match(pattern, form_data.JWT_EXPIRES_IN):
+            request.app.state.config.JWT_EXPIRES_IN = form_data.JWT_EXPIRES_IN
 
-    request.app.state.config.ENABLE_COMMUNITY_SHARING = (
-        form_data.ENABLE_COMMUNITY_SHARING
-    )
-    request.app.state.config.ENABLE_MESSAGE_RATING = form_data.ENABLE_MESSAGE_RATING
+        request.app.state.config.ENABLE_COMMUNITY_SHARING = (
+            form_data.ENABLE_COMMUNITY_SHARING
+        )
+        request.app.state.config.ENABLE_MESSAGE_RATING = form_data.ENABLE_MESSAGE_RATING
 
-    request.app.state.config.ENABLE_USER_WEBHOOKS = form_data.ENABLE_USER_WEBHOOKS
+        request.app.state.config.ENABLE_USER_WEBHOOKS = form_data.ENABLE_USER_WEBHOOKS
 
     return {
         "SHOW_ADMIN_DETAILS": request.app.state.config.SHOW_ADMIN_DETAILS,
@@ -806,20 +807,21 @@ async def update_ldap_server(
         if not value:
             raise HTTPException(400, detail=f"Required field {key} is empty")
 
-    request.app.state.config.LDAP_SERVER_LABEL = form_data.label
-    request.app.state.config.LDAP_SERVER_HOST = form_data.host
-    request.app.state.config.LDAP_SERVER_PORT = form_data.port
-    request.app.state.config.LDAP_ATTRIBUTE_FOR_MAIL = form_data.attribute_for_mail
-    request.app.state.config.LDAP_ATTRIBUTE_FOR_USERNAME = (
-        form_data.attribute_for_username
-    )
-    request.app.state.config.LDAP_APP_DN = form_data.app_dn
-    request.app.state.config.LDAP_APP_PASSWORD = form_data.app_dn_password
-    request.app.state.config.LDAP_SEARCH_BASE = form_data.search_base
-    request.app.state.config.LDAP_SEARCH_FILTERS = form_data.search_filters
-    request.app.state.config.LDAP_USE_TLS = form_data.use_tls
-    request.app.state.config.LDAP_CA_CERT_FILE = form_data.certificate_path
-    request.app.state.config.LDAP_CIPHERS = form_data.ciphers
+    with request.app.state.config.batch():
+        request.app.state.config.LDAP_SERVER_LABEL = form_data.label
+        request.app.state.config.LDAP_SERVER_HOST = form_data.host
+        request.app.state.config.LDAP_SERVER_PORT = form_data.port
+        request.app.state.config.LDAP_ATTRIBUTE_FOR_MAIL = form_data.attribute_for_mail
+        request.app.state.config.LDAP_ATTRIBUTE_FOR_USERNAME = (
+            form_data.attribute_for_username
+        )
+        request.app.state.config.LDAP_APP_DN = form_data.app_dn
+        request.app.state.config.LDAP_APP_PASSWORD = form_data.app_dn_password
+        request.app.state.config.LDAP_SEARCH_BASE = form_data.search_base
+        request.app.state.config.LDAP_SEARCH_FILTERS = form_data.search_filters
+        request.app.state.config.LDAP_USE_TLS = form_data.use_tls
+        request.app.state.config.LDAP_CA_CERT_FILE = form_data.certificate_path
+        request.app.state.config.LDAP_CIPHERS = form_data.ciphers
 
     return {
         "label": request.app.state.config.LDAP_SERVER_LABEL,
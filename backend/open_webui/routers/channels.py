@@ -4,6 +4,7 @@ from typing import Optional
 
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 
@@ -26,7 +27,7 @@ from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, get_users_with_access
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import Webhooks
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -143,42 +144,36 @@ class MessageUserResponse(MessageResponse):
     user: UserNameResponse
 
 
-@router.get("/{id}/messages", response_model=list[MessageUserResponse])
-async def get_channel_messages(
-    id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
-):
-    channel = Channels.get_channel_by_id(id)
-    if not channel:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
-        )
-
-    if user.role != "admin" and not has_access(
-        user.id, type="read", access_control=channel.access_control
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
+def get_message_user_responses(
+    message_list: list[MessageModel], with_replies: bool = True
+) -> list[MessageUserResponse]:
+    """
+    Add reply counts, reactions and users to a page of messages, with one
+    query for each instead of one per message.
+    """
+    message_ids = [message.id for message in message_list]
+    reply_counts = (
+        Messages.get_reply_counts_by_message_ids(message_ids) if with_replies else {}
+    )
+    reactions = Messages.get_reactions_by_message_ids(message_ids)
+    users = {
+        user.id: user
+        for user in Users.get_users_by_user_ids(
+            list({message.user_id for message in message_list})
         )
-
-    message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
+    }
 
     messages = []
     for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        replies = Messages.get_replies_by_message_id(message.id)
-        latest_reply_at = replies[0].created_at if replies else None
+        reply_count, latest_reply_at = reply_counts.get(message.id, (0, None))
 
         messages.append(
             MessageUserResponse(
                 **{
                     **message.model_dump(),
-                    "reply_count": len(replies),
+                    "reply_count": reply_count,
                     "latest_reply_at": latest_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
+                    "reactions": reactions.get(message.id, []),
                     "user": UserNameResponse(**users[message.user_id].model_dump()),
                 }
             )
@@ -187,35 +182,59 @@ async def get_channel_messages(
     return messages
 
 
+@router.get("/{id}/messages", response_model=list[MessageUserResponse])
+async def get_channel_messages(
+    id: str,
+    skip: int = 0,
+    limit: int = 50,
+    before_id: Optional[str] = None,
+    user=Depends(get_verified_user),
+):
+    channel = Channels.get_channel_by_id(id)
+    if not channel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
+        )
+
+    if user.role != "admin" and not has_access(
+        user.id, type="read", access_control=channel.access_control
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
+        )
+
+    message_list = Messages.get_messages_by_channel_id(id, skip, limit, before_id)
+    return get_message_user_responses(message_list)
+
+
 ############################
 # PostNewMessage
 ############################
 
 
 async def send_notification(name, webui_url, channel, message, active_user_ids):
-    users = get_users_with_access("read", channel.access_control)
-
-    for user in users:
-        if user.id in active_user_ids:
-            continue
-        else:
-            if user.settings:
-                webhook_url = user.settings.ui.get("notifications", {}).get(
-                    "webhook_url", None
-                )
+    users = await run_in_threadpool(
+        get_users_with_access, "read", channel.access_control
+    )
 
-                if webhook_url:
-                    post_webhook(
-                        name,
-                        webhook_url,
-                        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
-                        {
-                            "action": "channel",
-                            "message": message.content,
-                            "title": channel.name,
-                            "url": f"{webui_url}/channels/{channel.id}",
-                        },
-                    )
+    webhook_urls = [
+        user.settings.ui.get("notifications", {}).get("webhook_url", None)
+        for user in users
+        if user.id not in active_user_ids and user.settings
+    ]
+
+    # Delivered in the background, identical URLs only once
+    Webhooks.enqueue(
+        name,
+        webhook_urls,
+        f"#{channel.name} - {webui_url}/channels/{channel.id}\n\n{message.content}",
+        {
+            "action": "channel",
+            "message": message.content,
+            "title": channel.name,
+            "url": f"{webui_url}/channels/{channel.id}",
+        },
+    )
 
 
 @router.post("/{id}/messages/post", response_model=Optional[MessageModel])
@@ -299,7 +318,7 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
+            active_user_ids = await get_user_ids_from_room(f"channel:{channel.id}")
 
             background_tasks.add_task(
                 send_notification,
@@ -374,6 +393,7 @@ async def get_channel_thread_messages(
     message_id: str,
     skip: int = 0,
     limit: int = 50,
+    before_id: Optional[str] = None,
     user=Depends(get_verified_user),
 ):
     channel = Channels.get_channel_by_id(id)
@@ -389,28 +409,11 @@ async def get_channel_thread_messages(
             status_code=status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.DEFAULT()
         )
 
-    message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    message_list = Messages.get_messages_by_parent_id(
+        id, message_id, skip, limit, before_id
+    )
+    # The thread view shows no reply counts
+    return get_message_user_responses(message_list, with_replies=False)
 
 
 ############################
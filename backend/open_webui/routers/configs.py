@@ -184,48 +184,53 @@ async def set_code_execution_config(
     request: Request, form_data: CodeInterpreterConfigForm, user=Depends(get_admin_user)
 ):
 
-    request.app.state.config.ENABLE_CODE_EXECUTION = form_data.ENABLE_CODE_EXECUTION
+    with request.app.state.config.batch():
+        request.app.state.config.ENABLE_CODE_EXECUTION = form_data.ENABLE_CODE_EXECUTION
 
-    request.app.state.config.CODE_EXECUTION_ENGINE = form_data.CODE_EXECUTION_ENGINE
-    request.app.state.config.CODE_EXECUTION_JUPYTER_URL = (
-        form_data.CODE_EXECUTION_JUPYTER_URL
-    )
-    request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH = (
-        form_data.CODE_EXECUTION_JUPYTER_AUTH
-    )
-    request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH_TOKEN = (
-        form_data.CODE_EXECUTION_JUPYTER_AUTH_TOKEN
-    )
-    request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH_PASSWORD = (
-        form_data.CODE_EXECUTION_JUPYTER_AUTH_PASSWORD
-    )
-    request.app.state.config.CODE_EXECUTION_JUPYTER_TIMEOUT = (
-        form_data.CODE_EXECUTION_JUPYTER_TIMEOUT
-    )
+        request.app.state.config.CODE_EXECUTION_ENGINE = form_data.CODE_EXECUTION_ENGINE
+        request.app.state.config.CODE_EXECUTION_JUPYTER_URL = (
+            form_data.CODE_EXECUTION_JUPYTER_URL
+        )
+        request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH = (
+            form_data.CODE_EXECUTION_JUPYTER_AUTH
+        )
+        request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH_TOKEN = (
+            form_data.CODE_EXECUTION_JUPYTER_AUTH_TOKEN
+        )
+        request.app.state.config.CODE_EXECUTION_JUPYTER_AUTH_PASSWORD = (
+            form_data.CODE_EXECUTION_JUPYTER_AUTH_PASSWORD
+        )
+        request.app.state.config.CODE_EXECUTION_JUPYTER_TIMEOUT = (
+            form_data.CODE_EXECUTION_JUPYTER_TIMEOUT
+        )
 
-    request.app.state.config.ENABLE_CODE_INTERPRETER = form_data.ENABLE_CODE_INTERPRETER
-    request.app.state.config.CODE_INTERPRETER_ENGINE = form_data.CODE_INTERPRETER_ENGINE
-    request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE = (
-        form_data.CODE_INTERPRETER_PROMPT_TEMPLATE
-    )
+        request.app.state.config.ENABLE_CODE_INTERPRETER = (
+            form_data.ENABLE_CODE_INTERPRETER
+        )
+        request.app.state.config.CODE_INTERPRETER_ENGINE = (
+            form_data.CODE_INTERPRETER_ENGINE
+        )
+        request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE = (
+            form_data.CODE_INTERPRETER_PROMPT_TEMPLATE
+        )
 
-    request.app.state.config.CODE_INTERPRETER_JUPYTER_URL = (
-        form_data.CODE_INTERPRETER_JUPYTER_URL
-    )
+        request.app.state.config.CODE_INTERPRETER_JUPYTER_URL = (
+            form_data.CODE_INTERPRETER_JUPYTER_URL
+        )
 
-    request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH = (
-        form_data.CODE_INTERPRETER_JUPYTER_AUTH
-    )
+        request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH = (
+            form_data.CODE_INTERPRETER_JUPYTER_AUTH
+        )
 
-    request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH_TOKEN = (
-        form_data.CODE_INTERPRETER_JUPYTER_AUTH_TOKEN
-    )
-    request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH_PASSWORD = (
-        form_data.CODE_INTERPRETER_JUPYTER_AUTH_PASSWORD
-    )
-    request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT = (
-        form_data.CODE_INTERPRETER_JUPYTER_TIMEOUT
-    )
+        request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH_TOKEN = (
+            form_data.CODE_INTERPRETER_JUPYTER_AUTH_TOKEN
+        )
+        request.app.state.config.CODE_INTERPRETER_JUPYTER_AUTH_PASSWORD = (
+            form_data.CODE_INTERPRETER_JUPYTER_AUTH_PASSWORD
+        )
+        request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT = (
+            form_data.CODE_INTERPRETER_JUPYTER_TIMEOUT
+        )
 
     return {
         "ENABLE_CODE_EXECUTION": request.app.state.config.ENABLE_CODE_EXECUTION,
@@ -266,8 +271,9 @@ async def get_models_config(request: Request, user=Depends(get_admin_user)):
 async def set_models_config(
     request: Request, form_data: ModelsConfigForm, user=Depends(get_admin_user)
 ):
-    request.app.state.config.DEFAULT_MODELS = form_data.DEFAULT_MODELS
-    request.app.state.config.MODEL_ORDER_LIST = form_data.MODEL_ORDER_LIST
+    with request.app.state.config.batch():
+        request.app.state.config.DEFAULT_MODELS = form_data.DEFAULT_MODELS
+        request.app.state.config.MODEL_ORDER_LIST = form_data.MODEL_ORDER_LIST
     return {
         "DEFAULT_MODELS": request.app.state.config.DEFAULT_MODELS,
         "MODEL_ORDER_LIST": request.app.state.config.MODEL_ORDER_LIST,
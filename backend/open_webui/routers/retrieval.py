@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
 import mimetypes
 import os
 import shutil
+import threading
 
 import uuid
 from datetime import datetime
@@ -41,8 +43,8 @@ from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
-from open_webui.retrieval.web.main import SearchResult
-from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.main import SearchResult, merge_search_results
+from open_webui.retrieval.web.utils import get_web_loader, load_web_documents
 from open_webui.retrieval.web.brave import search_brave
 from open_webui.retrieval.web.kagi import search_kagi
 from open_webui.retrieval.web.mojeek import search_mojeek
@@ -245,30 +247,31 @@ async def update_embedding_config(
         f"Updating embedding model: {request.app.state.config.RAG_EMBEDDING_MODEL} to {form_data.embedding_model}"
     )
     try:
-        request.app.state.config.RAG_EMBEDDING_ENGINE = form_data.embedding_engine
-        request.app.state.config.RAG_EMBEDDING_MODEL = form_data.embedding_model
+        with request.app.state.config.batch():
+            request.app.state.config.RAG_EMBEDDING_ENGINE = form_data.embedding_engine
+            request.app.state.config.RAG_EMBEDDING_MODEL = form_data.embedding_model
+
+            if request.app.state.config.RAG_EMBEDDING_ENGINE in ["ollama", "openai"]:
+                if form_data.openai_config is not None:
+                    request.app.state.config.RAG_OPENAI_API_BASE_URL = (
+                        form_data.openai_config.url
+                    )
+                    request.app.state.config.RAG_OPENAI_API_KEY = (
+                        form_data.openai_config.key
+                    )
 
-        if request.app.state.config.RAG_EMBEDDING_ENGINE in ["ollama", "openai"]:
-            if form_data.openai_config is not None:
-                request.app.state.config.RAG_OPENAI_API_BASE_URL = (
-                    form_data.openai_config.url
-                )
-                request.app.state.config.RAG_OPENAI_API_KEY = (
-                    form_data.openai_config.key
-                )
+                if form_data.ollama_config is not None:
+                    request.app.state.config.RAG_OLLAMA_BASE_URL = (
+                        form_data.ollama_config.url
+                    )
+                    request.app.state.config.RAG_OLLAMA_API_KEY = (
+                        form_data.ollama_config.key
+                    )
 
-            if form_data.ollama_config is not None:
-                request.app.state.config.RAG_OLLAMA_BASE_URL = (
-                    form_data.ollama_config.url
-                )
-                request.app.state.config.RAG_OLLAMA_API_KEY = (
-                    form_data.ollama_config.key
+                request.app.state.config.RAG_EMBEDDING_BATCH_SIZE = (
+                    form_data.embedding_batch_size
                 )
 
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE = (
-                form_data.embedding_batch_size
-            )
-
         request.app.state.ef = get_ef(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
             request.app.state.config.RAG_EMBEDDING_MODEL,
@@ -510,206 +513,215 @@ class ConfigForm(BaseModel):
 async def update_rag_config(
     request: Request, form_data: ConfigForm, user=Depends(get_admin_user)
 ):
-    # RAG settings
-    request.app.state.config.RAG_TEMPLATE = (
-        form_data.RAG_TEMPLATE
-        if form_data.RAG_TEMPLATE is not None
-        else request.app.state.config.RAG_TEMPLATE
-    )
-    request.app.state.config.TOP_K = (
-        form_data.TOP_K
-        if form_data.TOP_K is not None
-        else request.app.state.config.TOP_K
-    )
-    request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL = (
-        form_data.BYPASS_EMBEDDING_AND_RETRIEVAL
-        if form_data.BYPASS_EMBEDDING_AND_RETRIEVAL is not None
-        else request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
-    )
-    request.app.state.config.RAG_FULL_CONTEXT = (
-        form_data.RAG_FULL_CONTEXT
-        if form_data.RAG_FULL_CONTEXT is not None
-        else request.app.state.config.RAG_FULL_CONTEXT
-    )
-
-    # Hybrid search settings
-    request.app.state.config.ENABLE_RAG_HYBRID_SEARCH = (
-        form_data.ENABLE_RAG_HYBRID_SEARCH
-        if form_data.ENABLE_RAG_HYBRID_SEARCH is not None
-        else request.app.state.config.ENABLE_RAG_HYBRID_SEARCH
-    )
-    # Free up memory if hybrid search is disabled
-    if not request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
-        request.app.state.rf = None
-
-    request.app.state.config.TOP_K_RERANKER = (
-        form_data.TOP_K_RERANKER
-        if form_data.TOP_K_RERANKER is not None
-        else request.app.state.config.TOP_K_RERANKER
-    )
-    request.app.state.config.RELEVANCE_THRESHOLD = (
-        form_data.RELEVANCE_THRESHOLD
-        if form_data.RELEVANCE_THRESHOLD is not None
-        else request.app.state.config.RELEVANCE_THRESHOLD
-    )
-
-    # Content extraction settings
-    request.app.state.config.CONTENT_EXTRACTION_ENGINE = (
-        form_data.CONTENT_EXTRACTION_ENGINE
-        if form_data.CONTENT_EXTRACTION_ENGINE is not None
-        else request.app.state.config.CONTENT_EXTRACTION_ENGINE
-    )
-    request.app.state.config.PDF_EXTRACT_IMAGES = (
-        form_data.PDF_EXTRACT_IMAGES
-        if form_data.PDF_EXTRACT_IMAGES is not None
-        else request.app.state.config.PDF_EXTRACT_IMAGES
-    )
-    request.app.state.config.TIKA_SERVER_URL = (
-        form_data.TIKA_SERVER_URL
-        if form_data.TIKA_SERVER_URL is not None
-        else request.app.state.config.TIKA_SERVER_URL
-    )
-    request.app.state.config.DOCLING_SERVER_URL = (
-        form_data.DOCLING_SERVER_URL
-        if form_data.DOCLING_SERVER_URL is not None
-        else request.app.state.config.DOCLING_SERVER_URL
-    )
-    request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT = (
-        form_data.DOCUMENT_INTELLIGENCE_ENDPOINT
-        if form_data.DOCUMENT_INTELLIGENCE_ENDPOINT is not None
-        else request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT
-    )
-    request.app.state.config.DOCUMENT_INTELLIGENCE_KEY = (
-        form_data.DOCUMENT_INTELLIGENCE_KEY
-        if form_data.DOCUMENT_INTELLIGENCE_KEY is not None
-        else request.app.state.config.DOCUMENT_INTELLIGENCE_KEY
-    )
-    request.app.state.config.MISTRAL_OCR_API_KEY = (
-        form_data.MISTRAL_OCR_API_KEY
-        if form_data.MISTRAL_OCR_API_KEY is not None
-        else request.app.state.config.MISTRAL_OCR_API_KEY
-    )
-
-    # Chunking settings
-    request.app.state.config.TEXT_SPLITTER = (
-        form_data.TEXT_SPLITTER
-        if form_data.TEXT_SPLITTER is not None
-        else request.app.state.config.TEXT_SPLITTER
-    )
-    request.app.state.config.CHUNK_SIZE = (
-        form_data.CHUNK_SIZE
-        if form_data.CHUNK_SIZE is not None
-        else request.app.state.config.CHUNK_SIZE
-    )
-    request.app.state.config.CHUNK_OVERLAP = (
-        form_data.CHUNK_OVERLAP
-        if form_data.CHUNK_OVERLAP is not None
-        else request.app.state.config.CHUNK_OVERLAP
-    )
-
-    # File upload settings
-    request.app.state.config.FILE_MAX_SIZE = (
-        form_data.FILE_MAX_SIZE
-        if form_data.FILE_MAX_SIZE is not None
-        else request.app.state.config.FILE_MAX_SIZE
-    )
-    request.app.state.config.FILE_MAX_COUNT = (
-        form_data.FILE_MAX_COUNT
-        if form_data.FILE_MAX_COUNT is not None
-        else request.app.state.config.FILE_MAX_COUNT
-    )
-
-    # Integration settings
-    request.app.state.config.ENABLE_GOOGLE_DRIVE_INTEGRATION = (
-        form_data.ENABLE_GOOGLE_DRIVE_INTEGRATION
-        if form_data.ENABLE_GOOGLE_DRIVE_INTEGRATION is not None
-        else request.app.state.config.ENABLE_GOOGLE_DRIVE_INTEGRATION
-    )
-    request.app.state.config.ENABLE_ONEDRIVE_INTEGRATION = (
-        form_data.ENABLE_ONEDRIVE_INTEGRATION
-        if form_data.ENABLE_ONEDRIVE_INTEGRATION is not None
-        else request.app.state.config.ENABLE_ONEDRIVE_INTEGRATION
-    )
+    with request.app.state.config.batch():
+        # RAG settings
+        request.app.state.config.RAG_TEMPLATE = (
+            form_data.RAG_TEMPLATE
+            if form_data.RAG_TEMPLATE is not None
+            else request.app.state.config.RAG_TEMPLATE
+        )
+        request.app.state.config.TOP_K = (
+            form_data.TOP_K
+            if form_data.TOP_K is not None
+            else request.app.state.config.TOP_K
+        )
+        request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL = (
+            form_data.BYPASS_EMBEDDING_AND_RETRIEVAL
+            if form_data.BYPASS_EMBEDDING_AND_RETRIEVAL is not None
+            else request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL
+        )
+        request.app.state.config.RAG_FULL_CONTEXT = (
+            form_data.RAG_FULL_CONTEXT
+            if form_data.RAG_FULL_CONTEXT is not None
+            else request.app.state.config.RAG_FULL_CONTEXT
+        )
 
-    if form_data.web is not None:
-        # Web search settings
-        request.app.state.config.ENABLE_WEB_SEARCH = form_data.web.ENABLE_WEB_SEARCH
-        request.app.state.config.WEB_SEARCH_ENGINE = form_data.web.WEB_SEARCH_ENGINE
-        request.app.state.config.WEB_SEARCH_TRUST_ENV = (
-            form_data.web.WEB_SEARCH_TRUST_ENV
+        # Hybrid search settings
+        request.app.state.config.ENABLE_RAG_HYBRID_SEARCH = (
+            form_data.ENABLE_RAG_HYBRID_SEARCH
+            if form_data.ENABLE_RAG_HYBRID_SEARCH is not None
+            else request.app.state.config.ENABLE_RAG_HYBRID_SEARCH
         )
-        request.app.state.config.WEB_SEARCH_RESULT_COUNT = (
-            form_data.web.WEB_SEARCH_RESULT_COUNT
+        # Free up memory if hybrid search is disabled
+        if not request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
+            request.app.state.rf = None
+
+        request.app.state.config.TOP_K_RERANKER = (
+            form_data.TOP_K_RERANKER
+            if form_data.TOP_K_RERANKER is not None
+            else request.app.state.config.TOP_K_RERANKER
         )
-        request.app.state.config.WEB_SEARCH_CONCURRENT_REQUESTS = (
-            form_data.web.WEB_SEARCH_CONCURRENT_REQUESTS
+        request.app.state.config.RELEVANCE_THRESHOLD = (
+            form_data.RELEVANCE_THRESHOLD
+            if form_data.RELEVANCE_THRESHOLD is not None
+            else request.app.state.config.RELEVANCE_THRESHOLD
         )
-        request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST = (
-            form_data.web.WEB_SEARCH_DOMAIN_FILTER_LIST
+
+        # Content extraction settings
+        request.app.state.config.CONTENT_EXTRACTION_ENGINE = (
+            form_data.CONTENT_EXTRACTION_ENGINE
+            if form_data.CONTENT_EXTRACTION_ENGINE is not None
+            else request.app.state.config.CONTENT_EXTRACTION_ENGINE
         )
-        request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL = (
-            form_data.web.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL
+        request.app.state.config.PDF_EXTRACT_IMAGES = (
+            form_data.PDF_EXTRACT_IMAGES
+            if form_data.PDF_EXTRACT_IMAGES is not None
+            else request.app.state.config.PDF_EXTRACT_IMAGES
         )
-        request.app.state.config.SEARXNG_QUERY_URL = form_data.web.SEARXNG_QUERY_URL
-        request.app.state.config.GOOGLE_PSE_API_KEY = form_data.web.GOOGLE_PSE_API_KEY
-        request.app.state.config.GOOGLE_PSE_ENGINE_ID = (
-            form_data.web.GOOGLE_PSE_ENGINE_ID
+        request.app.state.config.TIKA_SERVER_URL = (
+            form_data.TIKA_SERVER_URL
+            if form_data.TIKA_SERVER_URL is not None
+            else request.app.state.config.TIKA_SERVER_URL
         )
-        request.app.state.config.BRAVE_SEARCH_API_KEY = (
-            form_data.web.BRAVE_SEARCH_API_KEY
+        request.app.state.config.DOCLING_SERVER_URL = (
+            form_data.DOCLING_SERVER_URL
+            if form_data.DOCLING_SERVER_URL is not None
+            else request.app.state.config.DOCLING_SERVER_URL
         )
-        request.app.state.config.KAGI_SEARCH_API_KEY = form_data.web.KAGI_SEARCH_API_KEY
-        request.app.state.config.MOJEEK_SEARCH_API_KEY = (
-            form_data.web.MOJEEK_SEARCH_API_KEY
+        request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT = (
+            form_data.DOCUMENT_INTELLIGENCE_ENDPOINT
+            if form_data.DOCUMENT_INTELLIGENCE_ENDPOINT is not None
+            else request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT
         )
-        request.app.state.config.BOCHA_SEARCH_API_KEY = (
-            form_data.web.BOCHA_SEARCH_API_KEY
+        request.app.state.config.DOCUMENT_INTELLIGENCE_KEY = (
+            form_data.DOCUMENT_INTELLIGENCE_KEY
+            if form_data.DOCUMENT_INTELLIGENCE_KEY is not None
+            else request.app.state.config.DOCUMENT_INTELLIGENCE_KEY
         )
-        request.app.state.config.SERPSTACK_API_KEY = form_data.web.SERPSTACK_API_KEY
-        request.app.state.config.SERPSTACK_HTTPS = form_data.web.SERPSTACK_HTTPS
-        request.app.state.config.SERPER_API_KEY = form_data.web.SERPER_API_KEY
-        request.app.state.config.SERPLY_API_KEY = form_data.web.SERPLY_API_KEY
-        request.app.state.config.TAVILY_API_KEY = form_data.web.TAVILY_API_KEY
-        request.app.state.config.SEARCHAPI_API_KEY = form_data.web.SEARCHAPI_API_KEY
-        request.app.state.config.SEARCHAPI_ENGINE = form_data.web.SEARCHAPI_ENGINE
-        request.app.state.config.SERPAPI_API_KEY = form_data.web.SERPAPI_API_KEY
-        request.app.state.config.SERPAPI_ENGINE = form_data.web.SERPAPI_ENGINE
-        request.app.state.config.JINA_API_KEY = form_data.web.JINA_API_KEY
-        request.app.state.config.BING_SEARCH_V7_ENDPOINT = (
-            form_data.web.BING_SEARCH_V7_ENDPOINT
+        request.app.state.config.MISTRAL_OCR_API_KEY = (
+            form_data.MISTRAL_OCR_API_KEY
+            if form_data.MISTRAL_OCR_API_KEY is not None
+            else request.app.state.config.MISTRAL_OCR_API_KEY
         )
-        request.app.state.config.BING_SEARCH_V7_SUBSCRIPTION_KEY = (
-            form_data.web.BING_SEARCH_V7_SUBSCRIPTION_KEY
+
+        # Chunking settings
+        request.app.state.config.TEXT_SPLITTER = (
+            form_data.TEXT_SPLITTER
+            if form_data.TEXT_SPLITTER is not None
+            else request.app.state.config.TEXT_SPLITTER
         )
-        request.app.state.config.EXA_API_KEY = form_data.web.EXA_API_KEY
-        request.app.state.config.PERPLEXITY_API_KEY = form_data.web.PERPLEXITY_API_KEY
-        request.app.state.config.SOUGOU_API_SID = form_data.web.SOUGOU_API_SID
-        request.app.state.config.SOUGOU_API_SK = form_data.web.SOUGOU_API_SK
-
-        # Web loader settings
-        request.app.state.config.WEB_LOADER_ENGINE = form_data.web.WEB_LOADER_ENGINE
-        request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION = (
-            form_data.web.ENABLE_WEB_LOADER_SSL_VERIFICATION
+        request.app.state.config.CHUNK_SIZE = (
+            form_data.CHUNK_SIZE
+            if form_data.CHUNK_SIZE is not None
+            else request.app.state.config.CHUNK_SIZE
         )
-        request.app.state.config.PLAYWRIGHT_WS_URL = form_data.web.PLAYWRIGHT_WS_URL
-        request.app.state.config.PLAYWRIGHT_TIMEOUT = form_data.web.PLAYWRIGHT_TIMEOUT
-        request.app.state.config.FIRECRAWL_API_KEY = form_data.web.FIRECRAWL_API_KEY
-        request.app.state.config.FIRECRAWL_API_BASE_URL = (
-            form_data.web.FIRECRAWL_API_BASE_URL
+        request.app.state.config.CHUNK_OVERLAP = (
+            form_data.CHUNK_OVERLAP
+            if form_data.CHUNK_OVERLAP is not None
+            else request.app.state.config.CHUNK_OVERLAP
         )
-        request.app.state.config.TAVILY_EXTRACT_DEPTH = (
-            form_data.web.TAVILY_EXTRACT_DEPTH
+
+        # File upload settings
+        request.app.state.config.FILE_MAX_SIZE = (
+            form_data.FILE_MAX_SIZE
+            if form_data.FILE_MAX_SIZE is not None
+            else request.app.state.config.FILE_MAX_SIZE
         )
-        request.app.state.config.YOUTUBE_LOADER_LANGUAGE = (
-            form_data.web.YOUTUBE_LOADER_LANGUAGE
+        request.app.state.config.FILE_MAX_COUNT = (
+            form_data.FILE_MAX_COUNT
+            if form_data.FILE_MAX_COUNT is not None
+            else request.app.state.config.FILE_MAX_COUNT
         )
-        request.app.state.config.YOUTUBE_LOADER_PROXY_URL = (
-            form_data.web.YOUTUBE_LOADER_PROXY_URL
+
+        # Integration settings
+        request.app.state.config.ENABLE_GOOGLE_DRIVE_INTEGRATION = (
+            form_data.ENABLE_GOOGLE_DRIVE_INTEGRATION
+            if form_data.ENABLE_GOOGLE_DRIVE_INTEGRATION is not None
+            else request.app.state.config.ENABLE_GOOGLE_DRIVE_INTEGRATION
         )
-        request.app.state.YOUTUBE_LOADER_TRANSLATION = (
-            form_data.web.YOUTUBE_LOADER_TRANSLATION
+        request.app.state.config.ENABLE_ONEDRIVE_INTEGRATION = (
+            form_data.ENABLE_ONEDRIVE_INTEGRATION
+            if form_data.ENABLE_ONEDRIVE_INTEGRATION is not None
+            else request.app.state.config.ENABLE_ONEDRIVE_INTEGRATION
         )
 
+        if form_data.web is not None:
+            # Web search settings
+            request.app.state.config.ENABLE_WEB_SEARCH = form_data.web.ENABLE_WEB_SEARCH
+            request.app.state.config.WEB_SEARCH_ENGINE = form_data.web.WEB_SEARCH_ENGINE
+            request.app.state.config.WEB_SEARCH_TRUST_ENV = (
+                form_data.web.WEB_SEARCH_TRUST_ENV
+            )
+            request.app.state.config.WEB_SEARCH_RESULT_COUNT = (
+                form_data.web.WEB_SEARCH_RESULT_COUNT
+            )
+            request.app.state.config.WEB_SEARCH_CONCURRENT_REQUESTS = (
+                form_data.web.WEB_SEARCH_CONCURRENT_REQUESTS
+            )
+            request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST = (
+                form_data.web.WEB_SEARCH_DOMAIN_FILTER_LIST
+            )
+            request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL = (
+                form_data.web.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL
+            )
+            request.app.state.config.SEARXNG_QUERY_URL = form_data.web.SEARXNG_QUERY_URL
+            request.app.state.config.GOOGLE_PSE_API_KEY = (
+                form_data.web.GOOGLE_PSE_API_KEY
+            )
+            request.app.state.config.GOOGLE_PSE_ENGINE_ID = (
+                form_data.web.GOOGLE_PSE_ENGINE_ID
+            )
+            request.app.state.config.BRAVE_SEARCH_API_KEY = (
+                form_data.web.BRAVE_SEARCH_API_KEY
+            )
+            request.app.state.config.KAGI_SEARCH_API_KEY = (
+                form_data.web.KAGI_SEARCH_API_KEY
+            )
+            request.app.state.config.MOJEEK_SEARCH_API_KEY = (
+                form_data.web.MOJEEK_SEARCH_API_KEY
+            )
+            request.app.state.config.BOCHA_SEARCH_API_KEY = (
+                form_data.web.BOCHA_SEARCH_API_KEY
+            )
+            request.app.state.config.SERPSTACK_API_KEY = form_data.web.SERPSTACK_API_KEY
+            request.app.state.config.SERPSTACK_HTTPS = form_data.web.SERPSTACK_HTTPS
+            request.app.state.config.SERPER_API_KEY = form_data.web.SERPER_API_KEY
+            request.app.state.config.SERPLY_API_KEY = form_data.web.SERPLY_API_KEY
+            request.app.state.config.TAVILY_API_KEY = form_data.web.TAVILY_API_KEY
+            request.app.state.config.SEARCHAPI_API_KEY = form_data.web.SEARCHAPI_API_KEY
+            request.app.state.config.SEARCHAPI_ENGINE = form_data.web.SEARCHAPI_ENGINE
+            request.app.state.config.SERPAPI_API_KEY = form_data.web.SERPAPI_API_KEY
+            request.app.state.config.SERPAPI_ENGINE = form_data.web.SERPAPI_ENGINE
+            request.app.state.config.JINA_API_KEY = form_data.web.JINA_API_KEY
+            request.app.state.config.BING_SEARCH_V7_ENDPOINT = (
+                form_data.web.BING_SEARCH_V7_ENDPOINT
+            )
+            request.app.state.config.BING_SEARCH_V7_SUBSCRIPTION_KEY = (
+                form_data.web.BING_SEARCH_V7_SUBSCRIPTION_KEY
+            )
+            request.app.state.config.EXA_API_KEY = form_data.web.EXA_API_KEY
+            request.app.state.config.PERPLEXITY_API_KEY = (
+                form_data.web.PERPLEXITY_API_KEY
+            )
+            request.app.state.config.SOUGOU_API_SID = form_data.web.SOUGOU_API_SID
+            request.app.state.config.SOUGOU_API_SK = form_data.web.SOUGOU_API_SK
+
+            # Web loader settings
+            request.app.state.config.WEB_LOADER_ENGINE = form_data.web.WEB_LOADER_ENGINE
+            request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION = (
+                form_data.web.ENABLE_WEB_LOADER_SSL_VERIFICATION
+            )
+            request.app.state.config.PLAYWRIGHT_WS_URL = form_data.web.PLAYWRIGHT_WS_URL
+            request.app.state.config.PLAYWRIGHT_TIMEOUT = (
+                form_data.web.PLAYWRIGHT_TIMEOUT
+            )
+            request.app.state.config.FIRECRAWL_API_KEY = form_data.web.FIRECRAWL_API_KEY
+            request.app.state.config.FIRECRAWL_API_BASE_URL = (
+                form_data.web.FIRECRAWL_API_BASE_URL
+            )
+            request.app.state.config.TAVILY_EXTRACT_DEPTH = (
+                form_data.web.TAVILY_EXTRACT_DEPTH
+            )
+            request.app.state.config.YOUTUBE_LOADER_LANGUAGE = (
+                form_data.web.YOUTUBE_LOADER_LANGUAGE
+            )
+            request.app.state.config.YOUTUBE_LOADER_PROXY_URL = (
+                form_data.web.YOUTUBE_LOADER_PROXY_URL
+            )
+            request.app.state.YOUTUBE_LOADER_TRANSLATION = (
+                form_data.web.YOUTUBE_LOADER_TRANSLATION
+            )
+
     return {
         "status": True,
         # RAG settings
@@ -792,6 +804,99 @@ async def update_rag_config(
 ####################################
 
 
+def get_rag_embedding_function(request: Request):
+    return get_embedding_function(
+        request.app.state.config.RAG_EMBEDDING_ENGINE,
+        request.app.state.config.RAG_EMBEDDING_MODEL,
+        request.app.state.ef,
+        (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else request.app.state.config.RAG_OLLAMA_BASE_URL
+        ),
+        (
+            request.app.state.config.RAG_OPENAI_API_KEY
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else request.app.state.config.RAG_OLLAMA_API_KEY
+        ),
+        request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+    )
+
+
+def split_docs(request: Request, docs: list[Document]) -> list[Document]:
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+    return text_splitter.split_documents(docs)
+
+
+def get_docs_metadatas(
+    request: Request, docs: list[Document], metadata: Optional[dict] = None
+) -> list[dict]:
+    metadatas = [
+        {
+            **doc.metadata,
+            **(metadata if metadata else {}),
+            "embedding_config": json.dumps(
+                {
+                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+                }
+            ),
+        }
+        for doc in docs
+    ]
+
+    # ChromaDB does not like datetime formats
+    # for meta-data so convert them to string.
+    for metadata in metadatas:
+        for key, value in metadata.items():
+            if (
+                isinstance(value, datetime)
+                or isinstance(value, list)
+                or isinstance(value, dict)
+            ):
+                metadata[key] = str(value)
+
+    return metadatas
+
+
+def has_docs_with_hash(collection_name: str, content_hash: str) -> bool:
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name,
+        filter={"hash": content_hash},
+    )
+    return result is not None and bool(result.ids[0])
+
+
+# Collections such as the web-search ones are shared across users and queries,
+# so writes to the same collection are serialized; a fixed set of striped locks
+# keeps memory bounded regardless of how many collections exist.
+COLLECTION_WRITE_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def get_collection_write_lock(collection_name: str) -> threading.Lock:
+    return COLLECTION_WRITE_LOCKS[hash(collection_name) % len(COLLECTION_WRITE_LOCKS)]
+
+
 def save_docs_to_vector_db(
     request: Request,
     docs,
@@ -824,69 +929,18 @@ def save_docs_to_vector_db(
 
     # Check if entries with the same hash (metadata.hash) already exist
     if metadata and "hash" in metadata:
-        result = VECTOR_DB_CLIENT.query(
-            collection_name=collection_name,
-            filter={"hash": metadata["hash"]},
-        )
-
-        if result is not None:
-            existing_doc_ids = result.ids[0]
-            if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
-                raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+        if has_docs_with_hash(collection_name, metadata["hash"]):
+            log.info(f"Document with hash {metadata['hash']} already exists")
+            raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
     if split:
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
-
-        docs = text_splitter.split_documents(docs)
+        docs = split_docs(request, docs)
 
     if len(docs) == 0:
         raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
 
     texts = [doc.page_content for doc in docs]
-    metadatas = [
-        {
-            **doc.metadata,
-            **(metadata if metadata else {}),
-            "embedding_config": json.dumps(
-                {
-                    "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
-                    "model": request.app.state.config.RAG_EMBEDDING_MODEL,
-                }
-            ),
-        }
-        for doc in docs
-    ]
-
-    # ChromaDB does not like datetime formats
-    # for meta-data so convert them to string.
-    for metadata in metadatas:
-        for key, value in metadata.items():
-            if (
-                isinstance(value, datetime)
-                or isinstance(value, list)
-                or isinstance(value, dict)
-            ):
-                metadata[key] = str(value)
+    metadatas = get_docs_metadatas(request, docs, metadata)
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -902,22 +956,7 @@ def save_docs_to_vector_db(
                 return True
 
         log.info(f"adding to collection {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_BASE_URL
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_API_KEY
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-        )
+        embedding_function = get_rag_embedding_function(request)
 
         embeddings = embedding_function(
             list(map(lambda x: x.replace("\n", " "), texts)),
@@ -946,6 +985,122 @@ def save_docs_to_vector_db(
         raise e
 
 
+def save_docs_batch_to_vector_db(
+    request: Request,
+    collections: list[tuple[str, list[Document], Optional[dict]]],
+    overwrite: bool = False,
+    user=None,
+) -> list[str]:
+    """
+    Save several (collection_name, docs, metadata) groups at once: the documents
+    of every collection are split and embedded together in one batched call,
+    then the collections are written in parallel. Collections that already hold
+    the hash in their metadata are reused as-is, and collections left without
+    content after splitting are skipped. When a collection holds items with a
+    different hash, those items are replaced; with `overwrite` every existing
+    item is replaced. Writes to the same collection are serialized.
+
+    Returns the names of the collections that hold the documents.
+    """
+    collection_names = []
+    pending = []
+    pending_hashes = set()
+    for collection_name, docs, metadata in collections:
+        if metadata and "hash" in metadata:
+            # The same content for the same collection is only embedded once
+            key = (collection_name, metadata["hash"])
+            if key in pending_hashes or has_docs_with_hash(*key):
+                log.debug(f"Reusing collection {collection_name}")
+                collection_names.append(collection_name)
+                continue
+            pending_hashes.add(key)
+
+        docs = split_docs(request, docs)
+        if len(docs) == 0:
+            log.warning(f"No content to save to collection {collection_name}")
+            continue
+
+        collection_names.append(collection_name)
+        pending.append(
+            (collection_name, docs, get_docs_metadatas(request, docs, metadata))
+        )
+
+    collection_names = list(dict.fromkeys(collection_names))
+    if not pending:
+        return collection_names
+
+    texts = [doc.page_content for _, docs, _ in pending for doc in docs]
+    log.info(
+        f"save_docs_batch_to_vector_db: embedding {len(texts)} chunks for {len(pending)} collections"
+    )
+
+    embedding_function = get_rag_embedding_function(request)
+    embeddings = embedding_function(
+        list(map(lambda x: x.replace("\n", " "), texts)),
+        prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+        user=user,
+    )
+
+    # Documents that go to the same collection are written together by one
+    # thread, so parallel writes never touch the same collection
+    writes = {}
+    offset = 0
+    for collection_name, docs, metadatas in pending:
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": doc.page_content,
+                "vector": embeddings[offset + idx],
+                "metadata": metadatas[idx],
+            }
+            for idx, doc in enumerate(docs)
+        ]
+        offset += len(docs)
+        writes.setdefault(collection_name, []).extend(items)
+
+    def _write_collection(write):
+        collection_name, items = write
+        hashes = {item["metadata"].get("hash") for item in items} - {None}
+
+        with get_collection_write_lock(collection_name):
+            if not VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+                VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+                return
+
+            # Another request may have written the same content in the meantime
+            if hashes and all(
+                has_docs_with_hash(collection_name, content_hash)
+                for content_hash in hashes
+            ):
+                log.debug(f"collection {collection_name} is up to date")
+                return
+
+            stale_ids = []
+            existing = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+            if existing is not None and (overwrite or hashes):
+                stale_ids = [
+                    id
+                    for id, metadata in zip(existing.ids[0], existing.metadatas[0])
+                    if overwrite or (metadata or {}).get("hash") not in hashes
+                ]
+
+            # The new items are inserted before the stale ones are removed, so
+            # readers never see the collection empty
+            VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+            if stale_ids:
+                log.info(
+                    f"replacing {len(stale_ids)} stale items in collection {collection_name}"
+                )
+                VECTOR_DB_CLIENT.delete(collection_name=collection_name, ids=stale_ids)
+            else:
+                log.info(f"collection {collection_name} already exists, adding")
+
+    request.app.state.RETRIEVAL_EXECUTOR.map(
+        "save_docs_batch_to_vector_db", _write_collection, list(writes.items())
+    )
+    return collection_names
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1262,7 +1417,7 @@ def process_web(
         )
 
 
-def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
+async def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
     """Search the web using a search engine and return the results as a list of SearchResult objects.
     Will look for a search engine API key in environment variables in the following order:
     - SEARXNG_QUERY_URL
@@ -1287,7 +1442,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
     # TODO: add playwright to search the web
     if engine == "searxng":
         if request.app.state.config.SEARXNG_QUERY_URL:
-            return search_searxng(
+            return await search_searxng(
                 request.app.state.config.SEARXNG_QUERY_URL,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1300,7 +1455,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             request.app.state.config.GOOGLE_PSE_API_KEY
             and request.app.state.config.GOOGLE_PSE_ENGINE_ID
         ):
-            return search_google_pse(
+            return await search_google_pse(
                 request.app.state.config.GOOGLE_PSE_API_KEY,
                 request.app.state.config.GOOGLE_PSE_ENGINE_ID,
                 query,
@@ -1313,7 +1468,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             )
     elif engine == "brave":
         if request.app.state.config.BRAVE_SEARCH_API_KEY:
-            return search_brave(
+            return await search_brave(
                 request.app.state.config.BRAVE_SEARCH_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1323,7 +1478,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No BRAVE_SEARCH_API_KEY found in environment variables")
     elif engine == "kagi":
         if request.app.state.config.KAGI_SEARCH_API_KEY:
-            return search_kagi(
+            return await search_kagi(
                 request.app.state.config.KAGI_SEARCH_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1333,7 +1488,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No KAGI_SEARCH_API_KEY found in environment variables")
     elif engine == "mojeek":
         if request.app.state.config.MOJEEK_SEARCH_API_KEY:
-            return search_mojeek(
+            return await search_mojeek(
                 request.app.state.config.MOJEEK_SEARCH_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1343,7 +1498,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No MOJEEK_SEARCH_API_KEY found in environment variables")
     elif engine == "bocha":
         if request.app.state.config.BOCHA_SEARCH_API_KEY:
-            return search_bocha(
+            return await search_bocha(
                 request.app.state.config.BOCHA_SEARCH_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1353,7 +1508,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No BOCHA_SEARCH_API_KEY found in environment variables")
     elif engine == "serpstack":
         if request.app.state.config.SERPSTACK_API_KEY:
-            return search_serpstack(
+            return await search_serpstack(
                 request.app.state.config.SERPSTACK_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1364,7 +1519,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SERPSTACK_API_KEY found in environment variables")
     elif engine == "serper":
         if request.app.state.config.SERPER_API_KEY:
-            return search_serper(
+            return await search_serper(
                 request.app.state.config.SERPER_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1374,7 +1529,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SERPER_API_KEY found in environment variables")
     elif engine == "serply":
         if request.app.state.config.SERPLY_API_KEY:
-            return search_serply(
+            return await search_serply(
                 request.app.state.config.SERPLY_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1383,14 +1538,15 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         else:
             raise Exception("No SERPLY_API_KEY found in environment variables")
     elif engine == "duckduckgo":
-        return search_duckduckgo(
+        return await run_in_threadpool(
+            search_duckduckgo,
             query,
             request.app.state.config.WEB_SEARCH_RESULT_COUNT,
             request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "tavily":
         if request.app.state.config.TAVILY_API_KEY:
-            return search_tavily(
+            return await search_tavily(
                 request.app.state.config.TAVILY_API_KEY,
                 query,
                 request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1400,7 +1556,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No TAVILY_API_KEY found in environment variables")
     elif engine == "searchapi":
         if request.app.state.config.SEARCHAPI_API_KEY:
-            return search_searchapi(
+            return await search_searchapi(
                 request.app.state.config.SEARCHAPI_API_KEY,
                 request.app.state.config.SEARCHAPI_ENGINE,
                 query,
@@ -1411,7 +1567,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SEARCHAPI_API_KEY found in environment variables")
     elif engine == "serpapi":
         if request.app.state.config.SERPAPI_API_KEY:
-            return search_serpapi(
+            return await search_serpapi(
                 request.app.state.config.SERPAPI_API_KEY,
                 request.app.state.config.SERPAPI_ENGINE,
                 query,
@@ -1421,13 +1577,13 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         else:
             raise Exception("No SERPAPI_API_KEY found in environment variables")
     elif engine == "jina":
-        return search_jina(
+        return await search_jina(
             request.app.state.config.JINA_API_KEY,
             query,
             request.app.state.config.WEB_SEARCH_RESULT_COUNT,
         )
     elif engine == "bing":
-        return search_bing(
+        return await search_bing(
             request.app.state.config.BING_SEARCH_V7_SUBSCRIPTION_KEY,
             request.app.state.config.BING_SEARCH_V7_ENDPOINT,
             str(DEFAULT_LOCALE),
@@ -1436,14 +1592,14 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "exa":
-        return search_exa(
+        return await search_exa(
             request.app.state.config.EXA_API_KEY,
             query,
             request.app.state.config.WEB_SEARCH_RESULT_COUNT,
             request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "perplexity":
-        return search_perplexity(
+        return await search_perplexity(
             request.app.state.config.PERPLEXITY_API_KEY,
             query,
             request.app.state.config.WEB_SEARCH_RESULT_COUNT,
@@ -1454,7 +1610,8 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             request.app.state.config.SOUGOU_API_SID
             and request.app.state.config.SOUGOU_API_SK
         ):
-            return search_sougou(
+            return await run_in_threadpool(
+                search_sougou,
                 request.app.state.config.SOUGOU_API_SID,
                 request.app.state.config.SOUGOU_API_SK,
                 query,
@@ -1477,9 +1634,34 @@ async def process_web_search(
         logging.info(
             f"trying to web search with {request.app.state.config.WEB_SEARCH_ENGINE, form_data.query}"
         )
-        web_results = search_web(
-            request, request.app.state.config.WEB_SEARCH_ENGINE, form_data.query
-        )
+        # Several comma separated engines are queried concurrently
+        engines = [
+            engine.strip()
+            for engine in request.app.state.config.WEB_SEARCH_ENGINE.split(",")
+            if engine.strip()
+        ]
+        if len(engines) > 1:
+            engine_results = await asyncio.gather(
+                *[search_web(request, engine, form_data.query) for engine in engines],
+                return_exceptions=True,
+            )
+            for engine, result in zip(engines, engine_results):
+                if isinstance(result, Exception):
+                    log.warning(f"Web search with {engine} failed: {result}")
+
+            engine_results = [
+                result for result in engine_results if not isinstance(result, Exception)
+            ]
+            if not engine_results:
+                raise Exception("All web search engines failed")
+
+            web_results = merge_search_results(
+                engine_results, request.app.state.config.WEB_SEARCH_RESULT_COUNT
+            )
+        else:
+            web_results = await search_web(
+                request, request.app.state.config.WEB_SEARCH_ENGINE, form_data.query
+            )
     except Exception as e:
         log.exception(e)
 
@@ -1492,13 +1674,12 @@ async def process_web_search(
 
     try:
         urls = [result.link for result in web_results]
-        loader = get_web_loader(
+        docs = await load_web_documents(
             urls,
             verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
             requests_per_second=request.app.state.config.WEB_SEARCH_CONCURRENT_REQUESTS,
             trust_env=request.app.state.config.WEB_SEARCH_TRUST_ENV,
         )
-        docs = await loader.aload()
         urls = [
             doc.metadata["source"] for doc in docs
         ]  # only keep URLs which could be retrieved
@@ -1518,22 +1699,31 @@ async def process_web_search(
                 "loaded_count": len(docs),
             }
         else:
-            collection_names = []
-            for doc_idx, doc in enumerate(docs):
-                if doc and doc.page_content:
-                    collection_name = f"web-search-{calculate_sha256_string(form_data.query + '-' + urls[doc_idx])}"[
-                        :63
-                    ]
-
-                    collection_names.append(collection_name)
-                    await run_in_threadpool(
-                        save_docs_to_vector_db,
-                        request,
-                        [doc],
-                        collection_name,
-                        overwrite=True,
-                        user=user,
-                    )
+            # Pages are embedded once per URL and reused across queries for as
+            # long as their content and the embedding model match
+            collections = [
+                (
+                    f"web-search-{calculate_sha256_string(urls[doc_idx])}"[:63],
+                    [doc],
+                    {
+                        "hash": calculate_sha256_string(
+                            f"{request.app.state.config.RAG_EMBEDDING_ENGINE}-"
+                            f"{request.app.state.config.RAG_EMBEDDING_MODEL}-"
+                            f"{doc.page_content}"
+                        )
+                    },
+                )
+                for doc_idx, doc in enumerate(docs)
+                if doc and doc.page_content
+            ]
+
+            collection_names = await run_in_threadpool(
+                save_docs_batch_to_vector_db,
+                request,
+                collections,
+                overwrite=False,
+                user=user,
+            )
 
             return {
                 "status": True,
@@ -1637,6 +1827,7 @@ def query_collection_handler(
                     if form_data.r
                     else request.app.state.config.RELEVANCE_THRESHOLD
                 ),
+                executor=request.app.state.RETRIEVAL_EXECUTOR,
             )
         else:
             return query_collection(
@@ -1693,6 +1884,24 @@ def reset_vector_db(user=Depends(get_admin_user)):
     Knowledges.delete_all_knowledge()
 
 
+@router.post("/index/rebuild")
+def rebuild_vector_db_indexes(user=Depends(get_admin_user)):
+    if not hasattr(VECTOR_DB_CLIENT, "rebuild_indexes"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Index rebuild is not supported by the configured vector database.",
+        )
+
+    try:
+        return VECTOR_DB_CLIENT.rebuild_indexes()
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ERROR_MESSAGES.DEFAULT(e),
+        )
+
+
 @router.post("/reset/uploads")
 def reset_upload_dir(user=Depends(get_admin_user)) -> bool:
     folder = f"{UPLOAD_DIR}"
@@ -1,11 +1,11 @@
 import asyncio
+import time
 import socketio
 import logging
 import sys
-import time
 from redis import asyncio as aioredis
 
-from open_webui.models.users import Users, UserNameResponse
+from open_webui.models.users import UsersCache, UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
 from open_webui.utils.redis import (
@@ -18,11 +18,19 @@ from open_webui.env import (
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
+    WEBSOCKET_SESSION_TTL,
+    WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    RedisLock,
+    RedisSessionPool,
+    RedisUsagePool,
+    SessionPool,
+    UsagePool,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -65,25 +73,27 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
-# Dictionary to maintain the user pool
+# Room of the authenticated sessions, which are the ones showing presence
+PRESENCE_ROOM = "presence"
+
+# Presence and usage changes are coalesced and broadcast this often (seconds)
+PRESENCE_BROADCAST_INTERVAL = 1
+
+# Connected sessions and their users, and the models in use
 
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
+    SESSION_POOL = RedisSessionPool(
+        "open-webui:socket",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
+        ttl=WEBSOCKET_SESSION_TTL,
     )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
+    USAGE_POOL = RedisUsagePool(
+        "open-webui:socket:usage",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
     )
@@ -98,102 +108,123 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-    aquire_func = release_func = renew_func = lambda: True
+    SESSION_POOL = SessionPool()
+    USAGE_POOL = UsagePool()
+
+    async def aquire_func():
+        return True
+
+    renew_func = release_func = aquire_func
 
 
 async def periodic_usage_pool_cleanup():
     """
-    Periodic cleanup task for usage pool with improved error handling and timeout.
+    Periodic cleanup of models no longer in use. Only the worker holding the
+    cleanup lock does it; the others keep trying to take the lock over, so
+    cleanup carries on if that worker goes away.
     """
-    max_attempts = 3
-    attempt = 0
-
-    while attempt < max_attempts:
-        try:
-            if not aquire_func():
-                log.debug("Usage pool cleanup lock already exists. Not running it.")
-                return
-
-            log.debug("Running periodic_usage_pool_cleanup")
-
-            # Maximum runtime to prevent infinite loops
-            max_runtime = 300  # 5 minutes
-            start_time = time.time()
-
-            # Maximum iterations to prevent infinite loops
-            max_iterations = 100
-            iteration = 0
-
-            while True:
-                # Check if we've exceeded maximum runtime
-                if time.time() - start_time > max_runtime:
-                    log.warning("Periodic usage pool cleanup reached maximum runtime, exiting")
-                    break
-
-                if not renew_func():
-                    log.error("Unable to renew cleanup lock. Exiting usage pool cleanup.")
-                    break
-
-                # Check if we've exceeded maximum iterations
-                iteration += 1
-                if iteration >= max_iterations:
-                    log.warning("Periodic usage pool cleanup reached maximum iterations, exiting")
-                    break
-
-                now = int(time.time())
-                send_usage = False
-
-                # Use list() to avoid modification during iteration
-                for model_id, connections in list(USAGE_POOL.items()):
-                    # Creating a list of sids to remove if they have timed out
-                    expired_sids = [
-                        sid
-                        for sid, details in connections.items()
-                        if now - details["updated_at"] > TIMEOUT_DURATION
-                    ]
-
-                    for sid in expired_sids:
-                        if sid in connections:
-                            del connections[sid]
-
-                    if not connections:
-                        log.debug(f"Cleaning up model {model_id} from usage pool")
-                        if model_id in USAGE_POOL:
-                            del USAGE_POOL[model_id]
-                    else:
-                        USAGE_POOL[model_id] = connections
-
-                    send_usage = True
-
-                if send_usage:
-                    # Emit updated usage information after cleaning
-                    try:
-                        await sio.emit("usage", {"models": get_models_in_use()})
-                    except Exception as e:
-                        log.error(f"Failed to emit usage update: {e}")
-
-                await asyncio.sleep(TIMEOUT_DURATION)
-
-            # If we break out of the inner loop, exit the function
-            break
-
-        except Exception as e:
-            attempt += 1
-            log.error(f"Error in periodic_usage_pool_cleanup (attempt {attempt}/{max_attempts}): {e}")
-
-            if attempt < max_attempts:
-                log.info("Retrying after error...")
-                await asyncio.sleep(5)  # Wait before retry
-            else:
-                log.error("Max retry attempts reached, giving up on periodic_usage_pool_cleanup")
-        finally:
+    try:
+        while True:
             try:
-                release_func()
+                if await aquire_func():
+                    log.debug("Running periodic_usage_pool_cleanup")
+                    while await renew_func():
+                        if await USAGE_POOL.cleanup(TIMEOUT_DURATION):
+                            # Emit updated usage information after cleaning
+                            await sio.emit(
+                                "usage",
+                                {"models": await get_models_in_use()},
+                                room=PRESENCE_ROOM,
+                            )
+                        await asyncio.sleep(TIMEOUT_DURATION)
+                    log.error("Unable to renew cleanup lock.")
+                else:
+                    log.debug("Usage pool cleanup lock already exists. Not running it.")
             except Exception as e:
-                log.error(f"Failed to release lock: {e}")
+                log.error(f"Error in periodic_usage_pool_cleanup: {e}")
+
+            await asyncio.sleep(TIMEOUT_DURATION)
+    finally:
+        await release_func()
+
+
+class PresenceBroadcaster:
+    """
+    Buffers the users coming online or going offline on this worker, and the
+    fact that the models in use changed, and broadcasts them at most once per
+    PRESENCE_BROADCAST_INTERVAL to the presence room: users as a
+    "user-presence" delta, models as a "usage" list. Every
+    WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL seconds the worker also sends its own
+    clients the full "user-list", which covers sessions that expired without a
+    disconnect.
+    """
+
+    def __init__(self):
+        # user id -> whether they're online, the last change wins
+        self.changes: dict[str, bool] = {}
+        self.usage_changed = False
+
+    def user_joined(self, user_id: str):
+        self.changes[user_id] = True
+
+    def user_left(self, user_id: str):
+        self.changes[user_id] = False
+
+    def models_changed(self):
+        self.usage_changed = True
+
+    async def broadcast(self):
+        changes, self.changes = self.changes, {}
+        if changes:
+            await sio.emit(
+                "user-presence",
+                {
+                    "joined": [id for id, online in changes.items() if online],
+                    "left": [id for id, online in changes.items() if not online],
+                },
+                room=PRESENCE_ROOM,
+            )
+
+        if self.usage_changed:
+            self.usage_changed = False
+            await sio.emit(
+                "usage", {"models": await get_models_in_use()}, room=PRESENCE_ROOM
+            )
+
+    async def send_snapshot(self):
+        # ignore_queue keeps this to the clients of this worker, as every
+        # worker sends its own
+        await sio.emit(
+            "user-list",
+            {"user_ids": await SESSION_POOL.get_user_ids()},
+            room=PRESENCE_ROOM,
+            ignore_queue=True,
+        )
+
+    async def run(self):
+        last_snapshot = time.time()
+        while True:
+            await asyncio.sleep(PRESENCE_BROADCAST_INTERVAL)
+            try:
+                await self.broadcast()
+                if time.time() - last_snapshot >= WEBSOCKET_PRESENCE_SNAPSHOT_INTERVAL:
+                    last_snapshot = time.time()
+                    await self.send_snapshot()
+            except Exception as e:
+                log.error(f"Failed to broadcast presence: {e}")
+
+
+Presence = PresenceBroadcaster()
+
+
+async def join_presence(sid, user):
+    """Add an authenticated session to the pool and send it the current state."""
+    if await SESSION_POOL.add(sid, user.model_dump()):
+        Presence.user_joined(user.id)
+
+    await sio.enter_room(sid, PRESENCE_ROOM)
+    await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()}, to=sid)
+    await sio.emit("usage", {"models": await get_models_in_use()}, to=sid)
 
 
 app = socketio.ASGIApp(
@@ -202,26 +233,17 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await USAGE_POOL.get_models()
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    model_id = data["model"]
-    # Record the timestamp for the last update
-    current_time = int(time.time())
-
-    # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
-
-    # Broadcast the usage data to all clients
-    await sio.emit("usage", {"models": get_models_in_use()})
+    # Record the timestamp for the last update, clients only need to hear
+    # about models that weren't in use yet
+    if await USAGE_POOL.touch(data["model"]):
+        Presence.models_changed()
 
 
 @sio.event
@@ -231,18 +253,11 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = UsersCache.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
-
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+            await join_presence(sid, user)
 
 
 @sio.on("user-join")
@@ -256,15 +271,11 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = UsersCache.get_user_by_id(data["id"])
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await join_presence(sid, user)
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -274,7 +285,6 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
     return {"id": user.id, "name": user.name}
 
 
@@ -288,7 +298,7 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = UsersCache.get_user_by_id(data["id"])
     if not user:
         return
 
@@ -315,13 +325,14 @@ async def channel_events(sid, data):
     event_type = event_data["type"]
 
     if event_type == "typing":
+        user = await SESSION_POOL.get(sid)
         await sio.emit(
             "channel-events",
             {
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(**user).model_dump(),
             },
             room=room,
         )
@@ -329,22 +340,15 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()}, to=sid)
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    user, offline = await SESSION_POOL.remove(sid)
+    if user:
+        if offline:
+            Presence.user_left(user["id"])
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
@@ -356,7 +360,7 @@ def get_event_emitter(request_info, update_db=True):
 
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await SESSION_POOL.get_session_ids(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -435,28 +439,26 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    # One round trip for all the sessions in the room
+    users = await SESSION_POOL.get_many(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([user["id"] for user in users if user]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def get_active_status_by_user_id(user_id):
+    return await SESSION_POOL.is_active(user_id)
@@ -1,7 +1,11 @@
+import asyncio
 import json
+import time
 import uuid
 import logging
-from open_webui.utils.redis import get_redis_connection
+from typing import Optional
+
+from open_webui.utils.redis import get_async_redis_connection
 
 log = logging.getLogger(__name__)
 
@@ -10,16 +14,16 @@ class RedisLock:
     def __init__(self, redis_url, lock_name, timeout_secs, redis_sentinels=[]):
         self.lock_name = lock_name
         self.lock_id = str(uuid.uuid4())
-        self.timeout_secs = timeout_secs
+        self.timeout_secs = int(timeout_secs)
         self.lock_obtained = False
-        self.redis = get_redis_connection(
+        self.redis = get_async_redis_connection(
             redis_url, redis_sentinels, decode_responses=True
         )
 
-    def acquire_lock(self):
+    async def acquire_lock(self):
         # nx=True will only set this key if it _hasn't_ already been set
         try:
-            self.lock_obtained = self.redis.set(
+            self.lock_obtained = await self.redis.set(
                 self.lock_name, self.lock_id, nx=True, ex=self.timeout_secs
             )
             return self.lock_obtained
@@ -28,82 +32,242 @@ class RedisLock:
             return False
 
     # Backward compatibility
-    def aquire_lock(self):
-        return self.acquire_lock()
+    async def aquire_lock(self):
+        return await self.acquire_lock()
 
-    def renew_lock(self):
+    async def renew_lock(self):
         # xx=True will only set this key if it _has_ already been set
         try:
-            return self.redis.set(
+            return await self.redis.set(
                 self.lock_name, self.lock_id, xx=True, ex=self.timeout_secs
             )
         except Exception as e:
             log.error(f"Failed to renew lock {self.lock_name}: {e}")
             return False
 
-    def release_lock(self):
+    async def release_lock(self):
         try:
-            lock_value = self.redis.get(self.lock_name)
+            lock_value = await self.redis.get(self.lock_name)
             if lock_value and lock_value == self.lock_id:
-                self.redis.delete(self.lock_name)
+                await self.redis.delete(self.lock_name)
         except Exception as e:
             log.error(f"Failed to release lock {self.lock_name}: {e}")
 
 
-class RedisDict:
-    def __init__(self, name, redis_url, redis_sentinels=[]):
-        self.name = name
-        self.redis = get_redis_connection(
+class SessionPool:
+    """
+    Socket.IO sessions of a single worker: the user of every session id, and
+    the session ids of every connected user.
+    """
+
+    def __init__(self):
+        self.sessions: dict[str, dict] = {}
+        self.users: dict[str, set[str]] = {}
+
+    async def add(self, sid: str, user: dict) -> bool:
+        """Add a session, returning whether its user just came online."""
+        online = user["id"] not in self.users
+        self.sessions[sid] = user
+        self.users.setdefault(user["id"], set()).add(sid)
+        return online
+
+    async def remove(self, sid: str) -> tuple[Optional[dict], bool]:
+        """Remove a session, returning its user and whether they went offline."""
+        user = self.sessions.pop(sid, None)
+        if user is None:
+            return None, False
+
+        sids = self.users.get(user["id"], set())
+        sids.discard(sid)
+        if not sids:
+            self.users.pop(user["id"], None)
+            return user, True
+        return user, False
+
+    async def get(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.sessions.get(sid) for sid in sids]
+
+    async def get_user_ids(self) -> list[str]:
+        return list(self.users)
+
+    async def get_session_ids(self, user_id: str) -> list[str]:
+        return list(self.users.get(user_id, []))
+
+    async def is_active(self, user_id: str) -> bool:
+        return user_id in self.users
+
+    async def run(self):
+        # Nothing outlives the worker, so there is nothing to expire
+        return
+
+
+class RedisSessionPool(SessionPool):
+    """
+    Socket.IO sessions shared by all workers through Redis:
+
+    - {prefix}:session:{sid}: the session's user as JSON, with a TTL
+    - {prefix}:user:{user_id}: sorted set of the user's session ids
+    - {prefix}:users: sorted set of connected user ids
+
+    Sorted set members are scored by when they expire. Every worker refreshes
+    the sessions it holds every ttl / 3 seconds, so the sessions of a worker
+    that went away without disconnecting them expire instead of lingering.
+    """
+
+    # Drops a session and, atomically with it, the user once no session is
+    # left, returning 1 if the user was dropped
+    REMOVE_SCRIPT = """
+    redis.call("DEL", KEYS[1])
+    redis.call("ZREM", KEYS[2], ARGV[1])
+    redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", ARGV[3])
+    if redis.call("ZCARD", KEYS[2]) == 0 then
+        return redis.call("ZREM", KEYS[3], ARGV[2])
+    end
+    return 0
+    """
+
+    def __init__(self, prefix, redis_url, redis_sentinels=[], ttl=120):
+        super().__init__()
+        self.prefix = prefix
+        self.ttl = ttl
+        self.redis = get_async_redis_connection(
             redis_url, redis_sentinels, decode_responses=True
         )
+        self.users_key = f"{prefix}:users"
+        self.remove_script = self.redis.register_script(self.REMOVE_SCRIPT)
 
-    def __setitem__(self, key, value):
-        serialized_value = json.dumps(value)
-        self.redis.hset(self.name, key, serialized_value)
+        # Sessions connected to this worker, which it keeps from expiring
+        self.local_sessions: dict[str, str] = {}
 
-    def __getitem__(self, key):
-        value = self.redis.hget(self.name, key)
-        if value is None:
-            raise KeyError(key)
-        return json.loads(value)
+    def _session_key(self, sid: str) -> str:
+        return f"{self.prefix}:session:{sid}"
 
-    def __delitem__(self, key):
-        result = self.redis.hdel(self.name, key)
-        if result == 0:
-            raise KeyError(key)
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}:user:{user_id}"
 
-    def __contains__(self, key):
-        return self.redis.hexists(self.name, key)
+    async def add(self, sid: str, user: dict) -> bool:
+        expires_at = time.time() + self.ttl
+        user_key = self._user_key(user["id"])
 
-    def __len__(self):
-        return self.redis.hlen(self.name)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._session_key(sid), json.dumps(user), ex=self.ttl)
+            pipe.zadd(user_key, {sid: expires_at})
+            pipe.expire(user_key, self.ttl)
+            pipe.zadd(self.users_key, {user["id"]: expires_at})
+            results = await pipe.execute()
 
-    def keys(self):
-        return self.redis.hkeys(self.name)
+        self.local_sessions[sid] = user["id"]
+        # ZADD counts the user only if they weren't in the set yet
+        return results[-1] == 1
 
-    def values(self):
-        return [json.loads(v) for v in self.redis.hvals(self.name)]
+    async def remove(self, sid: str) -> tuple[Optional[dict], bool]:
+        self.local_sessions.pop(sid, None)
+        user = await self.get(sid)
+        if user is None:
+            return None, False
 
-    def items(self):
-        return [(k, json.loads(v)) for k, v in self.redis.hgetall(self.name).items()]
+        offline = await self.remove_script(
+            keys=[self._session_key(sid), self._user_key(user["id"]), self.users_key],
+            args=[sid, user["id"], time.time()],
+        )
+        return user, offline == 1
 
-    def get(self, key, default=None):
-        try:
-            return self[key]
-        except KeyError:
-            return default
-
-    def clear(self):
-        self.redis.delete(self.name)
-
-    def update(self, other=None, **kwargs):
-        if other is not None:
-            for k, v in other.items() if hasattr(other, "items") else other:
-                self[k] = v
-        for k, v in kwargs.items():
-            self[k] = v
-
-    def setdefault(self, key, default=None):
-        if key not in self:
-            self[key] = default
-        return self[key]
+    async def get(self, sid: str) -> Optional[dict]:
+        value = await self.redis.get(self._session_key(sid))
+        return json.loads(value) if value is not None else None
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        if not sids:
+            return []
+        values = await self.redis.mget([self._session_key(sid) for sid in sids])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def get_user_ids(self) -> list[str]:
+        return await self.redis.zrangebyscore(self.users_key, time.time(), "+inf")
+
+    async def get_session_ids(self, user_id: str) -> list[str]:
+        return await self.redis.zrangebyscore(
+            self._user_key(user_id), time.time(), "+inf"
+        )
+
+    async def is_active(self, user_id: str) -> bool:
+        expires_at = await self.redis.zscore(self.users_key, user_id)
+        return expires_at is not None and expires_at > time.time()
+
+    async def refresh(self):
+        """Extend the expiry of this worker's sessions and prune expired users."""
+        now = time.time()
+        expires_at = now + self.ttl
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for sid, user_id in list(self.local_sessions.items()):
+                user_key = self._user_key(user_id)
+                # xx=True so a session removed meanwhile isn't brought back
+                pipe.expire(self._session_key(sid), self.ttl)
+                pipe.zadd(user_key, {sid: expires_at}, xx=True)
+                pipe.expire(user_key, self.ttl)
+                pipe.zadd(self.users_key, {user_id: expires_at}, xx=True)
+            pipe.zremrangebyscore(self.users_key, "-inf", now)
+            await pipe.execute()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                await self.refresh()
+            except Exception as e:
+                log.error(f"Failed to refresh session pool: {e}")
+
+
+class UsagePool:
+    """When each model was last reported in use, for a single worker."""
+
+    def __init__(self):
+        self.models: dict[str, float] = {}
+
+    async def touch(self, model_id: str) -> bool:
+        """Record that a model is in use, returning whether it wasn't already."""
+        in_use = model_id in self.models
+        self.models[model_id] = time.time()
+        return not in_use
+
+    async def get_models(self) -> list[str]:
+        return list(self.models)
+
+    async def cleanup(self, timeout: int) -> bool:
+        """Forget models not used in the last `timeout` seconds, returning whether any were."""
+        expired_before = time.time() - timeout
+        expired = [
+            model_id
+            for model_id, updated_at in self.models.items()
+            if updated_at < expired_before
+        ]
+        for model_id in expired:
+            del self.models[model_id]
+        return bool(expired)
+
+
+class RedisUsagePool(UsagePool):
+    """Model usage shared through Redis, as a sorted set scored by last use."""
+
+    def __init__(self, name, redis_url, redis_sentinels=[]):
+        super().__init__()
+        self.name = name
+        self.redis = get_async_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+
+    async def touch(self, model_id: str) -> bool:
+        return await self.redis.zadd(self.name, {model_id: time.time()}) == 1
+
+    async def get_models(self) -> list[str]:
+        return await self.redis.zrange(self.name, 0, -1)
+
+    async def cleanup(self, timeout: int) -> bool:
+        removed = await self.redis.zremrangebyscore(
+            self.name, "-inf", f"({time.time() - timeout}"
+        )
+        return removed > 0
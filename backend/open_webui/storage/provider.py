@@ -2,10 +2,16 @@ import os
 import shutil
 import json
 import logging
+import hashlib
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -23,20 +29,122 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_CACHE_MAX_SIZE_MB,
+    STORAGE_CACHE_TTL,
     UPLOAD_DIR,
 )
+from google.api_core.exceptions import NotModified
 from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
 from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
-from azure.core.exceptions import ResourceNotFoundError
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
 from open_webui.env import SRC_LOG_LEVELS
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Uploads are streamed in chunks of this size (a multiple of 256 KiB as required by GCS)
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class LocalFileCache:
+    """
+    Size-bounded LRU index of the remote objects mirrored in UPLOAD_DIR.
+    Entries are keyed by object key and remember the ETag of the local copy,
+    so stale copies can be revalidated with a conditional request.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.size = 0
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, local_file_path: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry["path"] != local_file_path or not os.path.isfile(local_file_path):
+                self._pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, local_file_path: str, etag: Optional[str]) -> None:
+        with self.lock:
+            self._pop(key)
+            entry = {
+                "path": local_file_path,
+                "etag": etag,
+                "size": os.path.getsize(local_file_path),
+                "validated_at": time.time(),
+            }
+            self.entries[key] = entry
+            self.size += entry["size"]
+            self._evict()
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def fetch(
+        self,
+        key: str,
+        local_file_path: str,
+        download: Callable[[Optional[str], str], Optional[str]],
+    ) -> str:
+        """
+        Returns the local copy of the object, downloading it if needed.
+        `download(etag, path)` writes the object to `path` and returns its ETag,
+        or returns None when the object still matches `etag`.
+        """
+        entry = self.get(key, local_file_path)
+        if entry and time.time() - entry["validated_at"] < self.ttl:
+            return local_file_path
+
+        # Download next to the target and swap it in, so readers never see partial files
+        tmp_file_path = f"{local_file_path}.{uuid.uuid4().hex}.part"
+        try:
+            etag = download(entry["etag"] if entry else None, tmp_file_path)
+            if etag is None and entry:
+                entry["validated_at"] = time.time()
+                return local_file_path
+
+            os.replace(tmp_file_path, local_file_path)
+            self.put(key, local_file_path, etag)
+            return local_file_path
+        finally:
+            if os.path.exists(tmp_file_path):
+                os.remove(tmp_file_path)
+
+    def _pop(self, key: str) -> Optional[dict]:
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= entry["size"]
+        return entry
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it is larger than the cache
+        while self.size > self.max_size and len(self.entries) > 1:
+            key, entry = next(iter(self.entries.items()))
+            self._pop(key)
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            log.debug(f"Evicted {key} from the local storage cache")
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -44,7 +152,7 @@ class StorageProvider(ABC):
         pass
 
     @abstractmethod
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[dict, str]:
         pass
 
     @abstractmethod
@@ -58,14 +166,24 @@ class StorageProvider(ABC):
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
-    def upload_file(file: BinaryIO, filename: str) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    def upload_file(file: BinaryIO, filename: str) -> Tuple[dict, str]:
+        """
+        Streams the file to local storage in chunks, computing its SHA-256 on the fly.
+        Returns the file info ({"size", "sha256"}) and the local path.
+        """
         file_path = f"{UPLOAD_DIR}/{filename}"
+        sha256 = hashlib.sha256()
+        size = 0
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            while chunk := file.read(CHUNK_SIZE):
+                sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return {"size": size, "sha256": sha256.hexdigest()}, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -130,17 +248,34 @@ class S3StorageProvider(StorageProvider):
 
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
+        self.transfer_config = TransferConfig(
+            multipart_threshold=CHUNK_SIZE, multipart_chunksize=CHUNK_SIZE
+        )
+        self.cache = LocalFileCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, STORAGE_CACHE_TTL
+        )
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[dict, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename)
         try:
             s3_key = os.path.join(self.key_prefix, filename)
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
-            return (
-                open(file_path, "rb").read(),
-                "s3://" + self.bucket_name + "/" + s3_key,
-            )
+            if file_info["size"] < CHUNK_SIZE:
+                with open(file_path, "rb") as f:
+                    etag = self.s3_client.put_object(
+                        Bucket=self.bucket_name, Key=s3_key, Body=f
+                    )["ETag"]
+            else:
+                # Large files are sent as a multipart upload read from disk chunk by chunk
+                self.s3_client.upload_file(
+                    file_path, self.bucket_name, s3_key, Config=self.transfer_config
+                )
+                # upload_file does not return the ETag, which later revalidation needs
+                etag = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)[
+                    "ETag"
+                ]
+            self.cache.put(s3_key, file_path, etag)
+            return file_info, "s3://" + self.bucket_name + "/" + s3_key
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -149,8 +284,24 @@ class S3StorageProvider(StorageProvider):
         try:
             s3_key = self._extract_s3_key(file_path)
             local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+
+            def download(etag: Optional[str], path: str) -> Optional[str]:
+                try:
+                    response = self.s3_client.get_object(
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        **({"IfNoneMatch": etag} if etag else {}),
+                    )
+                except ClientError as e:
+                    if e.response["Error"]["Code"] == "304":
+                        return None
+                    raise
+                with open(path, "wb") as f:
+                    for chunk in response["Body"].iter_chunks(CHUNK_SIZE):
+                        f.write(chunk)
+                return response["ETag"]
+
+            return self.cache.fetch(s3_key, local_file_path, download)
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -159,6 +310,7 @@ class S3StorageProvider(StorageProvider):
         try:
             s3_key = self._extract_s3_key(file_path)
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            self.cache.remove(s3_key)
         except ClientError as e:
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
@@ -181,6 +333,8 @@ class S3StorageProvider(StorageProvider):
         except ClientError as e:
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
+        self.cache.clear()
+
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
 
@@ -206,14 +360,19 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = LocalFileCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, STORAGE_CACHE_TTL
+        )
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[dict, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename)
         try:
-            blob = self.bucket.blob(filename)
+            # Setting a chunk size makes the client use a chunked resumable upload
+            blob = self.bucket.blob(filename, chunk_size=CHUNK_SIZE)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            self.cache.put(filename, file_path, blob.etag)
+            return file_info, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -222,10 +381,16 @@ class GCSStorageProvider(StorageProvider):
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
-            blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
 
-            return local_file_path
+            def download(etag: Optional[str], path: str) -> Optional[str]:
+                blob = self.bucket.blob(filename)
+                try:
+                    blob.download_to_filename(path, if_etag_not_match=etag)
+                except NotModified:
+                    return None
+                return blob.etag
+
+            return self.cache.fetch(filename, local_file_path, download)
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -235,6 +400,7 @@ class GCSStorageProvider(StorageProvider):
             filename = file_path.removeprefix("gs://").split("/")[1]
             blob = self.bucket.get_blob(filename)
             blob.delete()
+            self.cache.remove(filename)
         except NotFound as e:
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
@@ -252,6 +418,8 @@ class GCSStorageProvider(StorageProvider):
         except NotFound as e:
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
+        self.cache.clear()
+
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
 
@@ -276,14 +444,22 @@ class AzureStorageProvider(StorageProvider):
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = LocalFileCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, STORAGE_CACHE_TTL
+        )
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[dict, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        file_info, file_path = LocalStorageProvider.upload_file(file, filename)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Passing the stream lets the SDK stage it as blocks instead of one request
+            with open(file_path, "rb") as data:
+                response = blob_client.upload_blob(
+                    data, overwrite=True, length=file_info["size"]
+                )
+            self.cache.put(filename, file_path, response.get("etag"))
+            return file_info, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -293,9 +469,26 @@ class AzureStorageProvider(StorageProvider):
             filename = file_path.split("/")[-1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def download(etag: Optional[str], path: str) -> Optional[str]:
+                try:
+                    downloader = blob_client.download_blob(
+                        **(
+                            {
+                                "etag": etag,
+                                "match_condition": MatchConditions.IfModified,
+                            }
+                            if etag
+                            else {}
+                        )
+                    )
+                except ResourceNotModifiedError:
+                    return None
+                with open(path, "wb") as download_file:
+                    downloader.readinto(download_file)
+                return downloader.properties.etag
+
+            return self.cache.fetch(filename, local_file_path, download)
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -305,6 +498,7 @@ class AzureStorageProvider(StorageProvider):
             filename = file_path.split("/")[-1]
             blob_client = self.container_client.get_blob_client(filename)
             blob_client.delete_blob()
+            self.cache.remove(filename)
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
@@ -320,6 +514,8 @@ class AzureStorageProvider(StorageProvider):
         except Exception as e:
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
+        self.cache.clear()
+
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
 
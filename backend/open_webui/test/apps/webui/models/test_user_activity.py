@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.models import users
+from open_webui.models.users import User, UserActivityTracker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(users.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def user_db(monkeypatch):
+    """Points the users module at an in-memory database holding two users."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    User.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with get_db() as db:
+        db.add_all([User(id="u1", last_active_at=0), User(id="u2", last_active_at=0)])
+        db.commit()
+
+    monkeypatch.setattr(users, "get_db", get_db)
+    yield get_db
+    engine.dispose()
+
+
+def last_active(get_db) -> dict[str, int]:
+    with get_db() as db:
+        return {user.id: user.last_active_at for user in db.query(User).all()}
+
+
+def test_touch_coalesces_within_interval(clock, user_db):
+    tracker = UserActivityTracker(interval=60)
+    tracker.touch("u1")
+    first = int(clock[0])
+
+    clock[0] += 30
+    tracker.touch("u1")
+    assert tracker._pending == {"u1": first}
+
+    # One write covers every touch recorded since the last flush
+    tracker.touch("u2")
+    assert tracker.flush() == 2
+    assert last_active(user_db) == {"u1": first, "u2": int(clock[0])}
+
+    # Still inside the interval: nothing new to write
+    clock[0] += 10
+    tracker.touch("u1")
+    assert tracker.flush() == 0
+
+    clock[0] += 60
+    tracker.touch("u1")
+    assert tracker.flush() == 1
+    assert last_active(user_db)["u1"] == int(clock[0])
+
+
+def test_failed_flush_is_requeued(clock, user_db, monkeypatch):
+    tracker = UserActivityTracker(interval=60)
+    tracker.touch("u1")
+    touched_at = int(clock[0])
+
+    @contextmanager
+    def broken_db():
+        raise Exception("database is unavailable")
+        yield
+
+    monkeypatch.setattr(users, "get_db", broken_db)
+    assert tracker.flush() == 0
+    assert tracker._pending == {"u1": touched_at}
+
+    # A newer timestamp recorded meanwhile wins over the requeued one
+    clock[0] += 120
+    tracker.touch("u1")
+
+    monkeypatch.setattr(users, "get_db", user_db)
+    assert tracker.flush() == 1
+    assert last_active(user_db)["u1"] == int(clock[0])
+    assert tracker._pending == {}
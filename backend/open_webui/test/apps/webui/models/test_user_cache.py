@@ -0,0 +1,173 @@
+import threading
+
+import fakeredis
+import pytest
+
+from open_webui.models import users
+from open_webui.models.users import UserCache, UserModel
+
+
+def make_user(user_id: str, role: str = "user") -> UserModel:
+    return UserModel(
+        id=user_id,
+        name=user_id,
+        email=f"{user_id}@example.com",
+        role=role,
+        profile_image_url="",
+        last_active_at=0,
+        updated_at=0,
+        created_at=0,
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(users.time, "monotonic", lambda: now[0])
+    return now
+
+
+class StubUsers:
+    """Stands in for the users table, counting the lookups that reach it."""
+
+    def __init__(self):
+        self.users = {}
+        self.api_keys = {}
+        self.loads = 0
+
+    def get_user_by_id(self, id):
+        self.loads += 1
+        return self.users.get(id)
+
+    def get_user_by_api_key(self, api_key):
+        self.loads += 1
+        return self.users.get(self.api_keys.get(api_key))
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = StubUsers()
+    for user_id in ["u1", "u2", "u3"]:
+        table.users[user_id] = make_user(user_id)
+    table.api_keys["sk-1"] = "u1"
+    monkeypatch.setattr(users, "Users", table)
+    return table
+
+
+def test_entries_expire_after_ttl(clock, table):
+    cache = UserCache(ttl=30)
+
+    assert cache.get_user_by_id("u1").id == "u1"
+    clock[0] += 29
+    cache.get_user_by_id("u1")
+    assert table.loads == 1
+
+    clock[0] += 2
+    cache.get_user_by_id("u1")
+    assert table.loads == 2
+
+    # Cached users are copies, changing one doesn't change the cache
+    cache.get_user_by_id("u1").role = "admin"
+    assert cache.get_user_by_id("u1").role == "user"
+
+
+def test_least_recently_used_entry_is_evicted(clock, table):
+    cache = UserCache(ttl=30, max_size=2)
+
+    cache.get_user_by_id("u1")
+    cache.get_user_by_id("u2")
+    # A hit makes u1 the most recently used entry
+    cache.get_user_by_id("u1")
+    cache.get_user_by_id("u3")
+    assert list(cache._entries) == ["id:u1", "id:u3"]
+
+    table.loads = 0
+    cache.get_user_by_id("u1")
+    assert table.loads == 0
+    cache.get_user_by_id("u2")
+    assert table.loads == 1
+
+
+def test_invalidate_drops_id_and_api_key_entries(clock, table):
+    cache = UserCache(ttl=30)
+
+    cache.get_user_by_id("u1")
+    cache.get_user_by_api_key("sk-1")
+    cache.get_user_by_id("u2")
+    # API keys are only kept hashed
+    assert not any("sk-1" in key for key in cache._entries)
+
+    table.users["u1"] = make_user("u1", role="pending")
+    cache.invalidate("u1")
+    assert list(cache._entries) == ["id:u2"]
+    assert cache.get_user_by_id("u1").role == "pending"
+    assert cache.get_user_by_api_key("sk-1").role == "pending"
+
+
+def test_load_overlapping_invalidation_is_not_cached(clock, table):
+    cache = UserCache(ttl=30)
+    loading = threading.Event()
+    resume = threading.Event()
+
+    def slow_load(id):
+        user = make_user(id)
+        loading.set()
+        resume.wait(5)
+        return user
+
+    table.get_user_by_id = slow_load
+    result = []
+    thread = threading.Thread(target=lambda: result.append(cache.get_user_by_id("u1")))
+    thread.start()
+
+    # The user is updated while the old row is being loaded
+    assert loading.wait(5)
+    cache.invalidate("u1")
+    resume.set()
+    thread.join(5)
+
+    # The caller still gets what it loaded, but it isn't cached
+    assert result[0].id == "u1"
+    assert cache._entries == {}
+
+
+def test_invalidation_from_other_workers(clock, table, monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        users,
+        "get_redis_connection",
+        lambda redis_url, redis_sentinels, decode_responses=True: fakeredis.FakeRedis(
+            server=server, decode_responses=decode_responses
+        ),
+    )
+    subscriber = fakeredis.FakeRedis(server=server, decode_responses=True).pubsub(
+        ignore_subscribe_messages=True
+    )
+    subscriber.subscribe(UserCache.CHANNEL)
+
+    worker = UserCache(ttl=30)
+    other_worker = UserCache(ttl=30)
+    worker.initialize("redis://localhost")
+    for cache in [worker, other_worker]:
+        cache.get_user_by_id("u1")
+        cache.get_user_by_id("u2")
+
+    worker.invalidate("u1")
+    # time.monotonic is frozen by the clock fixture, so poll a bounded number
+    # of times instead of until a deadline
+    for _ in range(50):
+        message = subscriber.get_message(timeout=0.1)
+        if message is not None:
+            break
+    assert message is not None
+
+    # Other workers drop the user, the worker that sent it ignores its own echo
+    other_worker._handle_message(message)
+    assert list(other_worker._entries) == ["id:u2"]
+    worker.get_user_by_id("u1")
+    worker._handle_message(message)
+    assert sorted(worker._entries) == ["id:u1", "id:u2"]
+
+    # Malformed messages are ignored
+    other_worker._handle_message({"data": "not json"})
+    assert list(other_worker._entries) == ["id:u2"]
@@ -0,0 +1,119 @@
+import aiohttp
+import pytest
+from yarl import URL
+
+from open_webui.retrieval.utils import EmbeddingClient
+
+EMBEDDING_URL = "http://embeddings.local/v1"
+MODEL = "test-model"
+
+
+class StubEngine:
+    """Stands in for the embedding API: records the size of every request and
+    answers it with `failures` (a list of status codes) before succeeding."""
+
+    def __init__(self, failures=None, max_batch_size=None):
+        self.failures = list(failures or [])
+        self.max_batch_size = max_batch_size
+        self.requests = []
+
+    async def __call__(self, engine, model, texts, url, key, prefix, user):
+        self.requests.append(len(texts))
+        status = self.failures.pop(0) if self.failures else None
+        if status is None and self.max_batch_size and len(texts) > self.max_batch_size:
+            status = 413
+        if status is not None:
+            raise aiohttp.ClientResponseError(
+                request_info=aiohttp.RequestInfo(URL(url), "POST", {}, URL(url)),
+                history=(),
+                status=status,
+                headers={},
+            )
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    clients = []
+
+    def make(engine: StubEngine, **kwargs) -> EmbeddingClient:
+        embedding_client = EmbeddingClient(**kwargs)
+        monkeypatch.setattr(embedding_client, "_request", engine)
+        monkeypatch.setattr(
+            embedding_client, "_get_retry_delay", lambda attempt, headers=None: 0
+        )
+        clients.append(embedding_client)
+        return embedding_client
+
+    yield make
+    for embedding_client in clients:
+        embedding_client.close()
+
+
+def embed(embedding_client: EmbeddingClient, texts: list[str], batch_size: int):
+    return embedding_client.embed(
+        "openai", MODEL, texts, EMBEDDING_URL, batch_size=batch_size
+    )
+
+
+def test_batch_shrinks_after_413(client):
+    engine = StubEngine(max_batch_size=4)
+    embedding_client = client(engine)
+    texts = [str(i) for i in range(16)]
+
+    # Results keep the order of the texts across the split batches
+    assert embed(embedding_client, texts, 16) == [[float(len(t))] for t in texts]
+    assert engine.requests[0] == 16
+    assert max(engine.requests[1:]) <= 8
+    assert embedding_client._batch_limits[(EMBEDDING_URL, MODEL)] < 16
+
+    # Later calls start from the lowered size instead of failing again
+    engine.requests.clear()
+    embed(embedding_client, texts, 16)
+    assert engine.requests[0] < 16
+
+
+def test_batch_shrinks_after_429(client):
+    engine = StubEngine(failures=[429])
+    embedding_client = client(engine)
+
+    assert len(embed(embedding_client, ["a"] * 8, 8)) == 8
+    assert engine.requests == [8, 8]
+
+    engine.requests.clear()
+    embed(embedding_client, ["a"] * 8, 8)
+    assert max(engine.requests) < 8
+
+
+def test_retries_stop_at_max_retries(client):
+    engine = StubEngine(failures=[503] * 10)
+    embedding_client = client(engine, max_retries=2)
+
+    with pytest.raises(aiohttp.ClientResponseError) as exc:
+        embed(embedding_client, ["a", "b"], 2)
+    assert exc.value.status == 503
+    assert engine.requests == [2, 2, 2]
+
+
+def test_client_errors_are_not_retried(client):
+    engine = StubEngine(failures=[400])
+    embedding_client = client(engine, max_retries=3)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        embed(embedding_client, ["a"], 1)
+    assert engine.requests == [1]
+
+
+def test_max_batch_tokens_splits_batches(client):
+    engine = StubEngine()
+    # Each text is estimated at 25 tokens (len // 4 + 1)
+    embedding_client = client(engine, max_batch_tokens=60)
+    texts = ["x" * 96] * 5
+
+    assert len(embed(embedding_client, texts, 100)) == 5
+    assert sorted(engine.requests) == [1, 2, 2]
+
+    # A single text over the budget is still sent on its own
+    engine.requests.clear()
+    embed(embedding_client, ["x" * 1000], 100)
+    assert engine.requests == [1]
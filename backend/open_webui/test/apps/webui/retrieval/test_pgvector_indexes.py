@@ -0,0 +1,149 @@
+import pytest
+
+from open_webui.retrieval.vector.dbs import pgvector
+from open_webui.retrieval.vector.dbs.pgvector import PgvectorClient, VECTOR_INDEX_NAME
+
+
+class StubConnection:
+    """Records the statements run on it and answers the row count queries."""
+
+    def __init__(self, row_count=0, collections=()):
+        self.row_count = row_count
+        self.collections = list(collections)
+        self.statements = []
+        self.execution_options_used = {}
+
+    def execution_options(self, **kwargs):
+        self.execution_options_used.update(kwargs)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return self
+
+    def scalar(self):
+        return self.row_count
+
+    def all(self):
+        return self.collections
+
+
+class StubEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def connect(self):
+        return self.connection
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    def apply(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(pgvector, name, value)
+
+    apply(
+        PGVECTOR_INDEX_METHOD="hnsw",
+        PGVECTOR_HNSW_M=16,
+        PGVECTOR_HNSW_EF_CONSTRUCTION=64,
+        PGVECTOR_IVFFLAT_LISTS=0,
+        PGVECTOR_COLLECTION_INDEX_MIN_ROWS=0,
+    )
+    return apply
+
+
+def make_client(connection: StubConnection) -> PgvectorClient:
+    # Skips __init__, which connects to the database
+    client = PgvectorClient.__new__(PgvectorClient)
+    client.engine = StubEngine(connection)
+    client.delete = lambda collection_name: None
+    return client
+
+
+def test_hnsw_index_ddl(settings):
+    client = make_client(StubConnection())
+
+    assert client._vector_index_ddl(VECTOR_INDEX_NAME, if_not_exists=True) == (
+        f"CREATE INDEX IF NOT EXISTS {VECTOR_INDEX_NAME} ON document_chunk "
+        "USING hnsw (vector vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def test_ivfflat_index_ddl(settings):
+    settings(PGVECTOR_INDEX_METHOD="ivfflat")
+    client = make_client(StubConnection())
+
+    # lists follows the row count: rows / 1000 (at least 100) up to 1M rows,
+    # sqrt(rows) above, unless configured
+    assert client._vector_index_ddl("idx", row_count=500_000, concurrently=True) == (
+        "CREATE INDEX CONCURRENTLY idx ON document_chunk "
+        "USING ivfflat (vector vector_cosine_ops) WITH (lists = 500)"
+    )
+    assert client._ivfflat_lists(10_000) == 100
+    assert client._ivfflat_lists(4_000_000) == 2000
+
+    settings(PGVECTOR_IVFFLAT_LISTS=42)
+    assert client._ivfflat_lists(4_000_000) == 42
+
+
+def test_collection_index_ddl_is_escaped(settings):
+    client = make_client(StubConnection())
+    index_name = client._collection_index_name("file-o'brien:1")
+
+    assert index_name.startswith(f"{VECTOR_INDEX_NAME}_")
+    assert client._vector_index_ddl(
+        index_name, collection_name="file-o'brien:1"
+    ).endswith("WHERE collection_name = 'file-o''brien\\:1'")
+
+
+def test_rebuild_indexes(settings):
+    settings(PGVECTOR_COLLECTION_INDEX_MIN_ROWS=1000)
+    connection = StubConnection(row_count=5000, collections=[("docs", 2000)])
+    client = make_client(connection)
+    collection_index = client._collection_index_name("docs")
+
+    assert client.rebuild_indexes() == {
+        "method": "hnsw",
+        "rows": 5000,
+        "collections": ["docs"],
+    }
+    # Run outside a transaction, which CONCURRENTLY requires
+    assert connection.execution_options_used == {"isolation_level": "AUTOCOMMIT"}
+
+    ddl = "USING hnsw (vector vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    statements = [s for s in connection.statements if "count(*)" not in s]
+    assert statements == [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}_rebuild",
+        f"CREATE INDEX CONCURRENTLY {VECTOR_INDEX_NAME}_rebuild "
+        f"ON document_chunk {ddl}",
+        f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}",
+        f"ALTER INDEX {VECTOR_INDEX_NAME}_rebuild RENAME TO {VECTOR_INDEX_NAME}",
+        f"DROP INDEX CONCURRENTLY IF EXISTS {collection_index}_rebuild",
+        f"CREATE INDEX CONCURRENTLY {collection_index}_rebuild "
+        f"ON document_chunk {ddl} WHERE collection_name = 'docs'",
+        f"DROP INDEX CONCURRENTLY IF EXISTS {collection_index}",
+        f"ALTER INDEX {collection_index}_rebuild RENAME TO {collection_index}",
+    ]
+
+
+def test_delete_collection_drops_index_concurrently(settings):
+    connection = StubConnection()
+    client = make_client(connection)
+
+    # Without per-collection indexes there is nothing to drop
+    client.delete_collection("docs")
+    assert connection.statements == []
+
+    settings(PGVECTOR_COLLECTION_INDEX_MIN_ROWS=1000)
+    client.delete_collection("docs")
+    assert connection.execution_options_used == {"isolation_level": "AUTOCOMMIT"}
+    assert connection.statements == [
+        f"DROP INDEX CONCURRENTLY IF EXISTS {client._collection_index_name('docs')}"
+    ]
@@ -0,0 +1,130 @@
+import asyncio
+
+from aiohttp import web
+from langchain_core.documents import Document
+
+from open_webui.retrieval.web import utils
+from open_webui.retrieval.web.utils import SafeWebBaseLoader, WebPageCache
+
+PAGE = "<html><head><title>{title}</title></head><body>{title}</body></html>"
+
+
+def _doc(text: str) -> Document:
+    return Document(page_content=text, metadata={"source": text})
+
+
+async def _serve(pages: dict, hits: dict):
+    """Serves `pages` (name -> (title, etag, last_modified)) and honors
+    conditional requests the way a well-behaved origin does."""
+
+    async def handler(request):
+        name = request.match_info["name"]
+        hits.setdefault(name, []).append(dict(request.headers))
+        title, etag, last_modified = pages[name]
+        headers = {}
+        if etag:
+            headers["ETag"] = etag
+        if last_modified:
+            headers["Last-Modified"] = last_modified
+
+        if (etag and request.headers.get("If-None-Match") == etag) or (
+            not etag
+            and last_modified
+            and request.headers.get("If-Modified-Since") == last_modified
+        ):
+            return web.Response(status=304, headers=headers)
+        return web.Response(
+            text=PAGE.format(title=title), content_type="text/html", headers=headers
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _load(cache: WebPageCache, urls: list[str]) -> list[Document]:
+    loader = SafeWebBaseLoader(web_paths=urls, verify_ssl=False, cache=cache)
+    return await loader.aload()
+
+
+def test_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.time_module, "time", lambda: now[0])
+
+    cache = WebPageCache(max_size=1024, ttl=60)
+    cache.put("a", [_doc("a")], etag='"1"')
+    entry = cache.get("a")
+    assert cache.is_fresh(entry)
+
+    now[0] += 61
+    assert not cache.is_fresh(entry)
+    # Stale entries are kept around so they can be revalidated
+    assert cache.get("a")["etag"] == '"1"'
+
+    cache.touch("a")
+    assert cache.is_fresh(cache.get("a"))
+
+
+def test_cache_size_cap():
+    cache = WebPageCache(max_size=10, ttl=60)
+    cache.put("a", [_doc("aaaa")])
+    cache.put("b", [_doc("bbbb")])
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+
+    cache.put("c", [_doc("cccc")])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size == 8
+
+    # Replacing an entry accounts for the size of the old one
+    cache.put("a", [_doc("aa")])
+    assert cache.size == 6
+
+    # Pages larger than the whole cache aren't stored
+    cache.put("d", [_doc("d" * 11)])
+    assert cache.get("d") is None
+    assert cache.size == 6
+
+
+def test_revalidation_with_etag_and_last_modified():
+    async def run():
+        pages = {
+            "etag": ("first", '"v1"', None),
+            "modified": ("first", None, "Mon, 01 Jan 2024 00:00:00 GMT"),
+        }
+        hits = {}
+        runner, base = await _serve(pages, hits)
+        cache = WebPageCache(max_size=1024 * 1024, ttl=60)
+        urls = [f"{base}/etag", f"{base}/modified"]
+        try:
+            first = await _load(cache, urls)
+
+            # Unchanged pages answer 304 and are served from the cache
+            second = await _load(cache, urls)
+
+            # A changed page is downloaded again and replaces the cached copy
+            pages["etag"] = ("second", '"v2"', None)
+            third = await _load(cache, urls)
+        finally:
+            await runner.cleanup()
+        return first, second, third, hits, cache, urls
+
+    first, second, third, hits, cache, urls = asyncio.run(run())
+
+    assert [doc.metadata["title"] for doc in first] == ["first", "first"]
+    assert [doc.metadata["title"] for doc in second] == ["first", "first"]
+    assert [doc.metadata["title"] for doc in third] == ["second", "first"]
+
+    assert "If-None-Match" not in hits["etag"][0]
+    assert hits["etag"][1]["If-None-Match"] == '"v1"'
+    assert hits["modified"][1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    assert cache.get(urls[0])["etag"] == '"v2"'
+    assert cache.get(urls[0])["docs"][0].metadata["title"] == "second"
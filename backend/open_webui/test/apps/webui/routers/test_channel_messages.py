@@ -0,0 +1,158 @@
+import os
+import uuid
+
+from sqlalchemy import event, text
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+NUM_MESSAGES = int(os.environ.get("CHANNEL_BENCHMARK_MESSAGES", "200"))
+PAGE_SIZE = 50
+
+
+def _legacy_message_user_responses(message_list):
+    """The per-message lookups get_channel_messages used before."""
+    from open_webui.models.messages import Messages
+    from open_webui.models.users import UserNameResponse, Users
+    from open_webui.routers.channels import MessageUserResponse
+
+    users = {}
+
+    messages = []
+    for message in message_list:
+        if message.user_id not in users:
+            users[message.user_id] = Users.get_user_by_id(message.user_id)
+
+        replies = Messages.get_replies_by_message_id(message.id)
+        latest_reply_at = replies[0].created_at if replies else None
+
+        messages.append(
+            MessageUserResponse(
+                **{
+                    **message.model_dump(),
+                    "reply_count": len(replies),
+                    "latest_reply_at": latest_reply_at,
+                    "reactions": Messages.get_reactions_by_message_id(message.id),
+                    "user": UserNameResponse(**users[message.user_id].model_dump()),
+                }
+            )
+        )
+    return messages
+
+
+class QueryCounter:
+    def __init__(self):
+        from open_webui.internal.db import engine
+
+        self.engine = engine
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestChannelMessages(AbstractPostgresTest):
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.messages import MessageForm, Messages
+        from open_webui.models.users import Users
+
+        self.messages = Messages
+        self.channel_id = str(uuid.uuid4())
+        users = [
+            Users.insert_new_user(
+                str(uuid.uuid4()), f"user-{i}", f"{uuid.uuid4()}@test"
+            )
+            for i in range(5)
+        ]
+
+        for i in range(NUM_MESSAGES):
+            user = users[i % len(users)]
+            message = Messages.insert_new_message(
+                MessageForm(content=f"message {i}"), self.channel_id, user.id
+            )
+            for j in range(i % 3):
+                Messages.insert_new_message(
+                    MessageForm(content=f"reply {j}", parent_id=message.id),
+                    self.channel_id,
+                    users[j].id,
+                )
+            if i % 2 == 0:
+                Messages.add_reaction_to_message(message.id, user.id, "thumbsup")
+                Messages.add_reaction_to_message(message.id, users[0].id, "thumbsup")
+
+    def teardown_method(self):
+        super().teardown_method()
+        from open_webui.internal.db import Session
+
+        for table in ["message", "message_reaction"]:
+            Session.execute(text(f"TRUNCATE TABLE {table}"))
+        Session.commit()
+
+    def _all_pages(self) -> list[str]:
+        pages = []
+        before_id = None
+        while True:
+            page = self.messages.get_messages_by_channel_id(
+                self.channel_id, limit=PAGE_SIZE, before_id=before_id
+            )
+            pages.extend(message.id for message in page)
+            if len(page) < PAGE_SIZE:
+                break
+            before_id = page[-1].id
+        return pages
+
+    def test_keyset_pagination_matches_offset(self):
+        pages = self._all_pages()
+
+        assert pages == [
+            message.id
+            for message in self.messages.get_messages_by_channel_id(
+                self.channel_id, limit=None
+            )
+        ]
+        assert len(pages) == NUM_MESSAGES
+
+    def test_keyset_pagination_with_equal_timestamps(self):
+        from open_webui.internal.db import Session
+
+        # Messages sharing a timestamp across a page boundary are neither
+        # skipped nor repeated
+        Session.execute(
+            text(
+                "UPDATE message SET created_at = 1 "
+                "WHERE channel_id = :channel_id AND parent_id IS NULL"
+            ),
+            {"channel_id": self.channel_id},
+        )
+        Session.commit()
+
+        pages = self._all_pages()
+        assert len(pages) == NUM_MESSAGES
+        assert len(set(pages)) == NUM_MESSAGES
+        assert pages == sorted(pages, reverse=True)
+
+    def test_message_responses_match_legacy(self):
+        from open_webui.routers.channels import get_message_user_responses
+
+        message_list = self.messages.get_messages_by_channel_id(
+            self.channel_id, limit=PAGE_SIZE
+        )
+
+        with QueryCounter() as legacy_queries:
+            legacy = _legacy_message_user_responses(message_list)
+
+        with QueryCounter() as current_queries:
+            current = get_message_user_responses(message_list)
+
+        assert current == legacy
+        # Users, reply counts and reactions for the whole page, against two
+        # queries per message before
+        assert current_queries.count == 3
+        assert legacy_queries.count >= 2 * PAGE_SIZE
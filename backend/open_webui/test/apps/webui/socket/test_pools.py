@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from open_webui.socket import main as socket_main
+from open_webui.socket import utils
+from open_webui.socket.utils import (
+    RedisLock,
+    RedisSessionPool,
+    RedisUsagePool,
+    SessionPool,
+    UsagePool,
+)
+
+PREFIX = "open-webui:socket"
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        utils,
+        "get_async_redis_connection",
+        lambda redis_url, redis_sentinels, decode_responses=True: fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=decode_responses
+        ),
+    )
+    return server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(utils.time, "time", lambda: now[0])
+    return now
+
+
+def make_pool(ttl: int = 120) -> RedisSessionPool:
+    return RedisSessionPool(PREFIX, redis_url="redis://localhost", ttl=ttl)
+
+
+def test_session_pool():
+    async def run():
+        pool = SessionPool()
+        assert await pool.add("s1", {"id": "u1"})
+        assert not await pool.add("s2", {"id": "u1"})
+        assert sorted(await pool.get_session_ids("u1")) == ["s1", "s2"]
+        assert await pool.remove("s1") == ({"id": "u1"}, False)
+        assert await pool.remove("s2") == ({"id": "u1"}, True)
+        assert await pool.remove("s2") == (None, False)
+        assert not await pool.is_active("u1")
+
+    asyncio.run(run())
+
+
+def test_redis_session_pool_removal(redis_server):
+    async def run():
+        pool = make_pool()
+        other_worker = make_pool()
+
+        assert await pool.add("s1", {"id": "u1", "name": "One"})
+        # The same user connecting through another worker is already online
+        assert not await other_worker.add("s2", {"id": "u1", "name": "One"})
+        assert await pool.get_many(["s1", "s2", "s3"]) == [
+            {"id": "u1", "name": "One"},
+            {"id": "u1", "name": "One"},
+            None,
+        ]
+        assert sorted(await pool.get_session_ids("u1")) == ["s1", "s2"]
+
+        # The user only goes offline with their last session
+        assert await pool.remove("s1") == ({"id": "u1", "name": "One"}, False)
+        assert await pool.is_active("u1")
+        assert await other_worker.remove("s2") == ({"id": "u1", "name": "One"}, True)
+        assert not await pool.is_active("u1")
+        assert await pool.get_user_ids() == []
+
+        client = fakeredis.FakeAsyncRedis(server=redis_server)
+        assert await client.exists(f"{PREFIX}:user:u1") == 0
+        assert await client.exists(f"{PREFIX}:session:s2") == 0
+
+    asyncio.run(run())
+
+
+def test_redis_session_pool_expiry(redis_server, clock):
+    async def run():
+        pool = make_pool(ttl=120)
+        dead_worker = make_pool(ttl=120)
+
+        await pool.add("s1", {"id": "u1"})
+        await dead_worker.add("s2", {"id": "u2"})
+        assert sorted(await pool.get_user_ids()) == ["u1", "u2"]
+
+        # Only the live worker keeps refreshing its sessions
+        clock[0] += 100
+        await pool.refresh()
+        clock[0] += 30
+        assert await pool.get_user_ids() == ["u1"]
+        assert await pool.get_session_ids("u1") == ["s1"]
+        assert not await pool.is_active("u2")
+
+        # Expired users are pruned from the shared set on the next refresh
+        await pool.refresh()
+        client = fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+        assert await client.zrange(f"{PREFIX}:users", 0, -1) == ["u1"]
+
+        # A refresh doesn't bring back a session removed by another worker
+        await make_pool(ttl=120).remove("s1")
+        await pool.refresh()
+        assert await client.zscore(f"{PREFIX}:users", "u1") is None
+        assert await client.zscore(f"{PREFIX}:user:u1", "s1") is None
+
+    asyncio.run(run())
+
+
+def test_usage_pools(redis_server, clock):
+    async def run():
+        for pool in [
+            UsagePool(),
+            RedisUsagePool(f"{PREFIX}:usage", redis_url="redis://localhost"),
+        ]:
+            assert await pool.touch("m1")
+            assert not await pool.touch("m1")
+            clock[0] += 10
+            assert await pool.touch("m2")
+
+            assert await pool.cleanup(5)
+            assert await pool.get_models() == ["m2"]
+            assert not await pool.cleanup(5)
+
+    asyncio.run(run())
+
+
+def test_cleanup_lock_takeover(redis_server, monkeypatch):
+    async def run():
+        lock_name = "usage_cleanup_lock"
+        previous_holder = RedisLock("redis://localhost", lock_name, timeout_secs=1)
+        assert await previous_holder.acquire_lock()
+
+        lock = RedisLock("redis://localhost", lock_name, timeout_secs=1)
+        usage_pool = UsagePool()
+        usage_pool.models["stale"] = time.time() - 60
+        emitted = []
+
+        async def emit(event, data, **kwargs):
+            emitted.append((event, data))
+
+        monkeypatch.setattr(socket_main, "aquire_func", lock.acquire_lock)
+        monkeypatch.setattr(socket_main, "renew_func", lock.renew_lock)
+        monkeypatch.setattr(socket_main, "release_func", lock.release_lock)
+        monkeypatch.setattr(socket_main, "USAGE_POOL", usage_pool)
+        monkeypatch.setattr(socket_main, "TIMEOUT_DURATION", 0.1)
+        monkeypatch.setattr(socket_main.sio, "emit", emit)
+
+        task = asyncio.create_task(socket_main.periodic_usage_pool_cleanup())
+        # The previous holder stopped renewing, the lock is taken over once
+        # it expires
+        await asyncio.sleep(0.5)
+        assert emitted == []
+        deadline = time.monotonic() + 5
+        while not emitted and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert emitted == [("usage", {"models": []})]
+
+        client = fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+        assert await client.get(lock_name) == lock.lock_id
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # The lock is released on shutdown
+        assert await client.get(lock_name) is None
+
+    asyncio.run(run())
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from open_webui.models.users import UserModel
+from open_webui.socket import main as socket_main
+from open_webui.socket.main import PRESENCE_ROOM, PresenceBroadcaster
+from open_webui.socket.utils import SessionPool, UsagePool
+
+
+def make_user(user_id: str) -> UserModel:
+    return UserModel(
+        id=user_id,
+        name=user_id,
+        email=f"{user_id}@example.com",
+        role="user",
+        profile_image_url="",
+        last_active_at=0,
+        updated_at=0,
+        created_at=0,
+    )
+
+
+@pytest.fixture
+def presence(monkeypatch):
+    emitted = []
+
+    async def emit(event, data, **kwargs):
+        emitted.append((event, data, kwargs))
+
+    async def enter_room(sid, room):
+        pass
+
+    broadcaster = PresenceBroadcaster()
+    monkeypatch.setattr(socket_main, "SESSION_POOL", SessionPool())
+    monkeypatch.setattr(socket_main, "USAGE_POOL", UsagePool())
+    monkeypatch.setattr(socket_main, "Presence", broadcaster)
+    monkeypatch.setattr(socket_main.sio, "emit", emit)
+    monkeypatch.setattr(socket_main.sio, "enter_room", enter_room)
+    return broadcaster, emitted
+
+
+def room_events(emitted):
+    return [
+        (event, data)
+        for event, data, kwargs in emitted
+        if kwargs.get("room") == PRESENCE_ROOM
+    ]
+
+
+def test_presence_deltas(presence):
+    broadcaster, emitted = presence
+
+    async def run():
+        # Only a user's first session makes them come online
+        await socket_main.join_presence("s1", make_user("u1"))
+        await socket_main.join_presence("s2", make_user("u1"))
+        await socket_main.join_presence("s3", make_user("u2"))
+        assert broadcaster.changes == {"u1": True, "u2": True}
+
+        # New sessions get the full state directly
+        assert [event for event, _, kwargs in emitted if kwargs.get("to") == "s3"] == [
+            "user-list",
+            "usage",
+        ]
+
+        await broadcaster.broadcast()
+        assert room_events(emitted) == [
+            ("user-presence", {"joined": ["u1", "u2"], "left": []})
+        ]
+
+        # Only a user's last session makes them go offline
+        emitted.clear()
+        await socket_main.disconnect("s1")
+        assert broadcaster.changes == {}
+        await socket_main.disconnect("s2")
+        await socket_main.disconnect("unknown")
+        assert broadcaster.changes == {"u1": False}
+
+        await broadcaster.broadcast()
+        assert room_events(emitted) == [
+            ("user-presence", {"joined": [], "left": ["u1"]})
+        ]
+
+        # Nothing to send when nothing changed
+        emitted.clear()
+        await broadcaster.broadcast()
+        assert emitted == []
+
+    asyncio.run(run())
+
+
+def test_presence_coalesces_changes(presence):
+    broadcaster, emitted = presence
+
+    async def run():
+        # A user that comes and goes within one interval only sends the last state
+        await socket_main.join_presence("s1", make_user("u1"))
+        await socket_main.disconnect("s1")
+        await socket_main.join_presence("s2", make_user("u1"))
+
+        await socket_main.usage("s2", {"model": "m1"})
+        await socket_main.usage("s2", {"model": "m1"})
+        await socket_main.usage("s2", {"model": "m2"})
+
+        emitted.clear()
+        await broadcaster.broadcast()
+        assert room_events(emitted) == [
+            ("user-presence", {"joined": ["u1"], "left": []}),
+            ("usage", {"models": ["m1", "m2"]}),
+        ]
+
+    asyncio.run(run())
+
+
+def test_presence_snapshot_stays_on_worker(presence):
+    broadcaster, emitted = presence
+
+    async def run():
+        await socket_main.join_presence("s1", make_user("u1"))
+        emitted.clear()
+        await broadcaster.send_snapshot()
+        assert emitted == [
+            (
+                "user-list",
+                {"user_ids": ["u1"]},
+                {"room": PRESENCE_ROOM, "ignore_queue": True},
+            )
+        ]
+
+    asyncio.run(run())
@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import boto3
@@ -69,7 +70,10 @@ class TestLocalStorageProvider:
         contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert contents == {
+            "size": len(self.file_content),
+            "sha256": hashlib.sha256(self.file_content).hexdigest(),
+        }
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -124,7 +128,10 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert contents == {
+            "size": len(self.file_content),
+            "sha256": hashlib.sha256(self.file_content).hexdigest(),
+        }
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -199,6 +206,94 @@ class TestS3StorageProvider:
         assert storage.bucket_name == provider.S3_BUCKET_NAME
 
 
+@mock_aws
+class TestS3StorageProviderCache:
+    """Local copies of S3 objects are served from LocalFileCache."""
+
+    def setup_method(self, method):
+        self.Storage = provider.S3StorageProvider()
+        self.Storage.bucket_name = "my-bucket"
+        self.s3_client = boto3.resource("s3", region_name="us-east-1")
+        self.file_content = b"test content"
+        self.filename = "test.txt"
+        self.filename_extra = "test_exyta.txt"
+
+    def _spy_get_object(self, monkeypatch):
+        calls = []
+        get_object = self.Storage.s3_client.get_object
+
+        def spy(**kwargs):
+            calls.append(kwargs)
+            return get_object(**kwargs)
+
+        monkeypatch.setattr(self.Storage.s3_client, "get_object", spy)
+        return calls
+
+    def test_get_file_cache_hit(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
+        self.Storage.cache.clear()
+        _, s3_file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename
+        )
+        calls = self._spy_get_object(monkeypatch)
+
+        # The uploaded copy is served while it's fresh
+        file_path = self.Storage.get_file(s3_file_path)
+        assert file_path == str(upload_dir / self.filename)
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        assert calls == []
+
+    def test_get_file_revalidation(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
+        self.Storage.cache.clear()
+        monkeypatch.setattr(self.Storage.cache, "ttl", 0)
+        _, s3_file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename
+        )
+        etag = self.Storage.cache.entries[self.filename]["etag"]
+        calls = self._spy_get_object(monkeypatch)
+
+        # A stale copy that still matches the object is revalidated (304)
+        self.Storage.get_file(s3_file_path)
+        assert calls[-1]["IfNoneMatch"] == etag
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        assert self.Storage.cache.entries[self.filename]["etag"] == etag
+
+        # Once the object changes it is downloaded again
+        self.s3_client.Object(self.Storage.bucket_name, self.filename).put(
+            Body=b"new content"
+        )
+        self.Storage.get_file(s3_file_path)
+        assert calls[-1]["IfNoneMatch"] == etag
+        assert (upload_dir / self.filename).read_bytes() == b"new content"
+        assert self.Storage.cache.entries[self.filename]["etag"] != etag
+        assert not [p for p in upload_dir.iterdir() if p.name.endswith(".part")]
+
+    def test_get_file_eviction(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
+        self.Storage.cache.clear()
+        monkeypatch.setattr(self.Storage.cache, "max_size", len(self.file_content))
+        _, s3_file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename
+        )
+        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename_extra)
+
+        # The least recently used copy is evicted from disk at the size cap
+        assert not (upload_dir / self.filename).exists()
+        assert (upload_dir / self.filename_extra).exists()
+        assert self.Storage.cache.size == len(self.file_content)
+
+        # and downloaded again on the next read
+        calls = self._spy_get_object(monkeypatch)
+        self.Storage.get_file(s3_file_path)
+        assert len(calls) == 1 and "IfNoneMatch" not in calls[0]
+        assert (upload_dir / self.filename).read_bytes() == self.file_content
+        assert not (upload_dir / self.filename_extra).exists()
+
+
 class TestGCSStorageProvider:
     Storage = provider.GCSStorageProvider()
     Storage.bucket_name = "my-bucket"
@@ -237,7 +332,10 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert contents == {
+            "size": len(self.file_content),
+            "sha256": hashlib.sha256(self.file_content).hexdigest(),
+        }
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
@@ -354,10 +452,11 @@ class TestAzureStorageProvider:
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once()
+        assert contents == {
+            "size": len(self.file_content),
+            "sha256": hashlib.sha256(self.file_content).hexdigest(),
+        }
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
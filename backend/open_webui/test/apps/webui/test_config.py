@@ -0,0 +1,215 @@
+import json
+import time
+from contextlib import contextmanager
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui import config
+from open_webui.config import AppConfig, PersistentConfig
+
+
+@pytest.fixture
+def config_db(monkeypatch):
+    """Points the config module at an empty in-memory database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    config.Config.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(config, "get_db", get_db)
+    monkeypatch.setattr(config, "CONFIG_DATA", {})
+    monkeypatch.setattr(config, "CONFIG_VERSION", None)
+    monkeypatch.setattr(config, "PERSISTENT_CONFIG_REGISTRY", [])
+    yield get_db
+    engine.dispose()
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        config,
+        "get_redis_connection",
+        lambda redis_url, redis_sentinels, decode_responses=True: fakeredis.FakeRedis(
+            server=server, decode_responses=decode_responses
+        ),
+    )
+    return server
+
+
+def make_config(**kwargs) -> AppConfig:
+    app_config = AppConfig(**kwargs)
+    app_config.TEST_A = PersistentConfig("TEST_A", "test.a", "a")
+    app_config.TEST_B = PersistentConfig("TEST_B", "test.b", "b")
+    return app_config
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_remote_update_is_applied(config_db, redis_server):
+    writer = make_config(redis_url="redis://localhost")
+    reader = make_config(redis_url="redis://localhost")
+
+    writer.TEST_A = "remote"
+    assert writer.TEST_A == "remote"
+    assert wait_for(lambda: reader.TEST_A == "remote")
+    assert reader.TEST_B == "b"
+
+
+def test_own_update_message_is_ignored(config_db, redis_server):
+    app_config = make_config(redis_url="redis://localhost")
+    app_config.TEST_A = "local"
+
+    app_config._handle_message(
+        {
+            "data": json.dumps(
+                {"worker": app_config._worker_id, "values": {"TEST_A": '"stale"'}}
+            )
+        }
+    )
+    assert app_config.TEST_A == "local"
+
+    # Malformed messages are dropped
+    app_config._handle_message({"data": "not json"})
+    assert app_config.TEST_A == "local"
+
+
+def test_missed_publish_is_resynced(config_db, redis_server):
+    app_config = make_config(redis_url="redis://localhost")
+    client = fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+    # Another worker wrote while this one was not listening
+    client.set("open-webui:config:TEST_B", json.dumps("missed"))
+    client.incr(AppConfig.VERSION_KEY)
+    assert app_config.TEST_B == "b"
+
+    app_config._sync()
+    assert app_config.TEST_B == "missed"
+    assert app_config._version == 1
+
+    # Nothing is reloaded while the version is unchanged
+    client.set("open-webui:config:TEST_B", json.dumps("unversioned"))
+    app_config._sync()
+    assert app_config.TEST_B == "missed"
+
+
+def test_sync_runs_in_background(config_db, redis_server, monkeypatch):
+    monkeypatch.setattr(config, "CONFIG_SYNC_INTERVAL", 0.05)
+    app_config = make_config(redis_url="redis://localhost")
+    client = fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+    client.set("open-webui:config:TEST_A", json.dumps("missed"))
+    client.incr(AppConfig.VERSION_KEY)
+    assert wait_for(lambda: app_config.TEST_A == "missed")
+
+
+def test_save_to_db_version_conflict(config_db):
+    assert config.save_to_db({"n": 0}, None, check_version=True) == 0
+    assert config.save_to_db({"n": 1}, 0, check_version=True) == 1
+
+    # A writer holding an old version loses and leaves the row untouched
+    assert config.save_to_db({"n": "stale"}, 0, check_version=True) is None
+    assert config.save_to_db({"n": "stale"}, None, check_version=True) is None
+    assert config.get_config_entry() == ({"n": 1}, 1)
+
+    # Without a version the write always goes through
+    assert config.save_to_db({"n": 2}) == 2
+
+
+def test_save_config_items_retries_on_latest(config_db):
+    item = PersistentConfig("TEST_A", "test.a", "a")
+    item.value = "mine"
+    config.save_to_db({"test": {"b": "theirs"}})
+    # This worker still holds the state from before the other write
+    config.CONFIG_DATA, config.CONFIG_VERSION = {}, None
+    config.save_config_items([item])
+    data, version = config.get_config_entry()
+    assert data == {"test": {"a": "mine", "b": "theirs"}}
+    assert version == 1 and config.CONFIG_VERSION == 1
+    assert item.config_value == "mine"
+
+
+def test_save_config_items_gives_up(config_db, monkeypatch):
+    item = PersistentConfig("TEST_A", "test.a", "a")
+    monkeypatch.setattr(config, "save_to_db", lambda *args, **kwargs: None)
+    with pytest.raises(Exception, match="concurrently"):
+        config.save_config_items([item])
+
+
+def test_batch_rolls_back(config_db):
+    app_config = make_config()
+    with pytest.raises(ValueError):
+        with app_config.batch():
+            app_config.TEST_A = "x"
+            app_config.TEST_A = "y"
+            app_config.TEST_B = "z"
+            raise ValueError()
+
+    assert app_config.TEST_A == "a"
+    assert app_config.TEST_B == "b"
+    assert config.get_config_entry()[1] is None
+
+
+def test_batch_writes_and_publishes_once(config_db, redis_server, monkeypatch):
+    app_config = make_config(redis_url="redis://localhost")
+    writes = []
+    save_to_db = config.save_to_db
+
+    def counting_save_to_db(data, version=None, check_version=False):
+        writes.append(data)
+        return save_to_db(data, version, check_version)
+
+    monkeypatch.setattr(config, "save_to_db", counting_save_to_db)
+
+    client = fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(AppConfig.CHANNEL)
+
+    with app_config.batch():
+        app_config.TEST_A = "x"
+        # A nested batch joins the enclosing one
+        with app_config.batch():
+            app_config.TEST_B = "y"
+        assert writes == []
+
+    assert len(writes) == 1
+    assert writes[0] == {"test": {"a": "x", "b": "y"}}
+
+    messages = []
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        if message := pubsub.get_message(timeout=0.1):
+            messages.append(message)
+    assert len(messages) == 1
+    assert json.loads(messages[0]["data"])["values"] == {
+        "TEST_A": '"x"',
+        "TEST_B": '"y"',
+    }
+    assert client.get(AppConfig.VERSION_KEY) == "1"
+    assert client.get("open-webui:config:TEST_A") == '"x"'
+
+    # A single assignment outside a batch is a batch of one
+    app_config.TEST_A = "z"
+    assert len(writes) == 2
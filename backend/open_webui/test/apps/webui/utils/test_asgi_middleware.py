@@ -0,0 +1,233 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pytest
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from open_webui.internal.db import Session
+from open_webui.utils.asgi_middleware import RequestMiddleware
+from open_webui.utils.auth import get_http_authorization_cred
+from open_webui.utils.security_headers import set_security_headers
+
+NUM_REQUESTS = int(os.environ.get("MIDDLEWARE_BENCHMARK_REQUESTS", "2000"))
+STREAM_CHUNKS = 20
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.state.config = SimpleNamespace(ENABLE_API_KEY=True)
+
+    @app.get("/api/models")
+    async def get_models(request: Request):
+        return {
+            "data": [{"id": f"model-{i}", "object": "model"} for i in range(50)],
+            "token": request.state.token.credentials if request.state.token else None,
+            "enable_api_key": request.state.enable_api_key,
+        }
+
+    @app.post("/api/chat/completions")
+    async def chat_completions():
+        async def stream():
+            for i in range(STREAM_CHUNKS):
+                yield f'data: {{"choices": [{{"delta": {{"content": "{i}"}}}}]}}\n\n'
+                await asyncio.sleep(0)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def _legacy_app() -> FastAPI:
+    """The BaseHTTPMiddleware stack main.py used before RequestMiddleware."""
+    app = _create_app()
+
+    class RedirectMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            if request.method == "GET":
+                path = request.url.path
+                query_params = dict(parse_qs(urlparse(str(request.url)).query))
+                if path.endswith("/watch") and "v" in query_params:
+                    video_id = query_params["v"][0]
+                    return RedirectResponse(url=f"/?{urlencode({'youtube': video_id})}")
+            return await call_next(request)
+
+    class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            response = await call_next(request)
+            response.headers.update(set_security_headers())
+            return response
+
+    app.add_middleware(RedirectMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def commit_session_after_request(request: Request, call_next):
+        response = await call_next(request)
+        Session.commit()
+        return response
+
+    @app.middleware("http")
+    async def check_url(request: Request, call_next):
+        start_time = int(time.time())
+        request.state.token = get_http_authorization_cred(
+            request.headers.get("Authorization")
+        )
+        request.state.enable_api_key = app.state.config.ENABLE_API_KEY
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(int(time.time()) - start_time)
+        return response
+
+    @app.middleware("http")
+    async def inspect_websocket(request: Request, call_next):
+        if (
+            "/ws/socket.io" in request.url.path
+            and request.query_params.get("transport") == "websocket"
+        ):
+            upgrade = (request.headers.get("Upgrade") or "").lower()
+            connection = (request.headers.get("Connection") or "").lower().split(",")
+            if upgrade != "websocket" or "upgrade" not in connection:
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"detail": "Invalid WebSocket upgrade request"},
+                )
+        return await call_next(request)
+
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = _create_app()
+    app.add_middleware(RequestMiddleware)
+    return app
+
+
+async def _request(app, method: str, path: str) -> float:
+    """Drive one request through the ASGI app, returning the time to first body byte."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", b"Bearer sk-test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    start = time.perf_counter()
+    first_byte = None
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body":
+            if message.get("body") and first_byte is None:
+                first_byte = time.perf_counter() - start
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return first_byte
+
+
+@pytest.fixture
+def security_env(monkeypatch):
+    monkeypatch.setenv("XFRAME_OPTIONS", "DENY")
+
+
+def test_request_state_and_headers(security_env):
+    client = TestClient(_current_app())
+    response = client.get("/api/models", headers={"Authorization": "Bearer sk-test"})
+
+    assert response.status_code == 200
+    assert response.json()["token"] == "sk-test"
+    assert response.json()["enable_api_key"] is True
+    assert response.headers["x-frame-options"] == "DENY"
+    assert "x-process-time" in response.headers
+
+
+def test_streaming_response(security_env):
+    client = TestClient(_current_app())
+    response = client.post("/api/chat/completions")
+
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.text.count("data: ") == STREAM_CHUNKS + 1
+
+
+def test_watch_redirect():
+    client = TestClient(_current_app())
+    response = client.get("/watch?v=abc123", follow_redirects=False)
+
+    assert response.status_code in (302, 307)
+    assert response.headers["location"] == "/?youtube=abc123"
+
+
+def test_rejects_invalid_websocket_upgrade():
+    client = TestClient(_current_app())
+    response = client.get("/ws/socket.io/?EIO=4&transport=websocket")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid WebSocket upgrade request"}
+
+
+def test_commits_session(monkeypatch):
+    commits = []
+    monkeypatch.setattr(
+        "open_webui.utils.asgi_middleware.Session",
+        SimpleNamespace(commit=lambda: commits.append(1)),
+    )
+    TestClient(_current_app()).get("/api/models")
+
+    assert commits == [1]
+
+
+def test_benchmark_requests_per_second():
+    async def run(app) -> float:
+        start = time.perf_counter()
+        for _ in range(NUM_REQUESTS // 100):
+            await asyncio.gather(
+                *[_request(app, "GET", "/api/models") for _ in range(100)]
+            )
+        return NUM_REQUESTS / (time.perf_counter() - start)
+
+    legacy = asyncio.run(run(_legacy_app()))
+    current = asyncio.run(run(_current_app()))
+    # The BaseHTTPMiddleware stack roughly triples the per-request overhead
+    assert (
+        current > 2 * legacy
+    ), f"/api/models: legacy {legacy:.0f} req/s, current {current:.0f} req/s"
+
+
+def test_benchmark_time_to_first_byte():
+    async def run(app) -> float:
+        ttfb = [
+            await _request(app, "POST", "/api/chat/completions")
+            for _ in range(NUM_REQUESTS // 10)
+        ]
+        return sorted(ttfb)[len(ttfb) // 2] * 1000
+
+    legacy = asyncio.run(run(_legacy_app()))
+    current = asyncio.run(run(_current_app()))
+    # Each BaseHTTPMiddleware layer relays the stream through its own task
+    assert (
+        current < legacy / 2
+    ), f"/api/chat/completions TTFB p50: legacy {legacy:.3f} ms, current {current:.3f} ms"
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from functools import partial
+
+import pytest
+
+from open_webui.utils.executor import InstrumentedExecutor
+from open_webui.utils.tools import get_async_tool_function_and_apply_extra_params
+
+
+def test_tool_arguments_named_like_executor_parameters():
+    executor = InstrumentedExecutor("test", max_workers=2)
+
+    def fetch(url: str, timeout: int = 5, key: str = "", func: str = "") -> dict:
+        return {"url": url, "timeout": timeout, "key": key, "func": func}
+
+    tool = get_async_tool_function_and_apply_extra_params(
+        fetch, {}, executor=executor, key="tool.fetch"
+    )
+
+    try:
+        # The tool's own arguments aren't mistaken for the executor's
+        assert asyncio.run(
+            tool("http://example.com", timeout=30, key="k", func="f")
+        ) == {"url": "http://example.com", "timeout": 30, "key": "k", "func": "f"}
+        assert executor.get_metrics()["calls"]["tool.fetch"]["calls"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_run_times_out():
+    executor = InstrumentedExecutor("test", max_workers=1)
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(executor.run("slow", partial(time.sleep, 0.5), timeout=0.05))
+        assert executor.get_metrics()["calls"]["slow"]["timeouts"] == 1
+    finally:
+        executor.shutdown()
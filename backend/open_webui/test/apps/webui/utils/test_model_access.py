@@ -0,0 +1,115 @@
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+NUM_MODELS = int(os.environ.get("MODEL_ACCESS_BENCHMARK_MODELS", "1000"))
+NUM_GROUPS = 5
+
+
+def _legacy_filtered_models(models, user):
+    """The per-model filter /api/models used before get_filtered_models."""
+    from open_webui.models.models import Models
+    from open_webui.utils.access_control import has_access
+
+    filtered_models = []
+    for model in models:
+        model_info = Models.get_model_by_id(model["id"])
+        if model_info:
+            if user.id == model_info.user_id or has_access(
+                user.id, type="read", access_control=model_info.access_control
+            ):
+                filtered_models.append(model)
+    return filtered_models
+
+
+class TestModelAccess(AbstractPostgresTest):
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.groups import GroupForm, GroupUpdateForm, Groups
+        from open_webui.models.models import (
+            ModelForm,
+            ModelMeta,
+            ModelParams,
+            Models,
+        )
+
+        owner_id = str(uuid.uuid4())
+        self.user = SimpleNamespace(id=str(uuid.uuid4()))
+
+        groups = []
+        for i in range(NUM_GROUPS):
+            group = Groups.insert_new_group(
+                owner_id, GroupForm(name=f"group-{i}", description="")
+            )
+            # The user is a member of every other group
+            user_ids = [self.user.id] if i % 2 == 0 else []
+            Groups.update_group_by_id(
+                group.id,
+                GroupUpdateForm(name=group.name, description="", user_ids=user_ids),
+            )
+            groups.append(group)
+
+        custom_models = []
+        for i in range(NUM_MODELS):
+            access_control = {
+                "read": {"group_ids": [groups[i % NUM_GROUPS].id], "user_ids": []},
+                "write": {"group_ids": [], "user_ids": []},
+            }
+            custom_models.append(
+                Models.insert_new_model(
+                    ModelForm(
+                        id=f"bench-{uuid.uuid4()}",
+                        name=f"model-{i}",
+                        meta=ModelMeta(),
+                        params=ModelParams(),
+                        access_control=None if i % 10 == 0 else access_control,
+                    ),
+                    owner_id,
+                )
+            )
+
+        self.models = [{"id": model.id, "name": model.name} for model in custom_models]
+        self.model_access = {
+            model.id: {
+                "user_id": model.user_id,
+                "access_control": model.access_control,
+            }
+            for model in custom_models
+        }
+
+    def teardown_method(self):
+        super().teardown_method()
+        from open_webui.internal.db import Session
+
+        Session.execute(text('TRUNCATE TABLE "group"'))
+        Session.commit()
+
+    def test_filtered_models_match_legacy(self):
+        from open_webui.utils.models import get_filtered_models
+
+        filtered = get_filtered_models(self.models, self.user, self.model_access)
+
+        assert filtered == _legacy_filtered_models(self.models, self.user)
+        assert 0 < len(filtered) < len(self.models)
+
+    def test_filtered_models_skip_database(self):
+        from open_webui.utils.models import get_filtered_models
+
+        start = time.perf_counter()
+        _legacy_filtered_models(self.models, self.user)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_filtered_models(self.models, self.user, self.model_access)
+        current = time.perf_counter() - start
+
+        # One query per model against none: an order of magnitude at least
+        assert current * 10 < legacy, (
+            f"/api/models filter ({len(self.models)} models): "
+            f"legacy {legacy * 1000:.1f} ms, current {current * 1000:.1f} ms"
+        )
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from open_webui.utils.webhook import WebhookDispatcher
+
+NUM_USERS = 200
+
+
+async def _serve(hits: dict, delay: float = 0.05):
+    async def handler(request):
+        name = request.match_info["name"]
+        hits[name] = hits.get(name, 0) + 1
+        if name == "flaky" and hits[name] == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.1"})
+        if name == "invalid":
+            return web.Response(status=400)
+        await asyncio.sleep(delay)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_post("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _drain(dispatcher: WebhookDispatcher, timeout: float = 10):
+    start = time.perf_counter()
+    while dispatcher._pending and time.perf_counter() - start < timeout:
+        await asyncio.sleep(0.05)
+
+
+def test_dispatcher_dedupes_and_retries():
+    async def run():
+        hits = {}
+        runner, base = await _serve(hits)
+        dispatcher = WebhookDispatcher(concurrency=8, max_retries=2)
+        task = asyncio.create_task(dispatcher.run())
+
+        # Many users sharing the same webhook get one notification
+        urls = [f"{base}/shared"] * NUM_USERS + [
+            f"{base}/flaky",
+            f"{base}/invalid",
+            None,
+        ]
+        queued = dispatcher.enqueue(
+            "Open WebUI", urls, "message", {"action": "channel"}
+        )
+        await _drain(dispatcher)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await runner.cleanup()
+        return queued, hits
+
+    queued, hits = asyncio.run(run())
+
+    assert queued == 3
+    assert hits == {"shared": 1, "flaky": 2, "invalid": 1}
+
+
+def test_busy_host_does_not_hold_up_others():
+    async def run():
+        delivered = []
+
+        async def handler(request):
+            name = request.match_info["name"]
+            if name.startswith("slow"):
+                await asyncio.sleep(0.5)
+            delivered.append(name)
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_post("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        # Two hosts for the same server: one with more notifications queued
+        # than workers, and another queued after them
+        dispatcher = WebhookDispatcher(concurrency=4, concurrency_per_host=2)
+        task = asyncio.create_task(dispatcher.run())
+        dispatcher.enqueue(
+            "Open WebUI",
+            [f"http://127.0.0.1:{port}/slow-{i}" for i in range(8)],
+            "message",
+            {},
+        )
+        dispatcher.enqueue(
+            "Open WebUI",
+            [f"http://localhost:{port}/fast-{i}" for i in range(4)],
+            "message",
+            {},
+        )
+        await _drain(dispatcher)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await runner.cleanup()
+        return delivered
+
+    delivered = asyncio.run(run())
+
+    assert len(delivered) == 12
+    # The fast host is served while the slow one is still working through
+    # its first two notifications
+    assert all(name.startswith("fast") for name in delivered[:4]), delivered
+
+
+def test_benchmark_enqueue_vs_serial_delivery():
+    """Posting to a channel used to wait for every webhook, one after the other."""
+
+    async def run():
+        hits = {}
+        runner, base = await _serve(hits, delay=0.01)
+        urls = [f"{base}/user-{i}" for i in range(NUM_USERS)]
+        # Measures the dispatcher's own concurrency: every recipient is on the
+        # same test server, so the per-host limit is raised to match it
+        dispatcher = WebhookDispatcher(concurrency=16, concurrency_per_host=16)
+        task = asyncio.create_task(dispatcher.run())
+
+        start = time.perf_counter()
+        dispatcher.enqueue("Open WebUI", urls, "message", {"action": "channel"})
+        enqueue_time = time.perf_counter() - start
+        await _drain(dispatcher)
+        delivery_time = time.perf_counter() - start
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await runner.cleanup()
+        return hits, enqueue_time, delivery_time
+
+    hits, enqueue_time, delivery_time = asyncio.run(run())
+
+    # The handler waited at least delay * NUM_USERS for serial delivery
+    serial_time = NUM_USERS * 0.01
+    assert len(hits) == NUM_USERS
+    assert (
+        enqueue_time < serial_time / 20
+    ), f"enqueue took {enqueue_time * 1000:.1f} ms for {NUM_USERS} webhooks"
+    assert delivery_time < serial_time / 2, (
+        f"delivery took {delivery_time * 1000:.0f} ms, "
+        f"serial lower bound {serial_time * 1000:.0f} ms"
+    )
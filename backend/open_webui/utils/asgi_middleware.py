@@ -0,0 +1,84 @@
+import time
+from typing import MutableMapping, cast
+from urllib.parse import parse_qs, urlencode
+
+from asgiref.typing import (
+    ASGI3Application,
+    ASGIReceiveCallable,
+    ASGISendCallable,
+    ASGISendEvent,
+    Scope as ASGIScope,
+)
+from fastapi import status
+from fastapi.responses import JSONResponse, RedirectResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+from open_webui.internal.db import Session
+from open_webui.utils.auth import get_http_authorization_cred
+from open_webui.utils.security_headers import set_security_headers
+
+
+class RequestMiddleware:
+    """
+    Pure ASGI middleware doing the per-request work that used to be spread over
+    several BaseHTTPMiddleware layers, without their per-request task and
+    response re-wrapping (which also delayed streamed responses):
+
+    - rejects socket.io websocket requests without proper upgrade headers
+    - stores the bearer token and ENABLE_API_KEY on request.state
+    - redirects YouTube style /watch?v= links to the frontend
+    - adds the security headers and X-Process-Time to every response
+    - commits the scoped database session once the response is sent
+    """
+
+    def __init__(self, app: ASGI3Application) -> None:
+        self.app = app
+        # Read from the environment, which doesn't change after startup
+        self.security_headers = set_security_headers()
+
+    async def __call__(
+        self,
+        scope: ASGIScope,
+        receive: ASGIReceiveCallable,
+        send: ASGISendCallable,
+    ) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        query_params = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        headers = Headers(scope=scope)
+
+        if "/ws/socket.io" in path and query_params.get("transport") == ["websocket"]:
+            upgrade = (headers.get("Upgrade") or "").lower()
+            connection = (headers.get("Connection") or "").lower().split(",")
+            # Check that there's the correct headers for an upgrade, else reject the connection
+            # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
+            if upgrade != "websocket" or "upgrade" not in connection:
+                response = JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"detail": "Invalid WebSocket upgrade request"},
+                )
+                return await response(scope, receive, send)
+
+        start_time = int(time.time())
+        state = cast(MutableMapping, scope).setdefault("state", {})
+        state["token"] = get_http_authorization_cred(headers.get("Authorization"))
+        state["enable_api_key"] = scope["app"].state.config.ENABLE_API_KEY
+
+        async def send_wrapper(message: ASGISendEvent) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                response_headers.update(self.security_headers)
+                response_headers["X-Process-Time"] = str(int(time.time()) - start_time)
+            await send(message)
+
+        if scope["method"] == "GET" and path.endswith("/watch") and "v" in query_params:
+            # Extract the first 'v' parameter
+            encoded_video_id = urlencode({"youtube": query_params["v"][0]})
+            response = RedirectResponse(url=f"/?{encoded_video_id}")
+            await response(scope, receive, send_wrapper)
+        else:
+            await self.app(scope, receive, send_wrapper)
+
+        Session.commit()
@@ -13,7 +13,7 @@ import pytz
 from pytz import UTC
 from typing import Optional, Union, List, Dict
 
-from open_webui.models.users import Users
+from open_webui.models.users import UsersCache, UserActivity
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -206,17 +206,15 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = UsersCache.get_user_by_id(data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=ERROR_MESSAGES.INVALID_TOKEN,
             )
         else:
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Recorded in memory and written to the database in batches
+            UserActivity.touch(user.id)
         return user
     else:
         raise HTTPException(
@@ -226,7 +224,7 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = UsersCache.get_user_by_api_key(api_key)
 
     if user is None:
         raise HTTPException(
@@ -234,7 +232,7 @@ def get_current_user_by_api_key(api_key: str):
             detail=ERROR_MESSAGES.INVALID_TOKEN,
         )
     else:
-        Users.update_user_last_active_by_id(user.id)
+        UserActivity.touch(user.id)
 
     return user
 
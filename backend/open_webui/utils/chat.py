@@ -9,6 +9,7 @@ import json
 import inspect
 import uuid
 import asyncio
+from functools import partial
 
 from fastapi import Request, status
 from starlette.responses import Response, StreamingResponse, JSONResponse
@@ -40,7 +41,10 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.plugin import (
+    get_function_module_valves,
+    load_function_module_by_id,
+)
 from open_webui.utils.models import get_all_models, check_model_access
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
@@ -48,11 +52,17 @@ from open_webui.utils.response import (
     convert_streaming_response_ollama_to_openai,
 )
 from open_webui.utils.filter import (
+    get_filter_pipeline,
     get_sorted_filter_ids,
     process_filter_functions,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL, BYPASS_MODEL_ACCESS_CONTROL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+    BYPASS_MODEL_ACCESS_CONTROL,
+    PLUGIN_EXECUTION_TIMEOUT,
+)
 
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
@@ -328,10 +338,7 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
     }
 
     try:
-        filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(model)
-        ]
+        filter_functions = get_filter_pipeline(request, get_sorted_filter_ids(model))
 
         result, _ = await process_filter_functions(
             request=request,
@@ -396,8 +403,9 @@ async def chat_action(request: Request, action_id: str, form_data: dict, user: A
         request.app.state.FUNCTIONS[action_id] = function_module
 
     if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-        valves = Functions.get_function_valves_by_id(action_id)
-        function_module.valves = function_module.Valves(**(valves if valves else {}))
+        function_module.valves = get_function_module_valves(
+            request, action_id, function_module
+        )
 
     if hasattr(function_module, "action"):
         try:
@@ -444,7 +452,11 @@ async def chat_action(request: Request, action_id: str, form_data: dict, user: A
             if inspect.iscoroutinefunction(action):
                 data = await action(**params)
             else:
-                data = action(**params)
+                data = await request.app.state.PLUGIN_EXECUTOR.run(
+                    f"{action_id}.action",
+                    partial(action, **params),
+                    timeout=PLUGIN_EXECUTION_TIMEOUT,
+                )
 
         except Exception as e:
             return Exception(f"Error: {e}")
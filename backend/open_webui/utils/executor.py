@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class InstrumentedExecutor:
+    """
+    Bounded thread pool for blocking work called from async code. Every call is
+    tagged with a key (e.g. a tool or filter id) so the queue depth, wait time,
+    run time, errors and timeouts can be reported per key.
+
+    A call that times out is abandoned by the caller, but its thread keeps
+    running until the blocking code returns; Python threads can't be cancelled.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._metrics: dict[str, dict] = {}
+
+    def _record(self, key: str, **values):
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                key,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "timeouts": 0,
+                    "wait_time": 0.0,
+                    "max_wait_time": 0.0,
+                    "run_time": 0.0,
+                    "max_run_time": 0.0,
+                },
+            )
+            for name, value in values.items():
+                if name.startswith("max_"):
+                    metrics[name] = max(metrics[name], value)
+                else:
+                    metrics[name] += value
+
+    def _call(
+        self, key: str, submitted_at: float, func: Callable, queued: bool = True
+    ) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            if queued:
+                self._queued -= 1
+            self._running += 1
+
+        try:
+            return func()
+        except Exception:
+            self._record(key, errors=1)
+            raise
+        finally:
+            run_time = time.perf_counter() - started_at
+            with self._lock:
+                self._running -= 1
+            wait_time = started_at - submitted_at
+            self._record(
+                key,
+                calls=1,
+                wait_time=wait_time,
+                max_wait_time=wait_time,
+                run_time=run_time,
+                max_run_time=run_time,
+            )
+
+    def submit(self, key: str, func: Callable, /, *args, **kwargs):
+        """Submits a call and returns its concurrent.futures.Future."""
+        context = contextvars.copy_context()
+        with self._lock:
+            self._queued += 1
+
+        future = self._executor.submit(
+            self._call,
+            key,
+            time.perf_counter(),
+            partial(context.run, func, *args, **kwargs),
+        )
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        # Calls cancelled while still queued never reach _call
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    async def run(
+        self, key: str, func: Callable, /, *, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Runs `func()` in the pool. Arguments are bound by the caller (e.g. with
+        functools.partial) so they can't collide with `timeout`.
+        """
+        future = asyncio.wrap_future(self.submit(key, func))
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self._record(key, timeouts=1)
+            log.warning(f"{self.name}: {key} timed out after {timeout}s")
+            raise
+
+    def map(self, key: str, func: Callable, items: list) -> list:
+        """
+        Blocking map for code that already runs in a worker thread, including
+        this pool's own threads: calls still queued when the caller gets to them
+        are run inline, so nested use can't deadlock a saturated pool.
+        """
+        submitted_at = time.perf_counter()
+        futures = [self.submit(key, func, item) for item in items]
+
+        results = []
+        for item, future in zip(items, futures):
+            if future.cancel():
+                results.append(
+                    self._call(key, submitted_at, partial(func, item), queued=False)
+                )
+            else:
+                results.append(future.result())
+        return results
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "calls": {key: dict(value) for key, value in self._metrics.items()},
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
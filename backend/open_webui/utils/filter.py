@@ -1,56 +1,98 @@
 import inspect
 import logging
+from functools import partial
 
-from open_webui.utils.plugin import load_function_module_by_id
-from open_webui.models.functions import Functions
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.plugin import (
+    get_function_module_valves,
+    load_function_module_by_id,
+)
+from open_webui.models.functions import Functions, FunctionsRegistry
+from open_webui.env import PLUGIN_EXECUTION_TIMEOUT, SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
 def get_sorted_filter_ids(model: dict):
+    enabled_filters = FunctionsRegistry.get_functions_by_type(
+        "filter", active_only=True
+    )
+
     def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None:
-            valves = Functions.get_function_valves_by_id(function_id)
-            return valves.get("priority", 0) if valves else 0
-        return 0
+        return enabled_filters[function_id]["valves"].get("priority", 0)
 
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
+    filter_ids = [
+        function_id
+        for function_id, function in enabled_filters.items()
+        if function["is_global"]
+    ]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
         filter_ids = list(set(filter_ids))
 
-    enabled_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
-    ]
-
-    filter_ids = [fid for fid in filter_ids if fid in enabled_filter_ids]
+    filter_ids = [fid for fid in filter_ids if fid in enabled_filters]
     filter_ids.sort(key=get_priority)
     return filter_ids
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
-    skip_files = None
+def get_filter_pipeline(request, filter_ids: list[str]) -> list[dict]:
+    """
+    Prepares the filters of a chat request once: resolves the function modules,
+    applies their cached valves and precomputes each handler's signature, so the
+    inlet, stream and outlet passes don't repeat that work for every call.
 
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
+    `filter_ids` come from get_sorted_filter_ids, which only returns active
+    filters known to the registry, so no database lookup is needed here.
+    """
+    pipeline = []
 
+    for filter_id in filter_ids:
         if filter_id in request.app.state.FUNCTIONS:
             function_module = request.app.state.FUNCTIONS[filter_id]
         else:
             function_module, _, _ = load_function_module_by_id(filter_id)
             request.app.state.FUNCTIONS[filter_id] = function_module
 
+        # Apply valves to the function
+        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
+            function_module.valves = get_function_module_valves(
+                request, filter_id, function_module
+            )
+
+        handlers = {}
+        for filter_type in ["inlet", "stream", "outlet"]:
+            handler = getattr(function_module, filter_type, None)
+            if handler:
+                handlers[filter_type] = {
+                    "handler": handler,
+                    "parameters": set(inspect.signature(handler).parameters),
+                    "is_coroutine": inspect.iscoroutinefunction(handler),
+                }
+
+        pipeline.append(
+            {
+                "id": filter_id,
+                "module": function_module,
+                "handlers": handlers,
+                # UserValves by user id, loaded on first use within the request
+                "user_valves": {},
+            }
+        )
+
+    return pipeline
+
+
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    skip_files = None
+
+    for filter in filter_functions:
+        filter_id = filter["id"]
+        function_module = filter["module"]
+
         # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
+        handler = filter["handlers"].get(filter_type)
         if not handler:
             continue
 
@@ -58,16 +100,9 @@ async def process_filter_functions(
         if filter_type == "inlet" and hasattr(function_module, "file_handler"):
             skip_files = function_module.file_handler
 
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
         try:
             # Prepare parameters
-            sig = inspect.signature(handler)
+            parameters = handler["parameters"]
 
             params = {"body": form_data}
             if filter_type == "stream":
@@ -79,26 +114,33 @@ async def process_filter_functions(
                     **extra_params,
                     "__id__": filter_id,
                 }.items()
-                if k in sig.parameters
+                if k in parameters
             }
 
             # Handle user parameters
-            if "__user__" in sig.parameters:
+            if "__user__" in parameters:
                 if hasattr(function_module, "UserValves"):
                     try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
+                        user_id = params["__user__"]["id"]
+                        if user_id not in filter["user_valves"]:
+                            filter["user_valves"][user_id] = function_module.UserValves(
+                                **Functions.get_user_valves_by_id_and_user_id(
+                                    filter_id, user_id
+                                )
                             )
-                        )
+                        params["__user__"]["valves"] = filter["user_valves"][user_id]
                     except Exception as e:
                         log.exception(f"Failed to get user values: {e}")
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
+            # Execute handler, running sync handlers off the event loop
+            if handler["is_coroutine"]:
+                form_data = await handler["handler"](**params)
             else:
-                form_data = handler(**params)
+                form_data = await request.app.state.PLUGIN_EXECUTOR.run(
+                    f"{filter_id}.{filter_type}",
+                    partial(handler["handler"], **params),
+                    timeout=PLUGIN_EXECUTION_TIMEOUT,
+                )
 
         except Exception as e:
             log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
@@ -5,6 +5,7 @@ import os
 import base64
 
 import asyncio
+import copy
 from aiocache import cached
 from typing import Any, Optional
 import random
@@ -15,7 +16,6 @@ import re
 import ast
 
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
@@ -42,11 +42,10 @@ from open_webui.routers.pipelines import (
     process_pipeline_outlet_filter,
 )
 
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import Webhooks
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_files
@@ -68,9 +67,10 @@ from open_webui.utils.misc import (
     prepend_to_first_user_message_content,
     convert_logit_bias_input_to_json,
 )
-from open_webui.utils.tools import get_tools
+from open_webui.utils.tools import call_tool, execute_tool_calls, get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
+    get_filter_pipeline,
     get_sorted_filter_ids,
     process_filter_functions,
 )
@@ -134,6 +134,7 @@ async def chat_completion_tools_handler(
         }
 
     event_caller = extra_params["__event_call__"]
+    event_emitter = extra_params.get("__event_emitter__")
     metadata = extra_params["__metadata__"]
 
     task_model_id = get_task_model_id(
@@ -178,13 +179,11 @@ async def chat_completion_tools_handler(
             result = json.loads(content)
 
             async def tool_call_handler(tool_call):
-                nonlocal skip_files
-
                 log.debug(f"{tool_call=}")
 
                 tool_function_name = tool_call.get("name", None)
                 if tool_function_name not in tools:
-                    return body, {}
+                    return None
 
                 tool_function_params = tool_call.get("parameters", {})
 
@@ -201,26 +200,36 @@ async def chat_completion_tools_handler(
                         if k in allowed_params
                     }
 
-                    if tool.get("direct", False):
-                        tool_result = await event_caller(
-                            {
-                                "type": "execute:tool",
-                                "data": {
-                                    "id": str(uuid4()),
-                                    "name": tool_function_name,
-                                    "params": tool_function_params,
-                                    "server": tool.get("server", {}),
-                                    "session_id": metadata.get("session_id", None),
-                                },
-                            }
-                        )
-                    else:
-                        tool_function = tool["callable"]
-                        tool_result = await tool_function(**tool_function_params)
-
+                    tool_result = await call_tool(
+                        tool,
+                        tool_function_name,
+                        tool_function_params,
+                        event_caller=event_caller,
+                        metadata=metadata,
+                    )
                 except Exception as e:
                     tool_result = str(e)
 
+                return tool_function_name, tool_result
+
+            async def tool_result_handler(index, result):
+                if result is None or event_emitter is None:
+                    return
+
+                await event_emitter(
+                    {
+                        "type": "status",
+                        "data": {
+                            "action": "tool_call",
+                            "description": f"Executed {result[0]}",
+                            "done": True,
+                        },
+                    }
+                )
+
+            def apply_tool_result(tool_function_name, tool_result):
+                nonlocal skip_files
+
                 tool_result_files = []
                 if isinstance(tool_result, list):
                     for item in tool_result:
@@ -269,11 +278,14 @@ async def chat_completion_tools_handler(
                         skip_files = True
 
             # check if "tool_calls" in result
-            if result.get("tool_calls"):
-                for tool_call in result.get("tool_calls"):
-                    await tool_call_handler(tool_call)
-            else:
-                await tool_call_handler(result)
+            tool_calls = result.get("tool_calls") or [result]
+
+            # Tool calls run concurrently, their results are applied in order
+            for tool_call_result in await execute_tool_calls(
+                tool_calls, tool_call_handler, on_result=tool_result_handler
+            ):
+                if tool_call_result is not None:
+                    apply_tool_result(*tool_call_result)
 
         except Exception as e:
             log.debug(f"Error: {e}")
@@ -287,7 +299,7 @@ async def chat_completion_tools_handler(
     if skip_files and "files" in body.get("metadata", {}):
         del body["metadata"]["files"]
 
-    return body, {"sources": sources}
+    return body, {"sources": sources, "skip_files": skip_files}
 
 
 async def chat_web_search_handler(
@@ -572,65 +584,74 @@ async def chat_image_generation_handler(
     return form_data
 
 
-async def chat_completion_files_handler(
-    request: Request, body: dict, user: UserModel
-) -> tuple[dict, dict[str, list]]:
-    sources = []
+async def generate_retrieval_queries(
+    request: Request, model_id: str, messages: list[dict], user: UserModel
+) -> list[str]:
+    queries = []
+    try:
+        queries_response = await generate_queries(
+            request,
+            {
+                "model": model_id,
+                "messages": messages,
+                "type": "retrieval",
+            },
+            user,
+        )
+        queries_response = queries_response["choices"][0]["message"]["content"]
 
-    if files := body.get("metadata", {}).get("files", None):
-        queries = []
         try:
-            queries_response = await generate_queries(
-                request,
-                {
-                    "model": body["model"],
-                    "messages": body["messages"],
-                    "type": "retrieval",
-                },
-                user,
-            )
-            queries_response = queries_response["choices"][0]["message"]["content"]
+            bracket_start = queries_response.find("{")
+            bracket_end = queries_response.rfind("}") + 1
 
-            try:
-                bracket_start = queries_response.find("{")
-                bracket_end = queries_response.rfind("}") + 1
+            if bracket_start == -1 or bracket_end == -1:
+                raise Exception("No JSON object found in the response")
 
-                if bracket_start == -1 or bracket_end == -1:
-                    raise Exception("No JSON object found in the response")
+            queries_response = queries_response[bracket_start:bracket_end]
+            queries_response = json.loads(queries_response)
+        except Exception as e:
+            queries_response = {"queries": [queries_response]}
+
+        queries = queries_response.get("queries", [])
+    except:
+        pass
+
+    if len(queries) == 0:
+        queries = [get_last_user_message(messages)]
+
+    return queries
 
-                queries_response = queries_response[bracket_start:bracket_end]
-                queries_response = json.loads(queries_response)
-            except Exception as e:
-                queries_response = {"queries": [queries_response]}
 
-            queries = queries_response.get("queries", [])
-        except:
-            pass
+async def chat_completion_files_handler(
+    request: Request, body: dict, user: UserModel, queries: Optional[list] = None
+) -> tuple[dict, dict[str, list]]:
+    sources = []
 
-        if len(queries) == 0:
-            queries = [get_last_user_message(body["messages"])]
+    if files := body.get("metadata", {}).get("files", None):
+        if not queries:
+            queries = await generate_retrieval_queries(
+                request, body["model"], body["messages"], user
+            )
 
         try:
-            # Offload get_sources_from_files to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_files(
-                        request=request,
-                        files=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=request.app.state.rf,
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=request.app.state.config.RAG_FULL_CONTEXT,
+            # Offload get_sources_from_files to the shared retrieval executor
+            sources = await request.app.state.RETRIEVAL_EXECUTOR.run(
+                "get_sources_from_files",
+                lambda: get_sources_from_files(
+                    request=request,
+                    files=files,
+                    queries=queries,
+                    embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                        query, prefix=prefix, user=user
                     ),
-                )
+                    k=request.app.state.config.TOP_K,
+                    reranking_function=request.app.state.rf,
+                    k_reranker=request.app.state.config.TOP_K_RERANKER,
+                    r=request.app.state.config.RELEVANCE_THRESHOLD,
+                    hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                    full_context=request.app.state.config.RAG_FULL_CONTEXT,
+                ),
+            )
         except Exception as e:
             log.exception(e)
 
@@ -775,10 +796,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         raise e
 
     try:
-        filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(model)
-        ]
+        filter_functions = get_filter_pipeline(request, get_sorted_filter_ids(model))
 
         form_data, flags = await process_filter_functions(
             request=request,
@@ -790,44 +808,10 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     except Exception as e:
         raise Exception(f"Error: {e}")
 
-    features = form_data.pop("features", None)
-    if features:
-        if "web_search" in features and features["web_search"]:
-            form_data = await chat_web_search_handler(
-                request, form_data, extra_params, user
-            )
-
-        if "image_generation" in features and features["image_generation"]:
-            form_data = await chat_image_generation_handler(
-                request, form_data, extra_params, user
-            )
-
-        if "code_interpreter" in features and features["code_interpreter"]:
-            form_data["messages"] = add_or_update_user_message(
-                (
-                    request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE
-                    if request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE != ""
-                    else DEFAULT_CODE_INTERPRETER_PROMPT
-                ),
-                form_data["messages"],
-            )
-
-    tool_ids = form_data.pop("tool_ids", None)
-    files = form_data.pop("files", None)
-
-    # Remove files duplicates
-    if files:
-        files = list({json.dumps(f, sort_keys=True): f for f in files}.values())
-
-    metadata = {
-        **metadata,
-        "tool_ids": tool_ids,
-        "files": files,
-    }
-    form_data["metadata"] = metadata
+    features = form_data.pop("features", None) or {}
 
     # Server side tools
-    tool_ids = metadata.get("tool_ids", None)
+    tool_ids = form_data.pop("tool_ids", None)
     # Client side tools
     tool_servers = metadata.get("tool_servers", None)
 
@@ -845,7 +829,9 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                 **extra_params,
                 "__model__": models[task_model_id],
                 "__messages__": form_data["messages"],
-                "__files__": metadata.get("files", []),
+                # Web search runs alongside the tools and appends to
+                # form_data["files"], so tools only see the request's own files
+                "__files__": list(form_data.get("files", []) or []),
             },
         )
 
@@ -860,27 +846,95 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                     "server": tool_server,
                 }
 
-    if tools_dict:
-        if metadata.get("function_calling") == "native":
-            # If the function calling is native, then call the tools function calling handler
-            metadata["tools"] = tools_dict
-            form_data["tools"] = [
-                {"type": "function", "function": tool.get("spec", {})}
-                for tool in tools_dict.values()
-            ]
-        else:
-            # If the function calling is not native, then call the tools function calling handler
+    # Pre-processing stages that don't depend on each other run concurrently:
+    # web search, image generation, prompt-based tool calling and, when the
+    # request comes with files, retrieval query generation. Retrieval itself
+    # waits for web search (which adds files) and tool calling (whose file
+    # handlers may drop them); if only web search adds files, the queries are
+    # generated then. Each stage only updates form_data between its own awaits,
+    # so their changes don't interleave. If a stage fails, the others are
+    # cancelled before the error propagates.
+    stages = {}
+
+    if features.get("web_search"):
+        stages["web_search"] = chat_web_search_handler(
+            request, form_data, extra_params, user
+        )
+
+    if features.get("image_generation"):
+        stages["image_generation"] = chat_image_generation_handler(
+            request, form_data, extra_params, user
+        )
+
+    if tools_dict and metadata.get("function_calling") != "native":
+        # If the function calling is not native, then call the tools function calling handler
+        async def tools_stage():
             try:
-                form_data, flags = await chat_completion_tools_handler(
+                _, flags = await chat_completion_tools_handler(
                     request, form_data, extra_params, user, models, tools_dict
                 )
-                sources.extend(flags.get("sources", []))
-
+                return flags
             except Exception as e:
                 log.exception(e)
+                return {}
+
+        stages["tools"] = tools_stage()
+
+    if form_data.get("files"):
+        stages["retrieval_queries"] = generate_retrieval_queries(
+            request, form_data["model"], copy.deepcopy(form_data["messages"]), user
+        )
+
+    tasks = {name: asyncio.create_task(stage) for name, stage in stages.items()}
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    results = {name: task.result() for name, task in tasks.items()}
+
+    if features.get("code_interpreter"):
+        form_data["messages"] = add_or_update_user_message(
+            (
+                request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE
+                if request.app.state.config.CODE_INTERPRETER_PROMPT_TEMPLATE != ""
+                else DEFAULT_CODE_INTERPRETER_PROMPT
+            ),
+            form_data["messages"],
+        )
+
+    tools_flags = results.get("tools", {})
+    sources.extend(tools_flags.get("sources", []))
+
+    files = form_data.pop("files", None)
+
+    # Remove files duplicates
+    if files:
+        files = list({json.dumps(f, sort_keys=True): f for f in files}.values())
+
+    metadata = {
+        **metadata,
+        "tool_ids": tool_ids,
+        "files": files,
+    }
+    if tools_flags.get("skip_files"):
+        del metadata["files"]
+    form_data["metadata"] = metadata
+
+    if tools_dict and metadata.get("function_calling") == "native":
+        # If the function calling is native, then call the tools function calling handler
+        metadata["tools"] = tools_dict
+        form_data["tools"] = [
+            {"type": "function", "function": tool.get("spec", {})}
+            for tool in tools_dict.values()
+        ]
 
     try:
-        form_data, flags = await chat_completion_files_handler(request, form_data, user)
+        form_data, flags = await chat_completion_files_handler(
+            request, form_data, user, queries=results.get("retrieval_queries")
+        )
         sources.extend(flags.get("sources", []))
     except Exception as e:
         log.exception(e)
@@ -1129,12 +1183,12 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if get_active_status_by_user_id(user.id) is None:
+                    if await get_active_status_by_user_id(user.id) is None:
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
-                            post_webhook(
+                            Webhooks.enqueue(
                                 request.app.state.WEBUI_NAME,
-                                webhook_url,
+                                [webhook_url],
                                 f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{content}",
                                 {
                                     "action": "chat",
@@ -1170,10 +1224,7 @@ async def process_chat_response(
         "__request__": request,
         "__model__": model,
     }
-    filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(model)
-    ]
+    filter_functions = get_filter_pipeline(request, get_sorted_filter_ids(model))
 
     # Streaming response
     if event_emitter and event_caller:
@@ -1879,8 +1930,7 @@ async def process_chat_response(
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-                    for tool_call in response_tool_calls:
+                    async def tool_call_handler(tool_call):
                         tool_call_id = tool_call.get("id", "")
                         tool_name = tool_call.get("function", {}).get("name", "")
 
@@ -1921,27 +1971,13 @@ async def process_chat_response(
                                     if k in allowed_params
                                 }
 
-                                if tool.get("direct", False):
-                                    tool_result = await event_caller(
-                                        {
-                                            "type": "execute:tool",
-                                            "data": {
-                                                "id": str(uuid4()),
-                                                "name": tool_name,
-                                                "params": tool_function_params,
-                                                "server": tool.get("server", {}),
-                                                "session_id": metadata.get(
-                                                    "session_id", None
-                                                ),
-                                            },
-                                        }
-                                    )
-
-                                else:
-                                    tool_function = tool["callable"]
-                                    tool_result = await tool_function(
-                                        **tool_function_params
-                                    )
+                                tool_result = await call_tool(
+                                    tool,
+                                    tool_name,
+                                    tool_function_params,
+                                    event_caller=event_caller,
+                                    metadata=metadata,
+                                )
 
                             except Exception as e:
                                 tool_result = str(e)
@@ -1959,18 +1995,36 @@ async def process_chat_response(
                         ):
                             tool_result = json.dumps(tool_result, indent=2)
 
-                        results.append(
+                        return {
+                            "tool_call_id": tool_call_id,
+                            "content": tool_result,
+                            **(
+                                {"files": tool_result_files}
+                                if tool_result_files
+                                else {}
+                            ),
+                        }
+
+                    content_blocks[-1]["results"] = []
+
+                    async def tool_result_handler(index, result):
+                        # Show each tool as done as soon as its result is in
+                        content_blocks[-1]["results"].append(result)
+                        await event_emitter(
                             {
-                                "tool_call_id": tool_call_id,
-                                "content": tool_result,
-                                **(
-                                    {"files": tool_result_files}
-                                    if tool_result_files
-                                    else {}
-                                ),
+                                "type": "chat:completion",
+                                "data": {
+                                    "content": serialize_content_blocks(content_blocks),
+                                },
                             }
                         )
 
+                    results = await execute_tool_calls(
+                        response_tool_calls,
+                        tool_call_handler,
+                        on_result=tool_result_handler,
+                    )
+
                     content_blocks[-1]["results"] = results
 
                     content_blocks.append(
@@ -2211,12 +2265,12 @@ async def process_chat_response(
                     )
 
                 # Send a webhook notification if the user is not active
-                if get_active_status_by_user_id(user.id) is None:
+                if await get_active_status_by_user_id(user.id) is None:
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
-                        post_webhook(
+                        Webhooks.enqueue(
                             request.app.state.WEBUI_NAME,
-                            webhook_url,
+                            [webhook_url],
                             f"{title} - {request.app.state.config.WEBUI_URL}/c/{metadata['chat_id']}\n\n{content}",
                             {
                                 "action": "chat",
@@ -9,8 +9,9 @@ from open_webui.routers import openai, ollama
 from open_webui.functions import get_function_models
 
 
-from open_webui.models.functions import Functions
+from open_webui.models.functions import Functions, FunctionsRegistry
 from open_webui.models.models import Models
+from open_webui.models.groups import Groups
 
 
 from open_webui.utils.plugin import load_function_module_by_id
@@ -102,13 +103,15 @@ async def get_all_models(request, user: UserModel = None):
             ]
         models = models + arena_models
 
+    enabled_actions = FunctionsRegistry.get_functions_by_type(
+        "action", active_only=True
+    )
     global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("action", active_only=True)
+        function_id
+        for function_id, function in enabled_actions.items()
+        if function["is_global"]
     ]
+    enabled_action_ids = list(enabled_actions.keys())
 
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
@@ -224,9 +227,53 @@ async def get_all_models(request, user: UserModel = None):
     log.debug(f"get_all_models() returned {len(models)} models")
 
     request.app.state.MODELS = {model["id"]: model for model in models}
+    # Owner and access control of every model with a database entry, so
+    # get_filtered_models doesn't have to look them up one by one
+    request.app.state.MODEL_ACCESS = {
+        custom_model.id: {
+            "user_id": custom_model.user_id,
+            "access_control": custom_model.access_control,
+        }
+        for custom_model in custom_models
+    }
     return models
 
 
+def get_filtered_models(models, user, model_access: dict[str, dict]):
+    """
+    Filter models down to those the user can read, in memory: `model_access`
+    maps model ids to their owner and access control, and the user's groups are
+    resolved once.
+    """
+    user_group_ids = {group.id for group in Groups.get_groups_by_member_id(user.id)}
+
+    filtered_models = []
+    for model in models:
+        if model.get("arena"):
+            if has_access(
+                user.id,
+                type="read",
+                access_control=model.get("info", {})
+                .get("meta", {})
+                .get("access_control", {}),
+                user_group_ids=user_group_ids,
+            ):
+                filtered_models.append(model)
+            continue
+
+        model_info = model_access.get(model["id"])
+        if model_info:
+            if user.id == model_info["user_id"] or has_access(
+                user.id,
+                type="read",
+                access_control=model_info["access_control"],
+                user_group_ids=user_group_ids,
+            ):
+                filtered_models.append(model)
+
+    return filtered_models
+
+
 def check_model_access(user, model):
     if model.get("arena"):
         if not has_access(
@@ -43,7 +43,7 @@ from open_webui.env import (
 )
 from open_webui.utils.misc import parse_duration
 from open_webui.utils.auth import get_password_hash, create_token
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import Webhooks
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
@@ -388,9 +388,9 @@ class OAuthManager:
                 )
 
                 if auth_manager_config.WEBHOOK_URL:
-                    post_webhook(
+                    Webhooks.enqueue(
                         WEBUI_NAME,
-                        auth_manager_config.WEBHOOK_URL,
+                        [auth_manager_config.WEBHOOK_URL],
                         WEBHOOK_MESSAGES.USER_SIGNUP(user.name),
                         {
                             "action": "signup",
@@ -8,7 +8,7 @@ import tempfile
 import logging
 
 from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
-from open_webui.models.functions import Functions
+from open_webui.models.functions import Functions, FunctionsRegistry
 from open_webui.models.tools import Tools
 
 log = logging.getLogger(__name__)
@@ -165,6 +165,32 @@ def load_function_module_by_id(function_id, content=None):
         os.unlink(temp_file.name)
 
 
+def get_function_module_valves(request, function_id, function_module):
+    """
+    Returns the validated Valves of a function module, cached app-wide in
+    app.state.FUNCTION_VALVES until the function or its valves are updated.
+    """
+    function = FunctionsRegistry.get_function(function_id)
+    data = function["valves"] if function else None
+
+    # The registry hands out a new valves dict whenever the function changes on any
+    # worker, and a reloaded module comes with a new Valves class
+    cached = request.app.state.FUNCTION_VALVES.get(function_id)
+    if (
+        cached
+        and data is not None
+        and cached[0] is data
+        and isinstance(cached[1], function_module.Valves)
+    ):
+        return cached[1]
+
+    if data is None:
+        data = Functions.get_function_valves_by_id(function_id)
+    valves = function_module.Valves(**(data if data else {}))
+    request.app.state.FUNCTION_VALVES[function_id] = (data, valves)
+    return valves
+
+
 def install_frontmatter_requirements(requirements: str):
     if requirements:
         try:
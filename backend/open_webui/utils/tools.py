@@ -36,15 +36,25 @@ from langchain_core.utils.function_calling import (
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
 from open_webui.utils.plugin import load_tool_module_by_id
-from open_webui.env import AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA
+from open_webui.utils.executor import InstrumentedExecutor
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
+    PLUGIN_EXECUTION_TIMEOUT,
+    TOOL_CALL_CONCURRENCY,
+    TOOL_CALL_TIMEOUT,
+)
 
 import copy
+from uuid import uuid4
 
 log = logging.getLogger(__name__)
 
 
 def get_async_tool_function_and_apply_extra_params(
-    function: Callable, extra_params: dict
+    function: Callable,
+    extra_params: dict,
+    executor: Optional[InstrumentedExecutor] = None,
+    key: Optional[str] = None,
 ) -> Callable[..., Awaitable]:
     sig = inspect.signature(function)
     extra_params = {k: v for k, v in extra_params.items() if k in sig.parameters}
@@ -54,9 +64,15 @@ def get_async_tool_function_and_apply_extra_params(
         update_wrapper(partial_func, function)
         return partial_func
     else:
-        # Make it a coroutine function
+        # Make it a coroutine function, running the sync code off the event loop
         async def new_function(*args, **kwargs):
-            return partial_func(*args, **kwargs)
+            if executor is None:
+                return partial_func(*args, **kwargs)
+            return await executor.run(
+                key or function.__name__,
+                partial(partial_func, *args, **kwargs),
+                timeout=PLUGIN_EXECUTION_TIMEOUT,
+            )
 
         update_wrapper(new_function, function)
         return new_function
@@ -169,7 +185,10 @@ def get_tools(
                 function_name = spec["name"]
                 tool_function = getattr(module, function_name)
                 callable = get_async_tool_function_and_apply_extra_params(
-                    tool_function, extra_params
+                    tool_function,
+                    extra_params,
+                    executor=request.app.state.PLUGIN_EXECUTOR,
+                    key=f"{tool_id}.{function_name}",
                 )
 
                 # TODO: Support Pydantic models as parameters
@@ -203,6 +222,63 @@ def get_tools(
     return tools_dict
 
 
+async def call_tool(
+    tool: dict,
+    name: str,
+    params: dict,
+    event_caller: Optional[Callable] = None,
+    metadata: Optional[dict] = None,
+) -> Any:
+    """
+    Calls a single tool, either through the client for direct tools or through
+    its callable, bounded by TOOL_CALL_TIMEOUT.
+    """
+    if tool.get("direct", False):
+        coroutine = event_caller(
+            {
+                "type": "execute:tool",
+                "data": {
+                    "id": str(uuid4()),
+                    "name": name,
+                    "params": params,
+                    "server": tool.get("server", {}),
+                    "session_id": (metadata or {}).get("session_id", None),
+                },
+            }
+        )
+    else:
+        coroutine = tool["callable"](**params)
+
+    try:
+        return await asyncio.wait_for(coroutine, timeout=TOOL_CALL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Tool {name} timed out after {TOOL_CALL_TIMEOUT} seconds")
+
+
+async def execute_tool_calls(
+    tool_calls: list,
+    handler: Callable[[Any], Awaitable],
+    on_result: Optional[Callable[[int, Any], Awaitable]] = None,
+) -> list:
+    """
+    Runs the independent tool calls of a single model turn concurrently, at most
+    TOOL_CALL_CONCURRENCY at a time. on_result is awaited with the index and
+    result of each call as it finishes; results are returned in the original order.
+    """
+    semaphore = asyncio.Semaphore(max(TOOL_CALL_CONCURRENCY, 1))
+
+    async def run(index, tool_call):
+        async with semaphore:
+            result = await handler(tool_call)
+        if on_result:
+            await on_result(index, result)
+        return result
+
+    return await asyncio.gather(
+        *[run(index, tool_call) for index, tool_call in enumerate(tool_calls)]
+    )
+
+
 def parse_description(docstring: str | None) -> str:
     """
     Parse a function's docstring to extract the description.
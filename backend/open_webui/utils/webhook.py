@@ -1,60 +1,239 @@
+import asyncio
 import json
 import logging
+import random
+from collections import deque
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
 
-import requests
+import aiohttp
 from open_webui.config import WEBUI_FAVICON_URL
-from open_webui.env import SRC_LOG_LEVELS, VERSION
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    VERSION,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_CONCURRENCY_PER_HOST,
+    WEBHOOK_MAX_RETRIES,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_TIMEOUT,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
 
 
-def post_webhook(name: str, url: str, message: str, event_data: dict) -> bool:
-    try:
-        log.debug(f"post_webhook: {url}, {message}, {event_data}")
-        payload = {}
-
-        # Slack and Google Chat Webhooks
-        if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
-            payload["text"] = message
-        # Discord Webhooks
-        elif "https://discord.com/api/webhooks" in url:
-            payload["content"] = (
-                message
-                if len(message) < 2000
-                else f"{message[: 2000 - 20]}... (truncated)"
+def get_webhook_payload(name: str, url: str, message: str, event_data: dict) -> dict:
+    payload = {}
+
+    # Slack and Google Chat Webhooks
+    if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
+        payload["text"] = message
+    # Discord Webhooks
+    elif "https://discord.com/api/webhooks" in url:
+        payload["content"] = (
+            message if len(message) < 2000 else f"{message[: 2000 - 20]}... (truncated)"
+        )
+    # Microsoft Teams Webhooks
+    elif "webhook.office.com" in url:
+        action = event_data.get("action", "undefined")
+        facts = [
+            {"name": name, "value": value}
+            for name, value in json.loads(event_data.get("user", {})).items()
+        ]
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "0076D7",
+            "summary": message,
+            "sections": [
+                {
+                    "activityTitle": message,
+                    "activitySubtitle": f"{name} ({VERSION}) - {action}",
+                    "activityImage": WEBUI_FAVICON_URL,
+                    "facts": facts,
+                    "markdown": True,
+                }
+            ],
+        }
+    # Default Payload
+    else:
+        payload = {**event_data}
+
+    return payload
+
+
+class WebhookDispatcher:
+    """
+    Delivers webhook notifications in the background, so posting them never
+    blocks a request: enqueue() only builds the payloads and queues them.
+
+    Workers on the main event loop share one pooled aiohttp session, with at
+    most `concurrency_per_host` requests in flight per destination host. A
+    notification for a host already at its limit is parked until one of those
+    requests finishes, and failed deliveries (429, 5xx, connection errors) are
+    put back on the queue after a backoff, so waiting on one destination
+    doesn't hold up a worker. A notification identical to one still pending
+    for the same URL is dropped, which also covers many users sharing a
+    webhook.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        concurrency_per_host: int = 4,
+        max_retries: int = 3,
+        timeout: Optional[int] = 10,
+        max_queue_size: int = 10000,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.concurrency_per_host = max(1, concurrency_per_host)
+        self.max_retries = max(0, max_retries)
+        self.timeout = timeout
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        # (url, serialized payload) of every notification queued or in flight
+        self._pending: set[tuple[str, str]] = set()
+        # Requests in flight, and notifications parked, per destination host
+        self._in_flight: dict[str, int] = {}
+        self._parked: dict[str, deque] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def enqueue(
+        self, name: str, urls: Iterable[Optional[str]], message: str, event_data: dict
+    ) -> int:
+        """Queue a notification for each of `urls`, returning how many were queued."""
+        queued = 0
+        for url in urls:
+            if not url:
+                continue
+
+            try:
+                payload = get_webhook_payload(name, url, message, event_data)
+                key = (url, json.dumps(payload, sort_keys=True))
+                if key in self._pending:
+                    continue
+
+                self._queue.put_nowait((key, payload, 0))
+                self._pending.add(key)
+                queued += 1
+            except asyncio.QueueFull:
+                log.warning(f"Webhook queue is full, dropping notification to {url}")
+            except Exception as e:
+                log.exception(f"Failed to queue webhook to {url}: {e}")
+        return queued
+
+    async def run(self):
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self.close()
+
+    async def close(self):
+        if self._pending:
+            log.warning(f"Dropping {len(self._pending)} undelivered webhooks")
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
             )
-        # Microsoft Teams Webhooks
-        elif "webhook.office.com" in url:
-            action = event_data.get("action", "undefined")
-            facts = [
-                {"name": name, "value": value}
-                for name, value in json.loads(event_data.get("user", {})).items()
-            ]
-            payload = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "themeColor": "0076D7",
-                "summary": message,
-                "sections": [
-                    {
-                        "activityTitle": message,
-                        "activitySubtitle": f"{name} ({VERSION}) - {action}",
-                        "activityImage": WEBUI_FAVICON_URL,
-                        "facts": facts,
-                        "markdown": True,
-                    }
-                ],
-            }
-        # Default Payload
-        else:
-            payload = {**event_data}
-
-        log.debug(f"payload: {payload}")
-        r = requests.post(url, json=payload)
-        r.raise_for_status()
-        log.debug(f"r.text: {r.text}")
-        return True
-    except Exception as e:
-        log.exception(e)
-        return False
+        return self._session
+
+    def _get_retry_delay(self, attempt: int, headers=None) -> float:
+        try:
+            return float(headers["Retry-After"])
+        except Exception:
+            return min(60.0, 1.0 * 2**attempt) * (0.5 + random.random() / 2)
+
+    def _retry(self, key, payload, attempt: int):
+        try:
+            self._queue.put_nowait((key, payload, attempt))
+        except asyncio.QueueFull:
+            log.warning(f"Webhook queue is full, dropping retry to {key[0]}")
+            self._pending.discard(key)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                host = urlsplit(item[0][0]).netloc
+                if self._in_flight.get(host, 0) >= self.concurrency_per_host:
+                    self._parked.setdefault(host, deque()).append(item)
+                    continue
+
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                try:
+                    # Keep the host's slot for the notifications parked on it
+                    while item is not None:
+                        await self._deliver_safe(*item)
+                        item = self._unpark(host)
+                finally:
+                    self._in_flight[host] -= 1
+                    if not self._in_flight[host]:
+                        del self._in_flight[host]
+            finally:
+                self._queue.task_done()
+
+    def _unpark(self, host: str):
+        parked = self._parked.get(host)
+        if not parked:
+            return None
+        item = parked.popleft()
+        if not parked:
+            del self._parked[host]
+        return item
+
+    async def _deliver_safe(self, key, payload, attempt: int):
+        try:
+            await self._deliver(key, payload, attempt)
+        except Exception as e:
+            log.exception(f"Unexpected error delivering webhook: {e}")
+            self._pending.discard(key)
+
+    async def _deliver(self, key, payload, attempt: int):
+        url = key[0]
+        log.debug(f"webhook: {url}, attempt {attempt}, payload: {payload}")
+        try:
+            async with self._get_session().post(url, json=payload) as r:
+                r.raise_for_status()
+                log.debug(f"r.text: {await r.text()}")
+            self._pending.discard(key)
+            return
+        except aiohttp.ClientResponseError as e:
+            retry = e.status in self.RETRY_STATUSES
+            error, delay = e, self._get_retry_delay(attempt, e.headers)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            retry = True
+            error, delay = e, self._get_retry_delay(attempt)
+
+        if not retry or attempt >= self.max_retries:
+            log.error(f"Webhook to {url} failed: {error}")
+            self._pending.discard(key)
+            return
+
+        log.warning(f"Webhook to {url} failed ({error}), retrying in {delay:.1f}s")
+        asyncio.get_running_loop().call_later(
+            delay, self._retry, key, payload, attempt + 1
+        )
+
+
+Webhooks = WebhookDispatcher(
+    concurrency=WEBHOOK_CONCURRENCY,
+    concurrency_per_host=WEBHOOK_CONCURRENCY_PER_HOST,
+    max_retries=WEBHOOK_MAX_RETRIES,
+    timeout=WEBHOOK_TIMEOUT,
+    max_queue_size=WEBHOOK_QUEUE_SIZE,
+)